@@ -0,0 +1,188 @@
+"""
+Compare the scraper's "lean" and "full" Chrome profiles.
+
+For each profile, Chrome is started and pointed at a dashboard page; the
+report shows the time until the course cards have settled (the same
+readiness check the scraper uses) and the peak RSS of the whole
+chromedriver/Chrome process tree, sampled from /proc.
+
+By default the page is a generated FEDashboard fixture served from
+localhost, padded with images, web fonts and a video like the live portal's
+theme. Use --url to measure another page instead.
+
+Needs Chrome and chromedriver. The "full" profile runs headless here too
+(so both profiles work on a VM without a display) unless --headed-full is
+given.
+
+Usage:
+    python benchmarks/browser_profiles.py [--cards 50] [--repeat 3] [--url URL] [--save]
+"""
+import contextlib
+import json
+import os
+import random
+import statistics
+import struct
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from selenium.common.exceptions import WebDriverException  # noqa: E402
+from selenium.webdriver.support.ui import WebDriverWait  # noqa: E402
+
+from browser import PROFILES, new_chrome  # noqa: E402
+from procutil import PeakRSS  # noqa: E402
+from scraper import DashboardScraper  # noqa: E402
+from waits import settled_element_count  # noqa: E402
+
+from fixtures import generate_dashboard  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results", "browser")
+
+
+def _png(width: int, height: int, seed: int) -> bytes:
+    """
+    A valid RGB PNG of random noise (incompressible, so it costs real decode memory).
+    """
+    rng = random.Random(seed)
+    raw = b"".join(b"\x00" + rng.randbytes(width * 3) for _ in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b"")
+
+
+def heavy_dashboard(num_cards: int, images: int = 12, fonts: int = 4) -> str:
+    """
+    Dashboard fixture with the kind of resources the lean profile blocks.
+    """
+    page = generate_dashboard(num_cards, seed=num_cards)
+    faces = "".join(
+        f"@font-face {{ font-family: f{i}; src: url(/static/font{i}.woff2) format('woff2'); }}" for i in range(fonts)
+    )
+    styles = f"<style>{faces} body {{ font-family: {', '.join(f'f{i}' for i in range(fonts))}; }}</style>"
+    extras = "".join(f'<img src="/static/photo{i}.png" width="400">' for i in range(images))
+    extras += '<video src="/static/intro.mp4" preload="auto" autoplay muted></video>'
+    return page.replace("</head>", f"{styles}</head>").replace("</body>", f"{extras}</body>")
+
+
+class _PageServer(BaseHTTPRequestHandler):
+    page = b""
+    png = b""
+    blob = b""
+
+    def do_GET(self):
+        if self.path.endswith(".png"):
+            body, kind = self.png, "image/png"
+        elif self.path.endswith(".woff2"):
+            body, kind = self.blob, "font/woff2"
+        elif self.path.endswith(".mp4"):
+            body, kind = self.blob * 8, "video/mp4"
+        else:
+            body, kind = self.page, "text/html; charset=utf-8"
+        self.send_response(200)
+        self.send_header("Content-Type", kind)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def local_dashboard(num_cards: int):
+    """
+    Serve `heavy_dashboard(num_cards)` on localhost; yields its URL.
+    """
+    handler = type("Handler", (_PageServer,), {
+        "page": heavy_dashboard(num_cards).encode("utf-8"),
+        "png": _png(1024, 768, 1),
+        "blob": random.Random(2).randbytes(256 * 1024),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/FEDashboard.aspx"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def measure(profile: str, url: str, headless: bool, timeout: float = 30) -> Dict[str, float]:
+    """
+    Start Chrome with `profile`, load `url` and wait for the cards to settle.
+    """
+    driver = None
+    with PeakRSS(lambda: driver.service.process.pid if driver else None) as mem:
+        started = time.perf_counter()
+        driver = new_chrome({"browser_profile": profile, "headless": headless})
+        try:
+            launched = time.perf_counter()
+            driver.get(url)
+            WebDriverWait(driver, timeout, poll_frequency=0.05).until(
+                settled_element_count(DashboardScraper.CARD_LOCATOR, quiet_period=0.2, allow_empty=False)
+            )
+            loaded = time.perf_counter()
+            mem.sample()
+        finally:
+            driver.quit()
+    return {
+        "startup_seconds": launched - started,
+        "page_load_seconds": loaded - launched,
+        "peak_rss_mb": mem.peak_mb,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare page-load time and peak RSS of the browser profiles.")
+    parser.add_argument("--cards", type=int, default=50, help="Course cards on the generated page")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--url", help="Measure this page instead of the generated dashboard")
+    parser.add_argument("--headed-full", action="store_true", help="Run the full profile with a visible window")
+    parser.add_argument("--save", action="store_true", help="Write benchmarks/results/browser/<time>.json")
+    args = parser.parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        url = args.url or stack.enter_context(local_dashboard(args.cards))
+        results = {}
+        for profile in PROFILES:
+            headless = not (profile == "full" and args.headed_full)
+            try:
+                runs = [measure(profile, url, headless) for _ in range(max(1, args.repeat))]
+            except WebDriverException as e:
+                print(f"Could not run Chrome with the {profile} profile: {e.msg or e}")
+                return 1
+            results[profile] = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+
+    print(f"{'profile':<8} {'startup':>10} {'page load':>10} {'peak RSS':>10}")
+    for profile, r in results.items():
+        print(f"{profile:<8} {r['startup_seconds']:>9.2f}s {r['page_load_seconds']:>9.2f}s {r['peak_rss_mb']:>7.0f} MB")
+    lean, full = results["lean"], results["full"]
+    if full["page_load_seconds"] and full["peak_rss_mb"]:
+        print(f"lean vs full: page load {lean['page_load_seconds'] / full['page_load_seconds'] - 1:+.0%}, "
+              f"peak RSS {lean['peak_rss_mb'] / full['peak_rss_mb'] - 1:+.0%}")
+
+    if args.save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"url": args.url or f"generated:{args.cards}", "repeat": args.repeat, "results": results}, f, indent=2)
+        print(f"Saved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Deterministic FEDashboard.aspx fixtures for benchmarks and offline tests.
+
+The markup mirrors what the scraper's selectors read from the live portal:
+student tabs in ``ul#nav2`` and one ``div.col-lg-4.col-xl-4.mb-3`` card per
+course with title, period, grade, progress tooltips, minutes and days left.
+
+Usage:
+    python benchmarks/fixtures.py [--sizes 2 50 500 5000] [--out benchmarks/fixtures]
+"""
+import html
+import os
+import random
+from typing import Dict, List, Optional
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+DEFAULT_SIZES = (2, 50, 500, 5000)
+
+COURSE_NAMES = [
+    "Academy Chemistry with Workshop OL v5 A -- Stockam, Angela",
+    "Academy Honors English 2 with Workshop OL v2 A -- Sperduto, Kelly",
+    "Academy Sophomore Seminar v1 -- Burns, Patrick",
+    "Algebra 2 with Workshop OL v4.1 A -- Tinney, Gina",
+    "American Government OL v5 -- O'Connell, Elisabeth",
+    "Spanish 2 OL v7 A -- Bower, Emily",
+    "Walking Fitness OL v4 -- Pappas, Michael",
+    "2025-26 US Academy Symposium A -- Contreras, Elizabeth",
+    "High School Orientation OL v1",
+    "9th - 12th Grade - What’s Happening at LSS",
+]
+PERIODS = ["Aug 20, 2025 - Jan 20, 2026", "Aug 20, 2025 - Jun 22, 2026", "Sep 03, 2025 - Feb 03, 2026"]
+
+
+def course_card(course: Dict) -> str:
+    """
+    Markup for one course card. `course` holds name, period, grade (None for
+    ungraded), total, expected, completed, minutes and days_left.
+    """
+    grade = "-" if course["grade"] is None else f"{course['grade']:.2f} %"
+    actual = ""
+    if course["completed"] is not None:
+        actual = f"""
+          <span class="progress-mark-tooltip actual">
+            <span class="progress-mark-tooltip-label">Actual</span>
+            <span class="progress-mark-tooltip-value"><label>{course['completed']} of {course['total']}</label></span>
+          </span>"""
+    return f"""
+      <div class="col-lg-4 col-xl-4 mb-3">
+        <div class="card h-100">
+          <div class="card-body">
+            <h5 class="card-title">{html.escape(course['name'])}</h5>
+            <small class="text-muted">{html.escape(course['period'])}</small>
+            <div class="card-grade">{grade}</div>
+            <div class="progress-mark">{actual}
+              <span class="progress-mark-tooltip expected">
+                <span class="progress-mark-tooltip-container">
+                  <span class="progress-mark-tooltip-content">{course['expected']} of {course['total']}</span>
+                </span>
+              </span>
+            </div>
+            <div class="d-flex justify-content-between">
+              <div class="text-right">{course['minutes']} min</div>
+              <div class="align-self-center">{course['days_left']}d left</div>
+            </div>
+          </div>
+        </div>
+      </div>"""
+
+
+def random_course(rng: random.Random, idx: int) -> Dict:
+    total = rng.randint(10, 90)
+    expected = rng.randint(0, total)
+    completed = max(0, expected - rng.randint(-2, 6))
+    base = COURSE_NAMES[idx % len(COURSE_NAMES)]
+    return {
+        "name": base if idx < len(COURSE_NAMES) else f"{base} ({idx // len(COURSE_NAMES)})",
+        "period": rng.choice(PERIODS),
+        "grade": None if rng.random() < 0.15 else round(rng.uniform(55, 100), 2),
+        "total": total,
+        "expected": expected,
+        "completed": None if rng.random() < 0.05 else completed,
+        "minutes": rng.randint(0, 160000),
+        "days_left": rng.randint(1, 240),
+    }
+
+
+def dashboard_page(student_names: List[str], active: int, courses: List[Dict]) -> str:
+    """
+    A full FEDashboard page with one tab per student, showing `courses` for
+    the student at index `active`.
+    """
+    tabs = "\n".join(
+        f'<li class="nav-item{" active" if i == active else ""}">'
+        f'<a class="nav-link" href="#" data-student="{i}">{html.escape(name)}</a></li>'
+        for i, name in enumerate(student_names)
+    )
+    cards = "".join(course_card(c) for c in courses)
+    return f"""<!DOCTYPE html>
+<html><head><title>Dashboard</title></head>
+<body>
+  <h2 class="border-bottom pb-2">Dashboard</h2>
+  <ul id="nav2" class="nav nav-tabs">
+{tabs}
+  </ul>
+  <div class="container-fluid"><div class="row">{cards}
+  </div></div>
+</body></html>
+"""
+
+
+def generate_dashboard(num_cards: int, student_name: str = "Test Student", seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return dashboard_page([student_name], 0, [random_course(rng, i) for i in range(num_cards)])
+
+
+def fixture_path(num_cards: int, fixture_dir: Optional[str] = None) -> str:
+    """
+    Path to the recorded fixture with `num_cards` cards, generating it on first use.
+    """
+    fixture_dir = fixture_dir or FIXTURE_DIR
+    path = os.path.join(fixture_dir, f"dashboard_{num_cards}.html")
+    if not os.path.exists(path):
+        os.makedirs(fixture_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(generate_dashboard(num_cards, seed=num_cards))
+    return path
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate recorded FEDashboard fixtures.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--out", default=FIXTURE_DIR)
+    args = parser.parse_args(argv)
+    for size in args.sizes:
+        print(fixture_path(size, args.out))
+
+
+if __name__ == "__main__":
+    main()
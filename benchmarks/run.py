@@ -0,0 +1,222 @@
+"""
+Benchmark the report pipeline stages on recorded dashboard fixtures.
+
+Stages, per fixture size (number of course cards):
+    parse      dashboard_parser.parse_dashboard_html on the page source
+    classify   grade_level() for every parsed grade
+    filter     compile a CourseFilter (exact, truncated and glob rules) and classify
+               every parsed course title
+    aggregate  aggregate.summarize_students (the generate_and_send_report summaries)
+    write_csv  utils.write_csv of all rows
+    emit       in-memory CSV attachment + EmailJSClient payload build + POST to a
+               local stand-in EmailJS endpoint
+
+Results are saved to benchmarks/results/<timestamp>-<commit>.json and compared
+with the previous result file, so regressions show up between commits.
+
+Usage:
+    python benchmarks/run.py [--sizes 2 50 500 5000] [--repeat 5] [--threshold 0.2] [--fail-on-regression]
+"""
+import contextlib
+import glob
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from aggregate import summarize_students  # noqa: E402
+from attachments import AttachmentBuilder  # noqa: E402
+from course_filter import CourseFilter  # noqa: E402
+from dashboard_parser import grade_level, parse_dashboard_html  # noqa: E402
+from emailer import EmailJSClient  # noqa: E402
+from utils import write_csv  # noqa: E402
+
+from fixtures import DEFAULT_SIZES, fixture_path  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+COURSES_PER_STUDENT = 10
+
+
+class _EmailJSStandIn(BaseHTTPRequestHandler):
+    """
+    Accepts EmailJS send requests and answers 200 OK, like api.emailjs.com.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b"OK"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def local_emailjs():
+    """
+    Run a stand-in EmailJS endpoint on localhost; yields its send URL.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EmailJSStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/api/v1.0/email/send"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _time(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return {"min": min(samples), "median": statistics.median(samples)}
+
+
+def bench_size(num_cards: int, repeat: int, api_url: str, tmp_dir: str) -> Dict[str, Dict[str, float]]:
+    with open(fixture_path(num_cards), "r", encoding="utf-8") as f:
+        source = f.read()
+
+    rows, _ = parse_dashboard_html(source, "Test Student")
+    # Spread the cards over students the way a multi-student account would be
+    for i, row in enumerate(rows):
+        row["Student Name"] = f"Student {i // COURSES_PER_STUDENT}"
+    grades = [row["Current Grade (%)"] for row in rows]
+    titles = [row["Course Name"] for row in rows]
+    # A config like a long-lived one: exact names, portal-truncated names and a few globs
+    course_rules = {}
+    for i, title in enumerate(titles):
+        course_rules[title if i % 3 else f"{title[:20]}..."] = i % 5 != 0
+    course_rules.update({"*Physical Education*": False, "Algebra ?*": True})
+    csv_path = os.path.join(tmp_dir, f"bench_{num_cards}.csv")
+    write_csv(rows, csv_path)
+    client = EmailJSClient("service", "template", "key", api_url=api_url)
+    # No dedupe: every repeat pays for serializing and encoding the attachment
+    builder = AttachmentBuilder(dedupe=False)
+
+    def emit():
+        attachment = builder.build(rows, "Test_Student")
+        with contextlib.redirect_stdout(io.StringIO()):
+            status, _ = client.send_report(attachment, ["bench@example.com"], "Test Student", grade_summary="")
+        if status != 200:
+            raise RuntimeError(f"stand-in EmailJS returned {status}")
+
+    try:
+        return {
+            "parse": _time(lambda: parse_dashboard_html(source, "Test Student"), repeat),
+            "classify": _time(lambda: [grade_level(g) for g in grades], repeat),
+            "filter": _time(lambda: CourseFilter(course_rules).missing(titles), repeat),
+            "aggregate": _time(lambda: summarize_students(rows), repeat),
+            "write_csv": _time(lambda: write_csv(rows, csv_path), repeat),
+            "emit": _time(emit, repeat),
+        }
+    finally:
+        client.close()
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def previous_result() -> Optional[dict]:
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")))
+    if not paths:
+        return None
+    with open(paths[-1], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current: dict, previous: dict, threshold: float) -> List[str]:
+    """
+    Stages whose best time got slower than `threshold` (0.2 = 20%) relative
+    to `previous`. The minimum is compared because it is the least noisy.
+    """
+    regressions = []
+    for size, stages in current["results"].items():
+        for stage, stats in stages.items():
+            before = previous["results"].get(size, {}).get(stage)
+            if not before or before["min"] <= 0:
+                continue
+            change = stats["min"] / before["min"] - 1
+            if change > threshold:
+                regressions.append(f"{stage}@{size}: {before['min'] * 1000:.2f} ms -> "
+                                   f"{stats['min'] * 1000:.2f} ms (+{change:.0%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the report pipeline on recorded fixtures.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--no-save", action="store_true", help="Do not write a results file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with local_emailjs() as api_url, tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            results[str(size)] = bench_size(size, max(1, args.repeat), api_url, tmp_dir)
+
+    print(f"{'cards':>6} " + " ".join(f"{stage:>12}" for stage in next(iter(results.values()))))
+    for size, stages in results.items():
+        print(f"{size:>6} " + " ".join(f"{s['median'] * 1000:>9.2f} ms" for s in stages.values()))
+
+    current = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "results": results,
+    }
+    previous = previous_result()
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{current['commit']}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Saved {path}")
+
+    if previous is None:
+        return 0
+    regressions = compare(current, previous, args.threshold)
+    if regressions:
+        print(f"Regressions vs {previous['commit']} ({previous['timestamp']}):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1 if args.fail_on_regression else 0
+    print(f"No regressions vs {previous['commit']} ({previous['timestamp']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
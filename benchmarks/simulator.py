@@ -0,0 +1,573 @@
+"""
+Local stand-in for the school portal and EmailJS, for end-to-end load tests.
+
+Serves, on one localhost port:
+
+    PublicWelcome.aspx   welcome page with the ``iFrameLogin`` frame
+    Login.aspx           the frame's tbLogin / tbPassword / btLogin form; sets the session cookie
+    FEDashboard.aspx     WebForms dashboard: ``ul#nav2`` student tabs switched by
+                         ``__doPostBack``, course cards, and the post-login announcement
+                         ("DON'T SHOW AGAIN" with a confirm() dialog, then "CLOSE")
+    /api/v1.0/email/send EmailJS send endpoint
+
+The markup follows what the scraper's selectors and ``portal_api`` expect
+from the live site, with course cards from ``fixtures.course_card``. Knobs
+set the number of students and courses, response latency, error injection
+for portal pages and for EmailJS, and a delay before the cards render.
+
+``run_e2e`` runs the real report pipeline (``main.generate_and_send_report``)
+against the simulator, with the config pointed at it through
+``scraper.portal_url`` and ``emailjs.api_url``, and reports throughput.
+
+Usage:
+    python benchmarks/simulator.py serve [--port 8765] [--students 50] [--courses 10] [--latency 0.2] [--error-rate 0.05]
+    python benchmarks/simulator.py e2e [--students 50] [--courses 10] [--fetch-mode http] [--save] [--fail-on-regression]
+
+``e2e --fetch-mode browser`` drives Chrome through the login form and needs
+Chrome and chromedriver; ``--fetch-mode http`` (the default) starts from a
+session the simulator issues, so it runs without a browser.
+"""
+import contextlib
+import glob
+import html
+import io
+import json
+import os
+import random
+import re
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fixtures import course_card, random_course  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results", "e2e")
+SESSION_COOKIE = "ASP.NET_SessionId"
+TAB_TARGET = "ctl00$nav2$lnkStudent{}"
+DISMISS_BUTTON = "ctl00$ContentPlaceHolder1$AnnouncementList1$Repeater2$ctl01$ButtonDismiss"
+CLOSE_BUTTON = "ctl00$ContentPlaceHolder1$AnnouncementList1$btnCancel"
+
+FIRST_NAMES = ["Ava", "Ben", "Cora", "Dev", "Ella", "Finn", "Gia", "Hugo", "Isla", "Jude"]
+LAST_NAMES = ["Alvarez", "Brooks", "Chen", "Dubois", "Evans", "Fischer", "Garcia", "Hayes", "Iqbal", "Jensen"]
+
+_DO_POSTBACK = """
+<script type="text/javascript">
+function __doPostBack(eventTarget, eventArgument) {
+    var form = document.forms['aspnetForm'];
+    form.__EVENTTARGET.value = eventTarget;
+    form.__EVENTARGUMENT.value = eventArgument;
+    form.submit();
+}
+</script>"""
+
+
+def student_names(count: int) -> List[str]:
+    names = []
+    for i in range(count):
+        name = f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]}"
+        cycle = i // (len(FIRST_NAMES) * len(LAST_NAMES))
+        names.append(f"{name} {cycle + 1}" if cycle else name)
+    return names
+
+
+class PortalSimulator:
+    """
+    The simulated portal and EmailJS endpoint; use as a context manager or
+    call `start()` / `stop()`. `stats()` counts requests, logins, tab
+    switches, emails and injected errors.
+    """
+
+    def __init__(
+        self,
+        students: int = 5,
+        courses: int = 10,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        email_error_rate: float = 0.0,
+        render_delay: float = 0.0,
+        announcement: bool = True,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.email_error_rate = email_error_rate
+        self.render_delay = render_delay
+        self.announcement = announcement
+        # None accepts any credentials
+        self.username = username
+        self.password = password
+        self.students = student_names(students)
+        self.courses = []
+        for i in range(students):
+            rng = random.Random(seed * 100003 + i)
+            self.courses.append([random_course(rng, j) for j in range(courses)])
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        # Users who clicked "DON'T SHOW AGAIN"
+        self._dismissed = set()
+        self._stats: Dict[str, int] = {}
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.sim = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def emailjs_url(self) -> str:
+        return f"{self.base_url}/api/v1.0/email/send"
+
+    def start(self) -> "PortalSimulator":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="portal-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "PortalSimulator":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self._stats[name] = self._stats.get(name, 0) + value
+
+    def roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def delay(self):
+        if self.latency or self.jitter:
+            with self._lock:
+                extra = self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+            time.sleep(self.latency + extra)
+
+    def issue_session(self, username: str = "simulator") -> List[dict]:
+        """
+        Log `username` in without the form; returns the session cookies in
+        WebDriver's format (for seeding the scraper's session cache).
+        """
+        token = self._new_session(username)
+        host = self._server.server_address[0]
+        return [{"name": SESSION_COOKIE, "value": token, "domain": host, "path": "/"}]
+
+    def _new_session(self, username: str) -> str:
+        token = secrets.token_hex(12)
+        with self._lock:
+            self._sessions[token] = {
+                "user": username,
+                "active": 0,
+                "viewstate": secrets.token_hex(8),
+                # "shown", "dismissed" (after DON'T SHOW AGAIN, until CLOSE) or None
+                "announcement": "shown" if self.announcement and username not in self._dismissed else None,
+            }
+        self.count("logins")
+        return token
+
+    def session(self, token: Optional[str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._sessions.get(token) if token else None
+
+    def check_credentials(self, username: str, password: str) -> bool:
+        if self.username is not None and username != self.username:
+            return False
+        return self.password is None or password == self.password
+
+    def dismiss_announcement(self, session: Dict[str, Any]):
+        with self._lock:
+            self._dismissed.add(session["user"])
+
+    def dashboard_page(self, session: Dict[str, Any]) -> str:
+        active = session["active"]
+        session["viewstate"] = secrets.token_hex(8)
+        tabs = "\n".join(
+            f'<li class="nav-item{" active" if i == active else ""}">'
+            f'<a class="nav-link{" active" if i == active else ""}" '
+            f'href="javascript:__doPostBack(&#39;{TAB_TARGET.format(i)}&#39;,&#39;&#39;)">{html.escape(name)}</a></li>'
+            for i, name in enumerate(self.students)
+        )
+        cards = "".join(course_card(c) for c in self.courses[active]) if self.students else ""
+        if self.render_delay:
+            # Cards arrive after the page loads, like the portal's client-side rendering
+            cards = (
+                f'<template id="pendingCards">{cards}</template>'
+                f"<script>setTimeout(function () {{ document.getElementById('cards').innerHTML = "
+                f"document.getElementById('pendingCards').innerHTML; }}, {int(self.render_delay * 1000)});</script>"
+            )
+        dialog = ""
+        if session["announcement"]:
+            dismiss = ""
+            if session["announcement"] == "shown":
+                dismiss = (
+                    f'<input type="submit" name="{DISMISS_BUTTON}" value="DON\'T SHOW AGAIN" '
+                    "onclick=\"return confirm('Don\\'t show this announcement again?');\">"
+                )
+            dialog = f"""
+  <div id="announcementDialog" class="modal" style="display:block">
+    <div class="modal-body"><p>Welcome back! Midterm progress reports are now available.</p></div>
+    <div class="modal-footer">{dismiss}
+      <input type="submit" name="{CLOSE_BUTTON}" value="CLOSE">
+    </div>
+  </div>"""
+        return f"""<!DOCTYPE html>
+<html><head><title>Dashboard</title>{_DO_POSTBACK}</head>
+<body>
+<form method="post" action="./FEDashboard.aspx" id="aspnetForm">
+  <input type="hidden" name="__EVENTTARGET" id="__EVENTTARGET" value="">
+  <input type="hidden" name="__EVENTARGUMENT" id="__EVENTARGUMENT" value="">
+  <input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{session['viewstate']}">
+  <input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="{session['viewstate'][::-1]}">{dialog}
+  <h2 class="border-bottom pb-2">Dashboard</h2>
+  <ul id="nav2" class="nav nav-tabs">
+{tabs}
+  </ul>
+  <div class="container-fluid"><div class="row" id="cards">{cards}
+  </div></div>
+</form>
+</body></html>
+"""
+
+
+_WELCOME_PAGE = """<!DOCTYPE html>
+<html><head><title>Welcome</title></head>
+<body>
+  <h1>Welcome</h1>
+  <iframe id="iFrameLogin" src="Login.aspx" width="420" height="320"></iframe>
+</body></html>
+"""
+
+_LOGIN_FORM = """<!DOCTYPE html>
+<html><body>
+<form method="post" action="Login.aspx" target="_top">
+  {error}
+  <input type="text" id="tbLogin" name="tbLogin">
+  <input type="password" id="tbPassword" name="tbPassword">
+  <input type="submit" id="btLogin" name="btLogin" value="Log In">
+</form>
+</body></html>
+"""
+
+_SERVER_ERROR = "<html><body><h1>Server Error in '/' Application.</h1><p>{}</p></body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def sim(self) -> PortalSimulator:
+        return self.server.sim
+
+    def log_message(self, *args):
+        pass
+
+    def _route(self) -> str:
+        return self.path.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1].lower()
+
+    def _token(self) -> Optional[str]:
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == SESSION_COOKIE:
+                return value
+        return None
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8", headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location: str, headers=None):
+        self._send(302, "", headers=dict(headers or {}, Location=location))
+
+    def _inject_error(self, rate: float) -> bool:
+        if not self.sim.roll(rate):
+            return False
+        self.sim.count("injected_errors")
+        self._send(503, _SERVER_ERROR.format("Service Unavailable (injected by the simulator)"))
+        return True
+
+    def do_GET(self):
+        route = self._route()
+        self.sim.count(f"GET {route}")
+        self.sim.delay()
+        if route == "publicwelcome.aspx":
+            self._send(200, _WELCOME_PAGE)
+        elif route == "login.aspx":
+            self._send(200, _LOGIN_FORM.format(error=""))
+        elif route == "fedashboard.aspx":
+            if self._inject_error(self.sim.error_rate):
+                return
+            session = self.sim.session(self._token())
+            if session is None:
+                self._redirect("PublicWelcome.aspx")
+                return
+            self._send(200, self.sim.dashboard_page(session))
+        else:
+            self._send(404, _SERVER_ERROR.format("The resource cannot be found."))
+
+    def do_POST(self):
+        route = self._route()
+        self.sim.count(f"POST {route}")
+        body = self._body()
+        self.sim.delay()
+        if route == "login.aspx":
+            fields = {k: v[0] for k, v in parse_qs(body.decode("utf-8"), keep_blank_values=True).items()}
+            username, password = fields.get("tbLogin", ""), fields.get("tbPassword", "")
+            if not self.sim.check_credentials(username, password):
+                self.sim.count("failed_logins")
+                self._send(200, _LOGIN_FORM.format(error='<span class="error">Invalid login.</span>'))
+                return
+            token = self.sim._new_session(username)
+            self._redirect("FEDashboard.aspx", {"Set-Cookie": f"{SESSION_COOKIE}={token}; path=/; HttpOnly"})
+        elif route == "fedashboard.aspx":
+            self._postback(body)
+        elif route == "send":
+            self._send_email(body)
+        else:
+            self._send(404, _SERVER_ERROR.format("The resource cannot be found."))
+
+    def _postback(self, body: bytes):
+        if self._inject_error(self.sim.error_rate):
+            return
+        session = self.sim.session(self._token())
+        if session is None:
+            self._redirect("PublicWelcome.aspx")
+            return
+        fields = {k: v[0] for k, v in parse_qs(body.decode("utf-8"), keep_blank_values=True).items()}
+        if fields.get("__VIEWSTATE") != session["viewstate"]:
+            # Posting a stale page back fails like ASP.NET's viewstate MAC check
+            self.sim.count("viewstate_errors")
+            self._send(500, _SERVER_ERROR.format("Validation of viewstate MAC failed."))
+            return
+        if DISMISS_BUTTON in fields:
+            session["announcement"] = "dismissed"
+            self.sim.dismiss_announcement(session)
+        elif CLOSE_BUTTON in fields:
+            session["announcement"] = None
+        else:
+            match = re.fullmatch(re.escape(TAB_TARGET.format("")) + r"(\d+)", fields.get("__EVENTTARGET", ""))
+            if match and int(match.group(1)) < len(self.sim.students):
+                session["active"] = int(match.group(1))
+                self.sim.count("tab_switches")
+        self._send(200, self.sim.dashboard_page(session))
+
+    def _send_email(self, body: bytes):
+        if self.sim.roll(self.sim.email_error_rate):
+            self.sim.count("injected_email_errors")
+            self._send(503, "Service Unavailable", "text/plain")
+            return
+        try:
+            payload = json.loads(body)
+            params = payload["template_params"]
+        except (ValueError, KeyError, TypeError):
+            self._send(400, "The template params are invalid", "text/plain")
+            return
+        self.sim.count("emails")
+        self.sim.count("email_bytes", len(body))
+        self.sim.count("email_recipients", len([r for r in str(params.get("email", "")).split(",") if r]))
+        self._send(200, "OK", "text/plain")
+
+
+def e2e_config(sim: PortalSimulator, work_dir: str, fetch_mode: str = "http", email_rate: float = 0.0,
+               streaming: bool = True) -> Dict[str, Any]:
+    """
+    A complete config for one report run against `sim`, keeping every state
+    file under `work_dir`.
+    """
+    return {
+        "credentials": {"username": "simulator", "password": "simulator"},
+        "courses": {"*": True},
+        "emails": {name: [f"parent{i}@example.com"] for i, name in enumerate(sim.students)},
+        "emailjs": {"service_id": "sim", "template_id": "sim", "public_key": "sim", "api_url": sim.emailjs_url},
+        "dispatch": {"requests_per_second": email_rate, "max_retries": 3, "retry_backoff": 0.05},
+        "scraper": {"portal_url": sim.base_url, "fetch_mode": fetch_mode, "browser_profile": "lean"},
+        "streaming": streaming,
+        "session_cache": {"path": os.path.join(work_dir, "sessions.json")},
+        "snapshots": {"path": os.path.join(work_dir, "snapshots.json")},
+        "history": {"path": os.path.join(work_dir, "history.sqlite3")},
+        "journal": {"path": os.path.join(work_dir, "journal.sqlite3")},
+        "metrics": {"dir": os.path.join(work_dir, "metrics")},
+        "attachments": {"archive": False},
+        "recording": {"enabled": False},
+    }
+
+
+def run_e2e(sim: PortalSimulator, fetch_mode: str = "http", email_rate: float = 0.0, streaming: bool = True,
+            verbose: bool = False) -> Dict[str, Any]:
+    """
+    Run the full report pipeline once against a started `sim`.
+    """
+    import main
+    from metrics import metrics
+    from session_store import SessionStore
+
+    with tempfile.TemporaryDirectory(prefix="portal-e2e-") as work_dir:
+        config = e2e_config(sim, work_dir, fetch_mode, email_rate, streaming)
+        config_path = os.path.join(work_dir, "config.yaml")
+        with open(config_path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(config, f)
+        if fetch_mode == "http":
+            # Start from a live session so no browser is needed to log in
+            SessionStore(config["session_cache"]["path"]).save("simulator", sim.issue_session("simulator"))
+        before = sim.stats()
+        output = io.StringIO()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(output if not verbose else sys.stdout):
+            main.generate_and_send_report(config_path)
+        seconds = time.perf_counter() - started
+        summary = metrics.summary()
+    after = sim.stats()
+    delta = {k: v - before.get(k, 0) for k, v in after.items() if v - before.get(k, 0)}
+    students = len(sim.students)
+    result = {
+        "seconds": round(seconds, 3),
+        "students": students,
+        "courses_per_student": len(sim.courses[0]) if sim.courses else 0,
+        "students_per_second": round(students / seconds, 3) if seconds else 0.0,
+        "emails_sent": delta.get("emails", 0),
+        "run_errors": summary["counters"].get("run_errors", 0),
+        "http_fallbacks": summary["counters"].get("http_fallbacks", 0),
+        "portal": delta,
+        "stages": summary["stages"],
+    }
+    if result["run_errors"] and not verbose:
+        result["log_tail"] = output.getvalue().splitlines()[-15:]
+    return result
+
+
+def previous_result(params: Dict[str, Any]) -> Optional[dict]:
+    """
+    The latest saved result for the same simulator settings.
+    """
+    for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")), reverse=True):
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("params") == params:
+            return saved
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local portal + EmailJS simulator for end-to-end tests.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("serve", "Run the simulator until Ctrl+C"), ("e2e", "Run the report pipeline against it")):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("--students", type=int, default=50)
+        sub.add_argument("--courses", type=int, default=10)
+        sub.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+        sub.add_argument("--jitter", type=float, default=0.0, help="Up to this many more random seconds")
+        sub.add_argument("--error-rate", type=float, default=0.0, help="Share of dashboard requests answered 503")
+        sub.add_argument("--email-error-rate", type=float, default=0.0, help="Share of EmailJS calls answered 503")
+        sub.add_argument("--render-delay", type=float, default=0.0, help="Seconds before the cards render")
+        sub.add_argument("--no-announcement", action="store_true", help="Skip the post-login announcement")
+        sub.add_argument("--seed", type=int, default=0)
+    serve = commands.choices["serve"]
+    serve.add_argument("--port", type=int, default=8765)
+    e2e = commands.choices["e2e"]
+    e2e.add_argument("--fetch-mode", choices=("http", "browser"), default="http")
+    e2e.add_argument("--email-rate", type=float, default=0.0, help="dispatch.requests_per_second (0: unthrottled)")
+    e2e.add_argument("--batch", action="store_true", help="Scrape everything before sending (streaming off)")
+    e2e.add_argument("--repeat", type=int, default=1)
+    e2e.add_argument("--verbose", action="store_true", help="Show the pipeline's output")
+    e2e.add_argument("--save", action="store_true", help="Write benchmarks/results/e2e/<time>-<commit>.json")
+    e2e.add_argument("--threshold", type=float, default=0.2, help="Throughput drop counted as a regression")
+    e2e.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    sim = PortalSimulator(
+        students=args.students, courses=args.courses, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, email_error_rate=args.email_error_rate, render_delay=args.render_delay,
+        announcement=not args.no_announcement, seed=args.seed, port=args.port if args.command == "serve" else 0,
+    )
+    if args.command == "serve":
+        with sim:
+            print(f"Portal simulator on {sim.base_url}/PublicWelcome.aspx ({args.students} students x {args.courses} courses)")
+            print("Point a config at it with:")
+            print(f"  scraper:\n    portal_url: \"{sim.base_url}\"\n  emailjs:\n    api_url: \"{sim.emailjs_url}\"")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                print(json.dumps(sim.stats(), indent=2))
+        return 0
+
+    from run import _git_commit
+
+    params = {k: getattr(args, k) for k in (
+        "students", "courses", "latency", "jitter", "error_rate", "email_error_rate", "render_delay",
+        "fetch_mode", "email_rate", "batch", "seed")}
+    with sim:
+        runs = [run_e2e(sim, args.fetch_mode, args.email_rate, not args.batch, args.verbose)
+                for _ in range(max(1, args.repeat))]
+    best = min(runs, key=lambda r: r["seconds"])
+    for i, r in enumerate(runs, 1):
+        print(f"run {i}: {r['students']} students x {r['courses_per_student']} courses in {r['seconds']:.2f}s "
+              f"({r['students_per_second']:.1f} students/s), {r['emails_sent']} emails, "
+              f"{r['run_errors']:.0f} errors, {r['portal'].get('injected_errors', 0)} injected portal errors, "
+              f"{r['http_fallbacks']:.0f} HTTP fallbacks")
+        for line in r.get("log_tail", []):
+            print(f"    {line}")
+    failed = any(r["run_errors"] or r["emails_sent"] < r["students"] for r in runs)
+
+    previous = previous_result(params)
+    regressed = False
+    if previous is not None and previous["best"]["students_per_second"]:
+        change = best["students_per_second"] / previous["best"]["students_per_second"] - 1
+        regressed = change < -args.threshold
+        print(f"vs {previous['commit']}: throughput {change:+.0%}" + ("  <-- regression" if regressed else ""))
+
+    if args.save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        commit = _git_commit()
+        path = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"commit": commit, "params": params, "best": best, "runs": runs}, f, indent=2)
+        print(f"Saved {path}")
+    if failed:
+        return 1
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Per-student aggregation of scraped dashboard rows.
+
+Rows are first converted into one typed, column-oriented `GradeTable`; every
+student's summary (letter-grade buckets, expected/overdue totals, minutes
+spent, at-risk courses) is then computed in a single pass over its columns.
+Used by the email path, and usable on its own for any list of CSV rows.
+"""
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from alerts import Alert, format_alerts
+from utils import to_int
+
+GRADE_ORDER = ["A", "B", "C", "D", "F"]
+
+
+def _count(val) -> int:
+    """
+    Assignment counts as summed in the report, parsed like every other
+    scraped number ("1,234" is 1234); blanks and negative values (e.g.
+    ahead-of-schedule "overdue" counts) count as 0.
+    """
+    v = to_int(val)
+    return v if v is not None and v > 0 else 0
+
+
+class GradeTable:
+    """
+    Column-oriented, typed view of scraped rows. Count columns are packed
+    arrays; missing counts are 0.
+    """
+
+    def __init__(self):
+        self.student: List[str] = []
+        self.course: List[str] = []
+        self.grade_level: List[str] = []
+        self.expected = array("q")
+        self.overdue = array("q")
+        self.minutes = array("q")
+        self.rows: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "GradeTable":
+        table = cls()
+        table.rows = list(rows)
+        get = dict.get
+        table.student = [get(r, "Student Name", "") for r in table.rows]
+        table.course = [get(r, "Course Name", "") for r in table.rows]
+        table.grade_level = [get(r, "Current Grade Level", "") for r in table.rows]
+        table.expected = array("q", (_count(get(r, "Expected Assignments", 0)) for r in table.rows))
+        table.overdue = array("q", (_count(get(r, "Overdue Assignments", 0)) for r in table.rows))
+        table.minutes = array("q", (_count(get(r, "Minutes Spent", 0)) for r in table.rows))
+        return table
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+@dataclass
+class StudentSummary:
+    student_name: str
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    grade_buckets: Dict[str, List[str]] = field(default_factory=lambda: {g: [] for g in GRADE_ORDER})
+    total_expected: int = 0
+    total_overdue: int = 0
+    minutes_spent: int = 0
+    at_risk: List[str] = field(default_factory=list)
+    # Filled in by the alert engine (alerts.py), most urgent first
+    alerts: List[Alert] = field(default_factory=list)
+
+    @property
+    def grade_summary(self) -> str:
+        """
+        Bulleted, multi-line summary used by the email template, e.g.
+        "(2) A\\n- Chemistry\\n- Spanish 2".
+        """
+        summary_lines = []
+        for grade in GRADE_ORDER:
+            courses = self.grade_buckets.get(grade, [])
+            if courses:
+                summary_lines.append(f"({len(courses)}) {grade}")
+                for course in courses:
+                    summary_lines.append(f"- {course}")
+        return "\n".join(summary_lines)
+
+    @property
+    def at_risk_summary(self) -> str:
+        return "\n".join(f"- {course}" for course in self.at_risk)
+
+    @property
+    def alerts_summary(self) -> str:
+        return format_alerts(self.alerts)
+
+
+def summarize_students(
+    rows: Iterable[Dict[str, Any]],
+    at_risk_levels: Sequence[str] = ("D", "F"),
+    at_risk_overdue: Optional[int] = 3,
+) -> Dict[str, StudentSummary]:
+    """
+    Summaries keyed by student name, in order of first appearance.
+
+    A course is at risk when its letter grade is in `at_risk_levels` or it
+    has at least `at_risk_overdue` overdue assignments (None disables the
+    overdue rule).
+    """
+    table = rows if isinstance(rows, GradeTable) else GradeTable.from_rows(rows)
+    risk_levels = frozenset(at_risk_levels)
+    overdue_limit = at_risk_overdue if at_risk_overdue is not None else float("inf")
+    summaries: Dict[str, StudentSummary] = {}
+    for i, (student, course, level, expected, overdue, minutes) in enumerate(zip(
+        table.student, table.course, table.grade_level, table.expected, table.overdue, table.minutes
+    )):
+        summary = summaries.get(student)
+        if summary is None:
+            summary = summaries[student] = StudentSummary(student)
+        summary.rows.append(table.rows[i])
+        summary.total_expected += expected
+        summary.total_overdue += overdue
+        summary.minutes_spent += minutes
+        if level and course:
+            bucket = summary.grade_buckets.get(level)
+            if bucket is not None:
+                bucket.append(course)
+        if course and (level in risk_levels or overdue >= overdue_limit):
+            summary.at_risk.append(course)
+    return summaries
+
+
+def summarize_from_config(rows: Iterable[Dict[str, Any]], config: Dict[str, Any]) -> Dict[str, StudentSummary]:
+    opts = config.get("at_risk") or {}
+    return summarize_students(
+        rows,
+        at_risk_levels=opts.get("grade_levels", ("D", "F")),
+        at_risk_overdue=opts.get("min_overdue", 3),
+    )
@@ -0,0 +1,223 @@
+"""
+Declarative alert rules evaluated over scraped rows.
+
+Each rule watches one row field and fires on one condition:
+
+    below / above      the value crosses a threshold, e.g. a grade below 70
+    drop / rise        the value moved by at least this much since the last run
+    becomes            the value changed to a given one, e.g. grade level "F"
+
+An optional ``where`` adds conditions on other fields of the same row
+(``{"Days Left": {"below": 30}}``). Rules are edge-triggered: an alert
+fires when its condition holds now but did not for the previous run's
+values (from the change-detection snapshot), so a course is flagged once
+when it slips rather than in every email. Rules are indexed by the fields
+they read, so a row is only checked against rules whose fields changed and
+unchanged rows cost one comparison per watched field.
+
+Alerts carry a priority ("high", "medium", "low"); each student's email
+gets the most urgent few as the ``{{alerts}}`` template variable.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from utils import to_float
+
+PRIORITIES = {"high": 0, "medium": 1, "low": 2}
+_KINDS = ("below", "above", "drop", "rise", "becomes")
+# A (student, course) -> previous row lookup, e.g. SnapshotStore.get
+PreviousLookup = Callable[[str, str], Optional[Dict[str, Any]]]
+
+DEFAULT_RULES = [
+    {"name": "grade_drop", "field": "Current Grade (%)", "drop": 5, "priority": "high",
+     "message": "{course}: grade fell {delta:g} points to {value:g}%"},
+    {"name": "failing", "field": "Current Grade Level", "becomes": "F", "priority": "high",
+     "message": "{course}: now failing ({grade}%)"},
+    {"name": "overdue_spike", "field": "Overdue Assignments", "rise": 3, "priority": "high",
+     "message": "{course}: {delta:g} more overdue assignments ({value:g} total)"},
+    {"name": "low_minutes", "field": "Minutes Spent", "below": 60, "priority": "medium",
+     "where": {"Days Left": {"below": 30}},
+     "message": "{course}: only {value:g} minutes spent with {days_left} days left"},
+]
+
+
+def _limit(value, spec: Dict[str, Any]) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Alert rule limit {value!r} is not a number: {spec!r}") from e
+
+
+def _compare(kind: str, limit, value, previous=None) -> bool:
+    if kind == "becomes":
+        return value == str(limit)
+    value = to_float(value)
+    if value is None:
+        return False
+    if kind == "below":
+        return value < limit
+    if kind == "above":
+        return value > limit
+    previous = to_float(previous)
+    if previous is None:
+        return False
+    if kind == "drop":
+        return previous - value >= limit
+    return value - previous >= limit
+
+
+@dataclass
+class AlertRule:
+    name: str
+    field: str
+    kind: str
+    limit: Any
+    priority: int = 1
+    message: str = ""
+    # field -> (kind, limit) conditions that must also hold (threshold kinds only)
+    where: Dict[str, tuple] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "AlertRule":
+        kinds = [k for k in _KINDS if k in spec]
+        if "field" not in spec or len(kinds) != 1:
+            raise ValueError(f"Alert rule needs a field and exactly one of {', '.join(_KINDS)}: {spec!r}")
+        kind = kinds[0]
+        where = {}
+        for other, cond in (spec.get("where") or {}).items():
+            cond_kinds = [k for k in ("below", "above", "becomes") if k in (cond or {})]
+            if len(cond_kinds) != 1:
+                raise ValueError(f"Alert rule condition on {other!r} needs one of below, above, becomes: {spec!r}")
+            cond_kind = cond_kinds[0]
+            where[other] = (cond_kind, cond[cond_kind] if cond_kind == "becomes" else _limit(cond[cond_kind], spec))
+        priority = spec.get("priority", "medium")
+        if priority not in PRIORITIES:
+            raise ValueError(f"Alert rule priority must be one of {', '.join(PRIORITIES)}: {spec!r}")
+        return cls(
+            name=spec.get("name") or f"{spec['field']} {kind} {spec[kind]}",
+            field=spec["field"],
+            kind=kind,
+            limit=spec[kind] if kind == "becomes" else _limit(spec[kind], spec),
+            priority=PRIORITIES[priority],
+            message=spec.get("message") or "{course}: {field} {kind} {limit} (now {value})",
+            where=where,
+        )
+
+    @property
+    def fields(self) -> List[str]:
+        return [self.field, *self.where]
+
+    def holds(self, row: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> bool:
+        """
+        Whether the condition is true for `row`, with `previous` as the last run's row.
+        """
+        prev_value = previous.get(self.field) if previous is not None else None
+        if not _compare(self.kind, self.limit, row.get(self.field), prev_value):
+            return False
+        return all(_compare(kind, limit, row.get(other)) for other, (kind, limit) in self.where.items())
+
+    def fires(self, row: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> bool:
+        if not self.holds(row, previous):
+            return False
+        if previous is None or self.kind in ("drop", "rise"):
+            # Deltas are already relative to the last run
+            return True
+        return not self.holds(previous, None)
+
+    def describe(self, row: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> str:
+        value = row.get(self.field)
+        number, prev_number = to_float(value), to_float(previous.get(self.field)) if previous else None
+        values = {
+            "student": row.get("Student Name", ""),
+            "course": row.get("Course Name", ""),
+            "field": self.field,
+            "kind": self.kind,
+            "limit": self.limit,
+            "value": number if number is not None else value,
+            "previous": prev_number if prev_number is not None else (previous or {}).get(self.field, ""),
+            "delta": abs(number - prev_number) if number is not None and prev_number is not None else "",
+            "grade": row.get("Current Grade (%)", ""),
+            "days_left": row.get("Days Left", ""),
+        }
+        try:
+            return self.message.format(**values)
+        except (KeyError, ValueError, IndexError):
+            return f"{values['course']}: {self.name}"
+
+
+@dataclass
+class Alert:
+    student: str
+    course: str
+    rule: str
+    priority: int
+    message: str
+
+
+class AlertEngine:
+    """
+    Evaluates the rules against batches of scraped rows. `previous` looks
+    up the last run's row for a (student, course); without it every row is
+    treated as new.
+    """
+
+    def __init__(self, rules: Iterable[AlertRule], max_per_student: int = 5):
+        self.rules = list(rules)
+        self.max_per_student = max_per_student
+        # Watched field -> indexes of the rules that read it
+        self.by_field: Dict[str, List[int]] = {}
+        for i, rule in enumerate(self.rules):
+            for name in rule.fields:
+                self.by_field.setdefault(name, []).append(i)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["AlertEngine"]:
+        opts = config.get("alerts") or {}
+        if not opts.get("enabled", True):
+            return None
+        rules = opts.get("rules")
+        return cls(
+            [AlertRule.from_dict(spec) for spec in (DEFAULT_RULES if rules is None else rules)],
+            max_per_student=opts.get("max_per_email", 5),
+        )
+
+    def evaluate(self, rows: Iterable[Dict[str, Any]], previous: Optional[PreviousLookup] = None) -> List[Alert]:
+        """
+        Alerts for `rows`, most urgent first (then in row and rule order).
+        """
+        alerts = []
+        for row in rows:
+            prev = previous(row["Student Name"], row["Course Name"]) if previous is not None else None
+            if prev is None:
+                candidates = range(len(self.rules))
+            else:
+                changed = {i for name, indexes in self.by_field.items()
+                           if row.get(name) != prev.get(name) for i in indexes}
+                if not changed:
+                    continue
+                candidates = sorted(changed)
+            for i in candidates:
+                rule = self.rules[i]
+                if rule.fires(row, prev):
+                    alerts.append(Alert(row["Student Name"], row["Course Name"], rule.name,
+                                        rule.priority, rule.describe(row, prev)))
+        alerts.sort(key=lambda a: a.priority)
+        return alerts
+
+    def by_student(self, alerts: Iterable[Alert]) -> Dict[str, List[Alert]]:
+        """
+        Each student's alerts, most urgent first, at most `max_per_student`.
+        """
+        grouped: Dict[str, List[Alert]] = {}
+        for alert in alerts:
+            student_alerts = grouped.setdefault(alert.student, [])
+            if not self.max_per_student or len(student_alerts) < self.max_per_student:
+                student_alerts.append(alert)
+        return grouped
+
+
+def format_alerts(alerts: Iterable[Alert]) -> str:
+    """
+    One line per alert for the email template, "!" marking high priority.
+    """
+    return "\n".join(f"{'!' if a.priority == 0 else '-'} {a.message}" for a in alerts)
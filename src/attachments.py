@@ -0,0 +1,118 @@
+"""
+In-memory report attachments for EmailJS.
+
+Rows are serialized straight into a CSV buffer and base64-encoded once into
+the data URI EmailJS expects, so a report no longer goes through a
+write-to-disk / read-back round trip before it is sent. Writing the CSV to
+``reports/`` is kept as an optional archive step.
+"""
+import base64
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from utils import csv_bytes
+
+
+@dataclass(frozen=True)
+class Attachment:
+    """
+    One encoded report file. `data` is the (possibly gzipped) file content
+    and `data_uri` its base64 data URI, computed once when built.
+    """
+
+    filename: str
+    mime_type: str
+    data: bytes
+    digest: str
+    data_uri: str = field(repr=False)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, filename: str, mime_type: str = "text/csv", digest: str = None) -> "Attachment":
+        encoded = base64.b64encode(data).decode("ascii")
+        return cls(
+            filename=filename,
+            mime_type=mime_type,
+            data=data,
+            digest=digest or hashlib.sha256(data).hexdigest(),
+            data_uri=f"data:{mime_type};base64,{encoded}",
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "Attachment":
+        with open(path, "rb") as f:
+            data = f.read()
+        gzipped = path.endswith(".gz")
+        return cls.from_bytes(data, os.path.basename(path), "application/gzip" if gzipped else "text/csv")
+
+    def archive(self, directory: str) -> str:
+        """
+        Atomically write the attachment to `directory`; returns the path.
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.filename)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".report-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+
+class AttachmentBuilder:
+    """
+    Builds CSV attachments from report rows.
+
+    With `compress` the CSV is gzipped (``<name>.csv.gz``). With `dedupe`
+    identical content is encoded only once per builder (one builder per
+    run), so a report queued again in the same run, such as one student in
+    several digests, reuses the same data URI.
+    """
+
+    def __init__(self, compress: bool = False, dedupe: bool = True):
+        self.compress = compress
+        self.dedupe = dedupe
+        self._cache: Dict[tuple, Attachment] = {}
+        self._lock = threading.Lock()
+        self.built = 0
+        self.reused = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> "AttachmentBuilder":
+        opts = config.get("attachments") or {}
+        return cls(compress=opts.get("gzip", False), dedupe=opts.get("dedupe", True))
+
+    def build(self, rows: List[Dict], name: str) -> Attachment:
+        """
+        Serialize `rows` to a CSV attachment called `name` (without extension).
+        """
+        data = csv_bytes(rows)
+        filename, mime_type = f"{name}.csv", "text/csv"
+        if self.compress:
+            # mtime=0 keeps identical CSVs byte-identical after compression
+            data = gzip.compress(data, mtime=0)
+            filename, mime_type = f"{filename}.gz", "application/gzip"
+        if not self.dedupe:
+            self.built += 1
+            return Attachment.from_bytes(data, filename, mime_type)
+
+        digest = hashlib.sha256(data).hexdigest()
+        key = (filename, digest)
+        with self._lock:
+            cached: Optional[Attachment] = self._cache.get(key)
+            if cached is not None:
+                self.reused += 1
+                return cached
+        attachment = Attachment.from_bytes(data, filename, mime_type, digest)
+        with self._lock:
+            self._cache.setdefault(key, attachment)
+            self.built += 1
+        return attachment
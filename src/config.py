@@ -0,0 +1,175 @@
+"""
+Shared, cached access to the YAML config files.
+
+Every component that needs the config (main, the scraper and scraper pool,
+the emailer setup and the schedulers) goes through ``config_service(path)``
+so a file is parsed once and re-parsed only when its modification time or
+size changes. Newly discovered courses are written back with
+``ConfigService.add_courses``.
+"""
+import os
+import re
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+_COURSES_HEADER = re.compile(r"^courses:\s*(\{\s*\})?\s*(#.*)?$")
+_COURSES_MARKER = "# Add more courses as needed"
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip(" "))
+
+
+def _course_line(name: str, indent: int) -> str:
+    # safe_dump quotes names that would otherwise break the YAML (": ", "#", quotes...)
+    return " " * indent + yaml.safe_dump({name: True}, allow_unicode=True, width=2 ** 16)
+
+
+def add_courses_to_text(text: str, names: Iterable[str]) -> Tuple[str, List[str]]:
+    """
+    Insert `name: true` for each name in `names` into the ``courses:``
+    mapping of the config `text`, keeping all other lines and comments.
+    New entries go above the "# Add more courses as needed" marker, or
+    after the last course. Returns the new text and the names added.
+    """
+    existing = (yaml.safe_load(text) or {}).get("courses") or {}
+    added = sorted(n for n in set(names) if n not in existing)
+    if not added:
+        return text, []
+
+    lines = text.splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+    header = next((i for i, line in enumerate(lines) if _COURSES_HEADER.match(line.rstrip("\n"))), None)
+    if header is None:
+        lines += ["courses:\n"] + [_course_line(n, 2) for n in added]
+        return "".join(lines), added
+
+    # "courses: {}" becomes a block mapping
+    lines[header] = "courses:\n"
+    insert_at = header + 1
+    indent = 2
+    for i in range(header + 1, len(lines)):
+        stripped = lines[i].strip()
+        if not stripped:
+            continue
+        if _indent(lines[i]) == 0 and not stripped.startswith("#"):
+            break
+        if stripped == _COURSES_MARKER:
+            insert_at = i
+            break
+        if not stripped.startswith("#"):
+            indent = _indent(lines[i])
+            insert_at = i + 1
+    lines[insert_at:insert_at] = [_course_line(n, indent) for n in added]
+    return "".join(lines), added
+
+
+def _atomic_write(path: str, text: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".config-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ConfigService:
+    """
+    One YAML config file, parsed on first use and cached until the file's
+    mtime or size changes.
+
+    The dict returned by `get()` is shared by every caller and must be
+    treated as read-only; copy it before changing values for one run.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._lock = threading.RLock()
+        self._config: Optional[Dict[str, Any]] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self.loads = 0
+
+    def _file_stamp(self) -> Tuple[int, int]:
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def get(self) -> Dict[str, Any]:
+        """
+        The parsed config, re-read only if the file changed since the last call.
+        """
+        with self._lock:
+            stamp = self._file_stamp()
+            if self._config is None or stamp != self._stamp:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._config = yaml.safe_load(f) or {}
+                self._stamp = stamp
+                self.loads += 1
+            return self._config
+
+    def changed(self) -> bool:
+        """
+        Whether the file was modified since it was last parsed.
+        """
+        with self._lock:
+            try:
+                return self._stamp is None or self._file_stamp() != self._stamp
+            except OSError:
+                return False
+
+    def add_courses(self, names: Iterable[str]) -> List[str]:
+        """
+        Add each new course name as ``name: true`` to the file's ``courses``
+        section (atomic replace) and to the cached config. Returns the
+        names that were added.
+        """
+        with self._lock:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+            new_text, added = add_courses_to_text(text, names)
+            if not added:
+                return []
+            parsed = yaml.safe_load(new_text) or {}
+            # Never write a file that no longer parses to the same courses
+            if not all((parsed.get("courses") or {}).get(n) is True for n in added):
+                raise ValueError(f"Could not add courses to {self.path}: {', '.join(added)}")
+            _atomic_write(self.path, new_text)
+            if self._config is not None:
+                # Update in place so callers holding the shared dict see the new courses
+                self._config.setdefault("courses", {})
+                if self._config["courses"] is None:
+                    self._config["courses"] = {}
+                self._config["courses"].update((n, True) for n in added)
+                self._stamp = self._file_stamp()
+            return added
+
+
+_services: Dict[str, ConfigService] = {}
+_services_lock = threading.Lock()
+
+
+def config_service(path: str) -> ConfigService:
+    """
+    The process-wide `ConfigService` for `path`.
+    """
+    key = os.path.abspath(path)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = ConfigService(key)
+        return service
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    """
+    Cached parse of the config at `path` (see `ConfigService.get`).
+    """
+    return config_service(path).get()
@@ -0,0 +1,160 @@
+"""
+Compiled course selection and grade rubric.
+
+The ``courses`` checkbox map in config is compiled once per run into a
+`CourseFilter`. Each key is one of:
+
+- an exact course name, compared after normalizing case, whitespace and
+  dashes;
+- a name ending in "..." (how the portal truncates long titles), matching
+  every course that starts with it;
+- a glob such as ``"Algebra 2*"`` or ``"* -- Tinney*"``.
+
+An exact rule wins over a truncated one (the longest prefix first), which
+wins over a glob (first in config order). A card title that the portal
+truncated itself matches the configured courses it is a prefix of. Each
+title is classified once per run and remembered, and only titles that no
+rule matches count as new courses to add to the config.
+
+``grade_rubric`` maps letter grades to their minimum percentage and is
+looked up by bisection.
+"""
+import bisect
+import fnmatch
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_DASHES = str.maketrans({"–": "-", "—": "-", "‒": "-", "−": "-"})
+_ELLIPSES = ("...", "…")
+_GLOB_CHARS = re.compile(r"[*?\[]")
+_DASH_RUNS = re.compile(r"-{2,}")
+
+
+def normalize_course_name(name: str) -> str:
+    """
+    Case-folded name with runs of whitespace collapsed and dashes ("--",
+    en and em dashes) as a single "-".
+    """
+    return " ".join(_DASH_RUNS.sub("-", name.translate(_DASHES)).split()).casefold()
+
+
+def _truncated(name: str) -> Optional[str]:
+    """
+    The prefix before a trailing "..." (normalized), or None if not truncated.
+    """
+    stripped = name.rstrip()
+    for ellipsis in _ELLIPSES:
+        if stripped.endswith(ellipsis):
+            return normalize_course_name(stripped[: -len(ellipsis)])
+    return None
+
+
+class CourseFilter:
+    """
+    `classify(name)` is True/False for a course some rule selects or
+    deselects, and None for a course no rule covers (kept, and reported as
+    missing so it can be added to the config).
+    """
+
+    def __init__(self, courses: Optional[Dict[str, bool]] = None):
+        self.exact: Dict[str, bool] = {}
+        self.prefixes: Dict[str, bool] = {}
+        self.globs: List[Tuple[re.Pattern, bool]] = []
+        for key, include in (courses or {}).items():
+            # Truthiness, as before rules were compiled: 0, "" and an empty value exclude
+            key, include = str(key), bool(include)
+            prefix = _truncated(key)
+            if prefix is not None:
+                self.prefixes.setdefault(prefix, include)
+            elif _GLOB_CHARS.search(key):
+                self.globs.append((re.compile(fnmatch.translate(normalize_course_name(key))), include))
+            else:
+                self.exact.setdefault(normalize_course_name(key), include)
+        # Distinct prefix lengths, longest first: a title needs one dict lookup per length
+        self._prefix_lengths = sorted({len(p) for p in self.prefixes}, reverse=True)
+        # Sorted names for the configured courses a truncated card title can stand for
+        self._names = sorted(set(self.exact) | set(self.prefixes))
+        self._seen: Dict[str, Optional[bool]] = {}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "CourseFilter":
+        return cls(config.get("courses"))
+
+    def classify(self, name: str) -> Optional[bool]:
+        try:
+            return self._seen[name]
+        except KeyError:
+            result = self._seen[name] = self._classify(name)
+            return result
+
+    def _classify(self, name: str) -> Optional[bool]:
+        normalized = normalize_course_name(name)
+        if normalized in self.exact:
+            return self.exact[normalized]
+        prefix = _truncated(name)
+        for length in self._prefix_lengths:
+            if length <= len(normalized) and normalized[:length] in self.prefixes:
+                return self.prefixes[normalized[:length]]
+        if prefix is not None:
+            # The portal cut the title short: match the configured course it begins
+            i = bisect.bisect_left(self._names, prefix)
+            if i < len(self._names) and self._names[i].startswith(prefix):
+                key = self._names[i]
+                return self.exact[key] if key in self.exact else self.prefixes[key]
+        for pattern, include in self.globs:
+            if pattern.match(normalized):
+                return include
+        return None
+
+    def include(self, name: str) -> bool:
+        return self.classify(name) is not False
+
+    def known(self, name: str) -> bool:
+        return self.classify(name) is not None
+
+    def missing(self, names: Iterable[str]) -> List[str]:
+        """
+        The names in `names` that no rule covers, without duplicates.
+        """
+        return list(dict.fromkeys(n for n in names if not self.known(n)))
+
+
+DEFAULT_GRADE_RUBRIC = {"A": 90, "B": 80, "C": 75, "D": 70, "F": 0}
+
+
+class GradeRubric:
+    """
+    Letter grade lookup from a {letter: minimum percentage} map. Grades
+    below the lowest minimum get the lowest letter.
+    """
+
+    def __init__(self, minimums: Optional[Dict[str, float]] = None):
+        minimums = minimums or DEFAULT_GRADE_RUBRIC
+        try:
+            ordered = sorted((float(minimum), str(letter)) for letter, minimum in minimums.items())
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"grade_rubric minimums must be numbers: {minimums!r}") from e
+        self.minimums = [m for m, _letter in ordered]
+        self.letters = [letter for _m, letter in ordered]
+        if len(set(self.minimums)) != len(self.minimums):
+            raise ValueError(f"grade_rubric has two letters with the same minimum: {minimums!r}")
+
+    @classmethod
+    def from_config(cls, config: dict) -> "GradeRubric":
+        return cls(config.get("grade_rubric"))
+
+    def level(self, current_grade) -> str:
+        """
+        Letter grade for a percentage (number or string); "" if not numeric.
+        """
+        try:
+            grade_num = float(current_grade)
+        except (TypeError, ValueError):
+            return ""
+        if math.isnan(grade_num):
+            return ""
+        return self.letters[max(0, bisect.bisect_right(self.minimums, grade_num) - 1)]
+
+
+DEFAULT_RUBRIC = GradeRubric()
@@ -0,0 +1,222 @@
+"""
+Daemon mode: run every scheduled report in its own child process.
+
+The scheduler process only keeps the schedule. Each run is started as
+``main.py now`` in a child process with a wall-clock budget and a cap on the
+RSS of everything the run started, so a hung login or a leaking browser is
+stopped instead of growing the scheduler. Every process a run starts
+(chromedriver, Chrome and its helpers) inherits a ``PORTAL_REPORT_RUN``
+environment marker; once the run is over, anything still carrying its marker
+is killed and reaped, whether the run finished, crashed or was stopped.
+
+Each run's outcome, peak memory and the scheduler's own RSS are printed and
+appended to a JSON-lines log, so the host's memory can be followed over time.
+"""
+import ctypes
+import json
+import os
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from procutil import descendants, pids_with_env, rss_bytes, zombie_children
+
+RUN_MARKER = "PORTAL_REPORT_RUN"
+_PR_SET_CHILD_SUBREAPER = 36
+_MB = 1024 * 1024
+
+
+def become_subreaper() -> bool:
+    """
+    Have orphaned descendants (e.g. a Chrome whose chromedriver crashed)
+    reparented to this process instead of init, so they are reaped here.
+    Linux only; returns whether it took effect.
+    """
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.prctl(_PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+@dataclass
+class RunOutcome:
+    run_id: str
+    command: List[str]
+    started: str
+    seconds: float
+    returncode: Optional[int]
+    peak_rss_mb: float
+    # "timeout" or "memory" when the run was stopped
+    killed: Optional[str] = None
+    leftover_processes: int = 0
+    scheduler_rss_mb: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.killed is None and self.returncode == 0
+
+
+class IsolatedRunner:
+    """
+    Callable job for the schedulers: ``runner(*args)`` runs
+    ``command(*args)`` in a child process and returns a `RunOutcome`.
+
+    The run is stopped after `timeout` seconds or once its processes use
+    more than `max_rss_mb` together (0 disables either limit). Stopping sends
+    SIGTERM, then SIGKILL after `grace` seconds.
+    """
+
+    def __init__(
+        self,
+        command: Callable[..., List[str]],
+        timeout: float = 3600,
+        max_rss_mb: float = 2048,
+        poll_interval: float = 1.0,
+        grace: float = 10,
+        log_path: Optional[str] = None,
+    ):
+        self.command = command
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self.poll_interval = poll_interval
+        self.grace = grace
+        self.log_path = log_path
+        # Children still being waited for by some run; never reaped by another run
+        self._active = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, command: Callable[..., List[str]], config: dict) -> "IsolatedRunner":
+        opts = config.get("daemon") or {}
+        log_path = opts.get("log", "reports/metrics/daemon_runs.jsonl")
+        if log_path and not os.path.isabs(log_path):
+            log_path = os.path.join(os.path.dirname(__file__), "..", log_path)
+        return cls(
+            command,
+            timeout=opts.get("timeout", 3600),
+            max_rss_mb=opts.get("max_rss_mb", 2048),
+            poll_interval=opts.get("poll_interval", 1.0),
+            grace=opts.get("grace", 10),
+            log_path=log_path,
+        )
+
+    def __call__(self, *args) -> RunOutcome:
+        argv = self.command(*args)
+        run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        started_at = datetime.now()
+        started = time.monotonic()
+        proc = subprocess.Popen(argv, env=dict(os.environ, **{RUN_MARKER: run_id}), start_new_session=True)
+        with self._lock:
+            self._active.add(proc.pid)
+        peak, killed = 0, None
+        try:
+            while proc.poll() is None:
+                current = self.run_rss_bytes(proc.pid, run_id)
+                peak = max(peak, current)
+                if self.max_rss_mb and current > self.max_rss_mb * _MB:
+                    killed = "memory"
+                elif self.timeout and time.monotonic() - started > self.timeout:
+                    killed = "timeout"
+                if killed:
+                    self._stop(proc)
+                    break
+                try:
+                    proc.wait(self.poll_interval)
+                except subprocess.TimeoutExpired:
+                    pass
+        except BaseException:
+            self._stop(proc)
+            raise
+        finally:
+            with self._lock:
+                self._active.discard(proc.pid)
+            leftovers = self.reap(run_id)
+
+        outcome = RunOutcome(
+            run_id=run_id,
+            command=argv,
+            started=started_at.isoformat(timespec="seconds"),
+            seconds=round(time.monotonic() - started, 3),
+            returncode=proc.returncode,
+            peak_rss_mb=round(peak / _MB, 1),
+            killed=killed,
+            leftover_processes=leftovers,
+            scheduler_rss_mb=round(rss_bytes(os.getpid()) / _MB, 1),
+        )
+        self._report(outcome)
+        return outcome
+
+    @staticmethod
+    def run_rss_bytes(pid: int, run_id: str) -> int:
+        """
+        RSS of the run's process tree plus any marked process that left it.
+        """
+        pids = {pid, *descendants(pid), *pids_with_env(RUN_MARKER, run_id)}
+        pids.discard(os.getpid())
+        return sum(rss_bytes(p) for p in pids)
+
+    def _stop(self, proc: subprocess.Popen):
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(proc.pid, sig)
+            except (ProcessLookupError, PermissionError):
+                pass
+            try:
+                proc.wait(self.grace)
+                return
+            except subprocess.TimeoutExpired:
+                continue
+        proc.wait()
+
+    def reap(self, run_id: str) -> int:
+        """
+        Kill whatever the run left running and collect the exited processes
+        that were reparented here. Returns how many processes were left over.
+        """
+        me = os.getpid()
+        leftovers = [p for p in pids_with_env(RUN_MARKER, run_id) if p != me]
+        remaining = list(leftovers)
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            for pid in remaining:
+                try:
+                    os.kill(pid, sig)
+                except (ProcessLookupError, PermissionError):
+                    pass
+            deadline = time.monotonic() + self.grace
+            while remaining and time.monotonic() < deadline:
+                time.sleep(0.1)
+                # Exited processes no longer expose their environment
+                remaining = [p for p in pids_with_env(RUN_MARKER, run_id) if p != me]
+            if not remaining:
+                break
+        with self._lock:
+            for pid in zombie_children(me):
+                if pid in self._active:
+                    continue
+                try:
+                    os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    pass
+        return len(leftovers)
+
+    def _report(self, outcome: RunOutcome):
+        if outcome.killed:
+            status = f"stopped ({'over the memory cap' if outcome.killed == 'memory' else 'over the time budget'})"
+        else:
+            status = f"exited with code {outcome.returncode}"
+        print(f"Run {outcome.run_id} {status} after {outcome.seconds:.0f}s; peak RSS {outcome.peak_rss_mb:.0f} MB, "
+              f"{outcome.leftover_processes} leftover process(es) reaped, scheduler RSS {outcome.scheduler_rss_mb:.0f} MB")
+        if not self.log_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(outcome)) + "\n")
+        except OSError as e:
+            print(f"Could not write the daemon run log: {e}")
@@ -0,0 +1,262 @@
+"""
+Offline parser for FEDashboard.aspx course cards.
+
+Works on a page's HTML source (``driver.page_source`` or a saved file), so a
+whole student tab is parsed in one pass instead of one WebDriver round-trip
+per field. Produces the same row dicts as ``DashboardScraper``.
+
+Usage:
+    python src/dashboard_parser.py saved_dashboard.html --student "Noah Cooksey" [--csv out.csv] [--repeat 100]
+"""
+import datetime
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from lxml import html as lxml_html
+
+from course_filter import DEFAULT_RUBRIC, CourseFilter, GradeRubric
+from metrics import metrics
+from utils import CSV_HEADER
+
+
+def _has_classes(*classes: str) -> str:
+    return " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')" for c in classes
+    )
+
+
+# XPath equivalents of the selectors used by the WebDriver scraper
+CARD_XPATH = f"//div[{_has_classes('col-lg-4', 'col-xl-4', 'mb-3')}]"
+TITLE_XPATH = f".//*[{_has_classes('card-title')}]"
+PERIOD_XPATH = f".//small[{_has_classes('text-muted')}]"
+GRADE_XPATH = f".//*[{_has_classes('card-grade')}]"
+ACTUAL_XPATH = ".//span[contains(@class,'progress-mark-tooltip-label') and contains(text(), 'Actual')]/following-sibling::span//label"
+EXPECTED_XPATH = (
+    ".//span[contains(@class, 'progress-mark-tooltip expected')]"
+    "/span[contains(@class, 'progress-mark-tooltip-container')]"
+    "/span[contains(@class, 'progress-mark-tooltip-content')]"
+)
+MINUTES_XPATH = './/div[contains(@class, "text-right") and contains(., "min")]'
+DAYS_XPATH = './/div[contains(@class,"align-self-center")][contains(., "left")]'
+
+
+def grade_level(current_grade: str, rubric: Optional[GradeRubric] = None) -> str:
+    """
+    Letter grade for a percentage string, per `rubric` (default: the school
+    rubric); "" if not numeric.
+    """
+    return (rubric or DEFAULT_RUBRIC).level(current_grade)
+
+
+def parse_actual(actual_text: str) -> Tuple[str, str]:
+    """
+    "2 of 40" -> ("2", "40"): completed and total assignments.
+    """
+    actual_text = actual_text.strip()
+    if "of" in actual_text:
+        completed, total = [s.strip() for s in actual_text.split("of", 1)]
+        return completed, total
+    return actual_text, ""
+
+
+def parse_expected(expected_text: str) -> str:
+    """
+    "10 of 40" -> "10": expected assignments to date.
+    """
+    expected_text = expected_text.strip()
+    if "of" in expected_text:
+        return expected_text.split("of")[0].strip()
+    return expected_text
+
+
+def overdue(expected_assignments: str, completed_assignments: str) -> str:
+    try:
+        return str(int(expected_assignments) - int(completed_assignments))
+    except (TypeError, ValueError):
+        return ""
+
+
+def report_date_today() -> str:
+    return datetime.datetime.now().strftime("%-m/%-d/%Y")
+
+
+def _text(elem) -> str:
+    # Collapse whitespace the way the browser renders element text
+    return " ".join(elem.text_content().split())
+
+
+def _first_text(card, xpath: str) -> Optional[str]:
+    found = card.xpath(xpath)
+    return _text(found[0]) if found else None
+
+
+def load_cards(page_source: str) -> List[Any]:
+    """
+    Parse `page_source` and return its course card elements in page order.
+    """
+    if not page_source or not page_source.strip():
+        return []
+    return lxml_html.fromstring(page_source).xpath(CARD_XPATH)
+
+
+# Bump whenever parse_card's output changes (a parsing fix, a new field), so
+# snapshot rows from an older parser are not reused for unchanged cards
+PARSER_VERSION = 2
+_FINGERPRINT_PREFIX = f"{PARSER_VERSION}|{','.join(CSV_HEADER)}|".encode("utf-8")
+
+
+def card_fingerprint(card) -> str:
+    """
+    Hash of the card's raw HTML, the parser version and the CSV columns;
+    identical cards produce identical rows.
+    """
+    return hashlib.sha1(_FINGERPRINT_PREFIX + lxml_html.tostring(card)).hexdigest()
+
+
+def card_course_name(card) -> Optional[str]:
+    return _first_text(card, TITLE_XPATH)
+
+
+def parse_card(
+    card,
+    student_name: str,
+    report_date: str,
+    course_name: Optional[str] = None,
+    rubric: Optional[GradeRubric] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Build the CSV row for one course card, or None if the card is incomplete.
+    """
+    if course_name is None:
+        course_name = card_course_name(card)
+    course_period = _first_text(card, PERIOD_XPATH)
+    if course_name is None or course_period is None:
+        metrics.incr("cards_skipped", reason="incomplete")
+        return None
+
+    current_grade = _first_text(card, GRADE_XPATH)
+    current_grade = current_grade.replace("%", "").replace(" ", "").strip() if current_grade is not None else ""
+
+    actual_text = _first_text(card, ACTUAL_XPATH)
+    completed_assignments, actual_assignments = parse_actual(actual_text) if actual_text is not None else ("", "")
+
+    expected_text = _first_text(card, EXPECTED_XPATH)
+    if expected_text is None:
+        print(f"[ERROR] Failed to get expected_assignments for {course_name!r}")
+        metrics.incr("cards_skipped", reason="no_expected")
+        return None
+    expected_assignments = parse_expected(expected_text)
+
+    minutes_text = _first_text(card, MINUTES_XPATH)
+    days_text = _first_text(card, DAYS_XPATH)
+
+    return {
+        "Student Name": student_name,
+        "Course Name": course_name,
+        "Course Period": course_period,
+        "Current Grade (%)": current_grade,
+        "Current Grade Level": grade_level(current_grade, rubric),
+        "Total Assignments": actual_assignments,
+        "Expected Assignments": expected_assignments,
+        "Completed Assignments": completed_assignments,
+        "Overdue Assignments": overdue(expected_assignments, completed_assignments),
+        "Minutes Spent": minutes_text.replace("min", "").strip() if minutes_text is not None else "",
+        "Days Left": days_text.replace("left", "").replace("d", "").strip() if days_text is not None else "",
+        "Class Status": "Active",
+        "Report Date": report_date,
+    }
+
+
+def parse_dashboard_html(
+    page_source: str,
+    student_name: str,
+    courses: Union[CourseFilter, Dict[str, bool], None] = None,
+    report_date: Optional[str] = None,
+    snapshots=None,
+    rubric: Optional[GradeRubric] = None,
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Extract every course card row for one student tab.
+
+    `courses` is a `CourseFilter` (or the config's checkbox map, compiled
+    on the spot): deselected courses are skipped and names no rule covers
+    are returned as the second element so the caller can add them to the
+    config. With `courses=None` every card is kept. `rubric` sets the
+    letter grades (default: the school rubric).
+
+    If a `SnapshotStore` is given, cards whose HTML is unchanged since the
+    last run reuse the stored row instead of being parsed again.
+    """
+    report_date = report_date or report_date_today()
+    if courses is not None and not isinstance(courses, CourseFilter):
+        courses = CourseFilter(courses)
+    rows = []
+    missing_courses = []
+    for card in load_cards(page_source):
+        course_name = card_course_name(card)
+        if course_name is None:
+            metrics.incr("cards_skipped", reason="incomplete")
+            continue
+        if courses is not None:
+            include = courses.classify(course_name)
+            if include is None:
+                missing_courses.insert(0, course_name)
+            elif not include:
+                metrics.incr("cards_filtered")
+                continue
+        row = None
+        if snapshots is not None:
+            row = snapshots.reuse_card(student_name, course_name, card_fingerprint(card), report_date)
+            if row is not None:
+                # The rubric may have changed since the row was stored
+                row["Current Grade Level"] = grade_level(row.get("Current Grade (%)", ""), rubric)
+                metrics.incr("cards_reused")
+        if row is None:
+            row = parse_card(card, student_name, report_date, course_name, rubric)
+            if row is not None:
+                metrics.incr("cards_parsed")
+        if row is not None:
+            rows.append(row)
+    return rows, missing_courses
+
+
+def _iter_files(paths: Iterable[str]):
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            yield path, f.read()
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    import os
+    import time
+
+    from utils import write_csv
+
+    parser = argparse.ArgumentParser(description="Parse saved FEDashboard HTML files without a browser.")
+    parser.add_argument("html_files", nargs="+", help="Saved dashboard page(s) for one student tab each")
+    parser.add_argument("--student", help="Student name (defaults to the file name)")
+    parser.add_argument("--csv", help="Write all parsed rows to this CSV file")
+    parser.add_argument("--repeat", type=int, default=1, help="Parse each file N times and report timing")
+    args = parser.parse_args(argv)
+
+    all_rows = []
+    for path, source in _iter_files(args.html_files):
+        student = args.student or os.path.splitext(os.path.basename(path))[0].replace("_", " ")
+        started = time.perf_counter()
+        for _ in range(max(1, args.repeat)):
+            rows, _missing = parse_dashboard_html(source, student)
+        elapsed = (time.perf_counter() - started) / max(1, args.repeat)
+        print(f"{path}: {len(rows)} rows in {elapsed * 1000:.2f} ms per parse")
+        all_rows.extend(rows)
+
+    if args.csv:
+        write_csv(all_rows, args.csv)
+        print(f"Wrote {len(all_rows)} rows to {args.csv}")
+    else:
+        for row in all_rows:
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
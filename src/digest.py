@@ -0,0 +1,111 @@
+"""
+Digest emails: one email per recipient covering all of their students.
+
+``emails`` maps each student to their recipients. In digest mode that
+mapping is inverted, and recipients who follow exactly the same students
+share one EmailJS call. Each digest carries every student's summary in the
+template variables and one merged CSV with all of their rows, so a parent
+of two children (or a staff account following many students) gets a single
+email instead of one per child.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from aggregate import StudentSummary
+
+
+def recipients_by_student_set(emails: Dict[str, List[str]], students: Iterable[str]) -> Dict[tuple, List[str]]:
+    """
+    Group recipients by the exact set of `students` they follow: ordered
+    student tuple -> recipients. Addresses are matched case-insensitively.
+    """
+    order = {name: i for i, name in enumerate(students)}
+    followed: Dict[str, List[str]] = {}
+    display: Dict[str, str] = {}
+    for student_name, recipients in (emails or {}).items():
+        if student_name not in order:
+            continue
+        for address in recipients or []:
+            key = address.strip().lower()
+            display.setdefault(key, address.strip())
+            if student_name not in followed.setdefault(key, []):
+                followed[key].append(student_name)
+    groups: Dict[tuple, List[str]] = {}
+    for key, names in followed.items():
+        groups.setdefault(tuple(sorted(names, key=order.get)), []).append(display[key])
+    return groups
+
+
+@dataclass
+class Digest:
+    recipients: List[str]
+    summaries: List[StudentSummary] = field(default_factory=list)
+
+    @property
+    def students(self) -> List[str]:
+        return [s.student_name for s in self.summaries]
+
+    @property
+    def rows(self) -> List[dict]:
+        return [row for s in self.summaries for row in s.rows]
+
+    @property
+    def name(self) -> str:
+        """
+        Attachment name (without extension) for the merged CSV.
+        """
+        names = [s.replace(" ", "_") for s in self.students]
+        if len(names) <= 3:
+            return "_".join(names)
+        return f"{names[0]}_and_{len(names) - 1}_more"
+
+    def template_params(self) -> Dict[str, str]:
+        """
+        The per-student template variables, combined with a heading per student.
+        """
+        def sections(text_of) -> str:
+            parts = [f"{s.student_name}\n{text_of(s)}" for s in self.summaries if text_of(s)]
+            return "\n\n".join(parts)
+
+        return {
+            "grade_summary": sections(lambda s: s.grade_summary),
+            "total_assignments": str(sum(s.total_expected for s in self.summaries)),
+            "total_past_due": str(sum(s.total_overdue for s in self.summaries)),
+            "at_risk": sections(lambda s: s.at_risk_summary),
+            "alerts": sections(lambda s: s.alerts_summary),
+        }
+
+
+class DigestQueue:
+    """
+    Collects student summaries during a run and groups them into digests
+    once every student is known.
+    """
+
+    def __init__(self, emails: Dict[str, List[str]], send_only_on_change: bool = False):
+        self.emails = emails or {}
+        self.send_only_on_change = send_only_on_change
+        self.summaries: Dict[str, StudentSummary] = {}
+        self.changed: set = set()
+
+    def add(self, summary: StudentSummary, changed: Optional[Dict[str, List[str]]] = None):
+        """
+        `changed` is the student -> changed courses map when change detection is on.
+        """
+        self.summaries[summary.student_name] = summary
+        if changed is None or summary.student_name in changed:
+            self.changed.add(summary.student_name)
+
+    def digests(self) -> List[Digest]:
+        groups = recipients_by_student_set(self.emails, self.summaries)
+        result = []
+        for students, recipients in groups.items():
+            if self.send_only_on_change and not self.changed.intersection(students):
+                print(f"No changes for students: {', '.join(students)}, skipping digest to {', '.join(recipients)}.")
+                continue
+            result.append(Digest(recipients, [self.summaries[s] for s in students]))
+        followed = {s for students in groups for s in students}
+        for student_name in self.summaries:
+            if student_name not in followed:
+                print(f"No emails found for student: {student_name}, skipping email.")
+        return result
@@ -0,0 +1,169 @@
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+from attachments import Attachment
+from emailer import EmailJSClient
+from metrics import metrics
+
+# Status codes worth retrying: 0 is a network error reported by EmailJSClient.
+TRANSIENT_STATUSES = {0, 408, 425, 429, 500, 502, 503, 504}
+# Longest Retry-After worth waiting for; a longer one ends the retries.
+MAX_RETRY_AFTER = 300.0
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket allowing `rate` acquisitions per second with
+    bursts of up to `burst`. A rate of 0 or less disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass
+class DispatchResult:
+    """
+    Outcome of one queued email send.
+    """
+
+    student_name: str
+    recipients: List[str]
+    status: int = 0
+    response: str = ""
+    attempts: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and self.error is None
+
+
+@dataclass
+class _Job:
+    report: Union[str, Attachment]
+    recipients: List[str]
+    student_name: str
+    template_params: dict = field(default_factory=dict)
+
+
+class EmailDispatcher:
+    """
+    Queues per-student report emails and runs them on a bounded
+    thread pool, throttled by a shared rate limiter so the account stays
+    under the EmailJS request quota. Transient failures are retried with
+    exponential backoff, waiting at least as long as a Retry-After header
+    asks.
+    """
+
+    def __init__(
+        self,
+        client: EmailJSClient,
+        max_workers: int = 4,
+        requests_per_second: float = 1.0,
+        max_retries: int = 3,
+        retry_backoff: float = 2.0,
+    ):
+        self.client = client
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        self.limiter = RateLimiter(requests_per_second)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="emailjs")
+        self._futures: List[Future] = []
+
+    @classmethod
+    def from_config(cls, client: EmailJSClient, config: dict) -> "EmailDispatcher":
+        opts = config.get("dispatch") or {}
+        return cls(
+            client,
+            max_workers=opts.get("max_workers", 4),
+            requests_per_second=opts.get("requests_per_second", 1.0),
+            max_retries=opts.get("max_retries", 3),
+            retry_backoff=opts.get("retry_backoff", 2.0),
+        )
+
+    def submit(self, report: Union[str, Attachment], recipients: List[str], student_name: str = "", **template_params) -> Future:
+        """
+        Queue one email; returns a future resolving to a `DispatchResult`.
+        `report` is a prebuilt `Attachment` or the path of a CSV on disk.
+        """
+        job = _Job(report, list(recipients), student_name, template_params)
+        future = self._executor.submit(self._run, job)
+        self._futures.append(future)
+        return future
+
+    def join(self) -> List[DispatchResult]:
+        """
+        Wait for every queued email and return their results in submit order.
+        """
+        futures, self._futures = self._futures, []
+        return [f.result() for f in futures]
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self, job: _Job) -> DispatchResult:
+        result = DispatchResult(job.student_name, job.recipients)
+        started = time.monotonic()
+        while True:
+            self.limiter.acquire()
+            result.attempts += 1
+            try:
+                if isinstance(job.report, Attachment):
+                    send = self.client.send_report
+                else:
+                    send = self.client.send_csv_report
+                result.status, result.response = send(
+                    job.report, job.recipients, job.student_name, **job.template_params
+                )
+                result.error = None
+            except Exception as e:
+                # Local failures (e.g. unreadable CSV) will not fix themselves.
+                result.status, result.error = 0, f"{type(e).__name__}: {e}"
+                break
+            if result.status not in TRANSIENT_STATUSES or result.attempts > self.max_retries:
+                break
+            delay = self.retry_backoff * (2 ** (result.attempts - 1))
+            delay += random.uniform(0, delay / 2)
+            retry_after = getattr(self.client, "retry_after", None)
+            if retry_after is not None:
+                if retry_after > MAX_RETRY_AFTER:
+                    break
+                delay = max(delay, retry_after)
+            time.sleep(delay)
+        if not result.ok and result.error is None:
+            result.error = f"STATUS:{result.status} {result.response}".strip()
+        result.elapsed = time.monotonic() - started
+        metrics.incr("emails_sent" if result.ok else "emails_failed")
+        if result.attempts > 1:
+            metrics.incr("email_retries", result.attempts - 1)
+        return result
@@ -1,24 +1,100 @@
 import requests
-import base64
-from typing import List
+import json
+from typing import List, Optional, Tuple
 import os
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import threading
 import time
 import tempfile
+from email.utils import parsedate_to_datetime
+
+from attachments import Attachment
+from metrics import metrics
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delay-seconds or an HTTP
+    date), or None when it is missing or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
 
 class EmailJSClient:
     """
     Sends emails with CSV reports using the EmailJS REST API.
+
+    The default "http" transport POSTs the payload straight to ``API_URL`` over
+    a keep-alive ``requests.Session`` that is reused across sends. The legacy
+    "browser" transport (headless Chrome running ``fetch``) is kept as an
+    opt-in fallback for accounts that only accept browser-originated calls.
     """
 
     API_URL = "https://api.emailjs.com/api/v1.0/email/send"
+    TRANSPORTS = ("http", "browser")
 
-    def __init__(self, service_id: str, template_id: str, public_key: str):
+    def __init__(
+        self,
+        service_id: str,
+        template_id: str,
+        public_key: str,
+        transport: str = "http",
+        timeout: float = 30,
+        api_url: str = None,
+    ):
+        if transport not in self.TRANSPORTS:
+            raise ValueError(f"Unknown EmailJS transport: {transport!r} (expected one of {self.TRANSPORTS})")
         self.service_id = service_id
         self.template_id = template_id
         self.public_key = public_key
+        self.transport = transport
+        self.timeout = timeout
+        if api_url:
+            # e.g. a local stand-in endpoint for benchmarks and load tests
+            self.API_URL = api_url
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Lazily created HTTP session; its connection pool keeps the TLS
+        connection to EmailJS alive between sends. Each thread gets its own
+        session so the client can be shared by a dispatcher worker pool.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({"Content-Type": "application/json"})
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    @property
+    def retry_after(self) -> Optional[float]:
+        """
+        Seconds EmailJS asked this thread's last send to wait before trying
+        again (its Retry-After header on a 429 or 503), or None.
+        """
+        return getattr(self._local, "retry_after", None)
+
+    def close(self):
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
 
     def send_csv_report(
         self,
@@ -27,18 +103,48 @@ class EmailJSClient:
         student_name: str = "",
         grade_summary: str = None,
         total_assignments: str = None,
-        total_past_due: str = None
-    ):
-        # Read and encode CSV as base64
-        with open(csv_path, "rb") as f:
-            csv_bytes = f.read()
-            csv_b64 = base64.b64encode(csv_bytes).decode("utf-8")
+        total_past_due: str = None,
+        at_risk: str = None,
+        alerts: str = None
+    ) -> Tuple[int, str]:
+        """
+        Send the CSV at `csv_path` to `recipients`.
 
+        Returns the HTTP status code and response body from EmailJS. Network
+        failures are reported as status 0 with the error text as the body.
+        """
+        return self.send_report(
+            Attachment.from_file(csv_path),
+            recipients,
+            student_name,
+            grade_summary=grade_summary,
+            total_assignments=total_assignments,
+            total_past_due=total_past_due,
+            at_risk=at_risk,
+            alerts=alerts
+        )
+
+    def send_report(
+        self,
+        attachment: Attachment,
+        recipients: List[str],
+        student_name: str = "",
+        grade_summary: str = None,
+        total_assignments: str = None,
+        total_past_due: str = None,
+        at_risk: str = None,
+        alerts: str = None
+    ) -> Tuple[int, str]:
+        """
+        Send an already encoded report `attachment` to `recipients`; same
+        return value as `send_csv_report`.
+        """
         # Prepare template_params
         template_params = {
             "email": ",".join(recipients),
             "student_name": student_name,
-            "csv_content": f"data:text/csv;base64,{csv_b64}"
+            "csv_content": attachment.data_uri,
+            "attachment_name": attachment.filename
         }
         if grade_summary is not None:
             template_params["grade_summary"] = grade_summary
@@ -46,9 +152,10 @@ class EmailJSClient:
             template_params["total_assignments"] = total_assignments
         if total_past_due is not None:
             template_params["total_past_due"] = total_past_due
-
-        # Use the CSV filename for the attachment
-        csv_filename = os.path.basename(csv_path)
+        if at_risk is not None:
+            template_params["at_risk"] = at_risk
+        if alerts is not None:
+            template_params["alerts"] = alerts
 
         payload = {
             "service_id": self.service_id,
@@ -57,13 +164,40 @@ class EmailJSClient:
             "template_params": template_params,
         }
 
+        self._local.retry_after = None
+        with metrics.span("email_send"):
+            if self.transport == "browser":
+                status, text = self._send_via_browser(payload)
+            else:
+                status, text = self._send_via_http(payload)
+        metrics.incr("emailjs_requests", status=status)
+
+        if status == 200:
+            print(f"Email sent to {','.join(recipients)}")
+        else:
+            print(f"Failed to send email to {','.join(recipients)}: STATUS:{status} {text}")
+        return status, text
+
+    def _send_via_http(self, payload: dict) -> Tuple[int, str]:
+        try:
+            # bytes, not str: http.client then sends headers and body in one write
+            resp = self.session.post(self.API_URL, data=json.dumps(payload).encode("utf-8"), timeout=self.timeout)
+        except requests.RequestException as e:
+            return 0, str(e)
+        self._local.retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+        return resp.status_code, resp.text
+
+    def _send_via_browser(self, payload: dict) -> Tuple[int, str]:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
         # Use Selenium to send the POST request via browser JS
         html_content = f"""
         <html>
         <body>
         <script>
         async function sendEmail() {{
-            const payload = {payload};
+            const payload = {json.dumps(payload)};
             try {{
                 const resp = await fetch("{self.API_URL}", {{
                     method: "POST",
@@ -99,10 +233,14 @@ class EmailJSClient:
             driver.get("file://" + temp_html_path)
             time.sleep(5)  # Wait for JS to execute
             result = driver.find_element("tag name", "body").text
-            if result.startswith("STATUS:200"):
-                print(f"Email sent to {','.join(recipients)}")
-            else:
-                print(f"Failed to send email to {','.join(recipients)}: {result}")
         finally:
             driver.quit()
             os.remove(temp_html_path)
+
+        if result.startswith("STATUS:"):
+            head, _, text = result.partition("\n")
+            try:
+                return int(head[len("STATUS:"):]), text
+            except ValueError:
+                pass
+        return 0, result
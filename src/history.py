@@ -0,0 +1,202 @@
+"""
+Historical grade store: every run's rows appended to a typed SQLite table,
+with queries for per-course grade trajectories and week-over-week changes.
+
+Usage:
+    python src/history.py trend "Noah Cooksey" "Algebra 2 with Workshop OL v4.1 A -- Tinney, Gina"
+    python src/history.py weekly "Noah Cooksey" [--as-of 2025-11-02]
+"""
+import datetime
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils import parse_report_date, to_float, to_int
+
+# Rows are clustered on (student, course, report_date), so a trajectory or a
+# point-in-time lookup is a single index range scan however long the history.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS grades (
+    student TEXT NOT NULL,
+    course TEXT NOT NULL,
+    report_date TEXT NOT NULL,
+    period TEXT,
+    grade REAL,
+    grade_level TEXT,
+    total_assignments INTEGER,
+    expected_assignments INTEGER,
+    completed_assignments INTEGER,
+    overdue_assignments INTEGER,
+    minutes_spent INTEGER,
+    days_left INTEGER,
+    class_status TEXT,
+    PRIMARY KEY (student, course, report_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_grades_date ON grades (report_date, student);
+"""
+
+_COLUMNS = (
+    "student", "course", "report_date", "period", "grade", "grade_level",
+    "total_assignments", "expected_assignments", "completed_assignments",
+    "overdue_assignments", "minutes_spent", "days_left", "class_status",
+)
+
+
+def _record(row: Dict[str, Any]) -> Optional[tuple]:
+    report_date = parse_report_date(row.get("Report Date", ""))
+    if report_date is None:
+        return None
+    return (
+        row["Student Name"],
+        row["Course Name"],
+        report_date.isoformat(),
+        row.get("Course Period") or None,
+        to_float(row.get("Current Grade (%)")),
+        row.get("Current Grade Level") or None,
+        to_int(row.get("Total Assignments")),
+        to_int(row.get("Expected Assignments")),
+        to_int(row.get("Completed Assignments")),
+        to_int(row.get("Overdue Assignments")),
+        to_int(row.get("Minutes Spent")),
+        to_int(row.get("Days Left")),
+        row.get("Class Status") or None,
+    )
+
+
+def _iso(day) -> Optional[str]:
+    if day is None:
+        return None
+    return day.isoformat() if isinstance(day, datetime.date) else str(day)
+
+
+class GradeHistory:
+    """
+    Append-only (per report date) store of scraped rows with numeric
+    grade, assignment and minutes columns.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["GradeHistory"]:
+        opts = config.get("history") or {}
+        if not opts.get("enabled", True):
+            return None
+        path = opts.get("path", "reports/history.sqlite3")
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(__file__), "..", path)
+        return cls(path)
+
+    def close(self):
+        self.conn.close()
+
+    def append(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Store a run's rows. Re-running on the same day replaces that day's
+        values rather than duplicating them. Returns the number of rows stored.
+        """
+        records = [r for r in map(_record, rows) if r is not None]
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO grades ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                records,
+            )
+        return len(records)
+
+    def students(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT student FROM grades ORDER BY student")]
+
+    def course_trajectory(
+        self,
+        student: str,
+        course: str,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Daily snapshots of one course, oldest first, optionally limited to
+        the inclusive [start, end] date range.
+        """
+        sql = "SELECT * FROM grades WHERE student = ? AND course = ?"
+        params: List[Any] = [student, course]
+        if start is not None:
+            sql += " AND report_date >= ?"
+            params.append(_iso(start))
+        if end is not None:
+            sql += " AND report_date <= ?"
+            params.append(_iso(end))
+        sql += " ORDER BY report_date"
+        return [dict(r) for r in self.conn.execute(sql, params)]
+
+    def week_over_week(self, student: str, as_of: Optional[datetime.date] = None) -> List[Dict[str, Any]]:
+        """
+        For each of the student's courses, compare the latest snapshot on or
+        before `as_of` (default: today) with the latest one at least seven days
+        earlier. Deltas are None when either side has no numeric value.
+        """
+        as_of = as_of or datetime.date.today()
+        week_ago = as_of - datetime.timedelta(days=7)
+        sql = """
+            SELECT c.course,
+                   cur.report_date AS report_date, cur.grade AS grade,
+                   cur.overdue_assignments AS overdue, cur.minutes_spent AS minutes,
+                   prev.report_date AS prev_report_date, prev.grade AS prev_grade,
+                   prev.overdue_assignments AS prev_overdue, prev.minutes_spent AS prev_minutes
+            FROM (SELECT DISTINCT course FROM grades WHERE student = :student) AS c
+            JOIN grades AS cur
+              ON cur.student = :student AND cur.course = c.course
+             AND cur.report_date = (SELECT MAX(report_date) FROM grades
+                                    WHERE student = :student AND course = c.course AND report_date <= :as_of)
+            LEFT JOIN grades AS prev
+              ON prev.student = :student AND prev.course = c.course
+             AND prev.report_date = (SELECT MAX(report_date) FROM grades
+                                     WHERE student = :student AND course = c.course AND report_date <= :week_ago)
+            ORDER BY c.course
+        """
+        params = {"student": student, "as_of": _iso(as_of), "week_ago": _iso(week_ago)}
+        result = []
+        for r in self.conn.execute(sql, params):
+            item = dict(r)
+            for field, prev in (("grade", "prev_grade"), ("overdue", "prev_overdue"), ("minutes", "prev_minutes")):
+                a, b = item[field], item[prev]
+                item[f"{field}_delta"] = round(a - b, 2) if a is not None and b is not None else None
+            result.append(item)
+        return result
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the historical grade store.")
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(__file__), "../reports/history.sqlite3"))
+    sub = parser.add_subparsers(dest="command", required=True)
+    trend = sub.add_parser("trend", help="Grade trajectory for one course")
+    trend.add_argument("student")
+    trend.add_argument("course")
+    weekly = sub.add_parser("weekly", help="Week-over-week changes for a student")
+    weekly.add_argument("student")
+    weekly.add_argument("--as-of", type=datetime.date.fromisoformat)
+    args = parser.parse_args(argv)
+
+    history = GradeHistory(args.db)
+    try:
+        if args.command == "trend":
+            for r in history.course_trajectory(args.student, args.course):
+                print(f"{r['report_date']}  grade={r['grade']}  overdue={r['overdue_assignments']}  minutes={r['minutes_spent']}")
+        else:
+            for r in history.week_over_week(args.student, args.as_of):
+                print(f"{r['course']}: grade {r['prev_grade']} -> {r['grade']} ({r['grade_delta']}), "
+                      f"overdue {r['prev_overdue']} -> {r['overdue']} ({r['overdue_delta']})")
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Run journal: each emailing run checkpointed to SQLite so a failed run can be
+finished with ``python src/main.py resume`` instead of starting over.
+
+A run records its scraped rows per student as soon as they are parsed, the
+CSVs it archived, and one outbox entry per email keyed on its recipients and
+attachment. Resuming rebuilds the reports from the journaled rows (no
+browser, no login) and sends only the outbox entries that are not marked
+sent; re-queuing an email that already went out is a no-op.
+"""
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from attachments import Attachment
+from dispatch import DispatchResult
+from metrics import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    config_path TEXT,
+    started TEXT NOT NULL,
+    updated TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS students (
+    run_id TEXT NOT NULL,
+    student TEXT NOT NULL,
+    tab INTEGER NOT NULL,
+    rows TEXT NOT NULL,
+    csv_path TEXT,
+    csv_digest TEXT,
+    PRIMARY KEY (run_id, student)
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    run_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    label TEXT NOT NULL,
+    recipients TEXT NOT NULL,
+    attachment TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    sent TEXT,
+    PRIMARY KEY (run_id, key)
+);
+"""
+
+# Run stages, in order. "scraping" runs did not finish scraping the dashboard.
+SCRAPING, SCRAPED, DONE = "scraping", "scraped", "done"
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def outbox_key(recipients: List[str], attachment_digest: str) -> str:
+    """
+    Identity of one email: the same recipients and attachment give the same
+    key, so it is only sent once per run. Template values are left out: the
+    alerts are relative to the change-detection snapshot, which a failed run
+    has already moved forward for the students it emailed.
+    """
+    payload = json.dumps([sorted(r.strip().lower() for r in recipients), attachment_digest])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RunJournal:
+    """
+    The journal entries of one run in the SQLite file at `path`.
+    """
+
+    def __init__(self, path: str, run_id: str):
+        self.path = path
+        self.run_id = run_id
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # The dispatcher's worker threads record each send's outcome as it
+        # completes, so writes share one connection under a lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def path_from_config(config: Dict[str, Any]) -> Optional[str]:
+        opts = config.get("journal") or {}
+        if not opts.get("enabled", True):
+            return None
+        path = opts.get("path", "reports/journal.sqlite3")
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(__file__), "..", path)
+        return path
+
+    @classmethod
+    def begin(cls, path: str, config_path: str = "", keep: int = 30) -> "RunJournal":
+        """
+        Start journaling a new run, dropping all but the newest `keep` runs
+        of the same config (accounts sharing a journal file are pruned
+        separately, so a busy account never drops another's failed run).
+        """
+        run_id = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        journal = cls(path, run_id)
+        with journal._transaction():
+            journal.conn.execute(
+                "INSERT INTO runs (run_id, config_path, started, updated, stage) VALUES (?, ?, ?, ?, ?)",
+                (run_id, config_path, _now(), _now(), SCRAPING),
+            )
+            if keep:
+                old = [r[0] for r in journal.conn.execute(
+                    "SELECT run_id FROM runs WHERE config_path IS ? ORDER BY run_id DESC LIMIT -1 OFFSET ?",
+                    (config_path, keep))]
+                for table in ("outbox", "students", "runs"):
+                    journal.conn.executemany(f"DELETE FROM {table} WHERE run_id = ?", [(r,) for r in old])
+        return journal
+
+    @classmethod
+    def open(cls, path: str, run_id: Optional[str] = None) -> "RunJournal":
+        """
+        The journal of run `run_id`, or of the latest run that did not finish.
+        """
+        journal = cls(path, "")
+        if run_id:
+            row = journal.conn.execute("SELECT run_id FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is None:
+                journal.close()
+                raise FileNotFoundError(f"No run {run_id!r} in journal {path}")
+        else:
+            row = journal.conn.execute(
+                "SELECT run_id FROM runs WHERE stage != ? ORDER BY run_id DESC LIMIT 1", (DONE,)).fetchone()
+            if row is None:
+                journal.close()
+                raise FileNotFoundError(f"No unfinished runs in journal {path}")
+        journal.run_id = row[0]
+        return journal
+
+    @staticmethod
+    def list_runs(path: str) -> List[str]:
+        """
+        One line per journaled run: id, stage, students and emails sent.
+        """
+        if not os.path.exists(path):
+            return []
+        conn = sqlite3.connect(path)
+        try:
+            conn.executescript(SCHEMA)
+            lines = []
+            for run_id, stage, error in conn.execute("SELECT run_id, stage, error FROM runs ORDER BY run_id"):
+                students = conn.execute("SELECT COUNT(*) FROM students WHERE run_id = ?", (run_id,)).fetchone()[0]
+                sent, total = conn.execute(
+                    "SELECT COUNT(CASE WHEN status = 'sent' THEN 1 END), COUNT(*) FROM outbox WHERE run_id = ?",
+                    (run_id,)).fetchone()
+                line = f"{run_id}  {stage:<8}  {students} student(s), {sent}/{total} email(s) sent"
+                lines.append(line + (f"  ({error.splitlines()[0]})" if error else ""))
+            return lines
+        finally:
+            conn.close()
+
+    def close(self):
+        self.conn.close()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._lock, self.conn:
+            yield
+
+    @property
+    def stage(self) -> str:
+        return self.conn.execute("SELECT stage FROM runs WHERE run_id = ?", (self.run_id,)).fetchone()[0]
+
+    @property
+    def config_path(self) -> str:
+        return self.conn.execute("SELECT config_path FROM runs WHERE run_id = ?", (self.run_id,)).fetchone()[0]
+
+    def set_stage(self, stage: str):
+        with self._transaction():
+            self.conn.execute("UPDATE runs SET stage = ?, updated = ?, error = NULL WHERE run_id = ?",
+                              (stage, _now(), self.run_id))
+
+    def fail(self, error: str):
+        with self._transaction():
+            self.conn.execute("UPDATE runs SET updated = ?, error = ? WHERE run_id = ?", (_now(), error, self.run_id))
+
+    def record_batch(self, rows: List[Dict[str, Any]]):
+        """
+        Journal a batch of scraped rows, one entry per student, in scrape order.
+        """
+        by_student: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_student.setdefault(row["Student Name"], []).append(row)
+        with self._transaction():
+            tab = self.conn.execute("SELECT COUNT(*) FROM students WHERE run_id = ?", (self.run_id,)).fetchone()[0]
+            for student_name, student_rows in by_student.items():
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO students (run_id, student, tab, rows) VALUES (?, ?, ?, ?)",
+                    (self.run_id, student_name, tab, json.dumps(student_rows, ensure_ascii=False)),
+                )
+                tab += 1
+
+    def students(self) -> List[Tuple[int, str, List[Dict[str, Any]]]]:
+        return [
+            (r["tab"], r["student"], json.loads(r["rows"]))
+            for r in self.conn.execute(
+                "SELECT tab, student, rows FROM students WHERE run_id = ? ORDER BY tab, student", (self.run_id,))
+        ]
+
+    def csv_written(self, student_name: str, digest: str, path: str) -> bool:
+        """
+        Whether this run already archived the same CSV for `student_name` to `path`.
+        """
+        row = self.conn.execute(
+            "SELECT csv_path, csv_digest FROM students WHERE run_id = ? AND student = ?",
+            (self.run_id, student_name)).fetchone()
+        return row is not None and row["csv_digest"] == digest and row["csv_path"] == path and os.path.exists(path)
+
+    def record_csv(self, student_name: str, digest: str, path: str):
+        with self._transaction():
+            self.conn.execute(
+                "UPDATE students SET csv_path = ?, csv_digest = ? WHERE run_id = ? AND student = ?",
+                (path, digest, self.run_id, student_name))
+
+    def enqueue(self, key: str, label: str, recipients: List[str], attachment: str) -> str:
+        """
+        Add an outbox entry unless it already exists; returns its status.
+        """
+        with self._transaction():
+            self.conn.execute(
+                "INSERT OR IGNORE INTO outbox (run_id, key, label, recipients, attachment, status) "
+                "VALUES (?, ?, ?, ?, ?, 'pending')",
+                (self.run_id, key, label, json.dumps(recipients), attachment))
+            return self.conn.execute(
+                "SELECT status FROM outbox WHERE run_id = ? AND key = ?", (self.run_id, key)).fetchone()[0]
+
+    def mark(self, key: str, result: DispatchResult):
+        with self._transaction():
+            self.conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + ?, error = ?, sent = ? WHERE run_id = ? AND key = ?",
+                ("sent" if result.ok else "failed", result.attempts, result.error,
+                 _now() if result.ok else None, self.run_id, key))
+
+
+class OutboxDispatcher:
+    """
+    Wraps an `EmailDispatcher` so every email goes through the run's outbox:
+    an email already sent in this run is reported as sent without calling
+    EmailJS again, and each send's outcome is written to the journal as
+    soon as it completes (also for sends that finish while a failed run
+    shuts down). `already_sent` lists the labels of the skipped emails.
+    """
+
+    def __init__(self, dispatcher, journal: RunJournal):
+        self.dispatcher = dispatcher
+        self.journal = journal
+        self.already_sent: List[str] = []
+        self._queued: List[Future] = []
+
+    def submit(self, report, recipients: List[str], student_name: str = "", **template_params) -> Future:
+        digest = report.digest if isinstance(report, Attachment) else report
+        filename = report.filename if isinstance(report, Attachment) else os.path.basename(report)
+        key = outbox_key(recipients, digest)
+        if self.journal.enqueue(key, student_name, list(recipients), filename) == "sent":
+            print(f"Report for {student_name} was already emailed to {', '.join(recipients)} in this run, not sending again.")
+            metrics.incr("emails_already_sent")
+            self.already_sent.append(student_name)
+            future = Future()
+            future.set_result(DispatchResult(student_name, list(recipients), status=200, response="already sent"))
+            self._queued.append(future)
+            return future
+        future = self.dispatcher.submit(report, recipients, student_name, **template_params)
+        future.add_done_callback(lambda f: self._record(key, f))
+        self._queued.append(future)
+        return future
+
+    def _record(self, key: str, future: Future):
+        # Runs on the dispatcher's worker thread once the send is done
+        try:
+            self.journal.mark(key, future.result())
+        except Exception as e:
+            print(f"Could not record email outcome in the run journal: {e}")
+
+    def join(self) -> List[DispatchResult]:
+        """
+        Wait for every queued email and return the results (including
+        already-sent ones) in submit order.
+        """
+        self.dispatcher.join()
+        queued, self._queued = self._queued, []
+        return [future.result() for future in queued]
+
+    def close(self):
+        self.dispatcher.close()
+
+
+class JournalScraper:
+    """
+    Stands in for ``DashboardScraper`` when resuming, serving the rows the
+    run journaled before it stopped.
+    """
+
+    def __init__(self, journal: RunJournal):
+        self.journal = journal
+        self.missing_courses = set()
+
+    def iter_student_rows(self) -> Iterator[Tuple[int, str, List[Dict[str, Any]]]]:
+        for tab_idx, student_name, rows in self.journal.students():
+            metrics.incr("student_tabs")
+            yield tab_idx, student_name, rows
+
+    def scrape_dashboard(self) -> List[Dict[str, Any]]:
+        return [row for _tab_idx, _student_name, rows in self.iter_student_rows() for row in rows]
+
+    def persist_missing_courses(self, missing_courses):
+        # Missing courses were already added to the config when the run scraped them
+        pass
+
+    def close(self):
+        pass
@@ -1,118 +1,619 @@
+"""
+Command line entry point.
+
+    python src/main.py [schedule]      run the daily report on schedule (default)
+    python src/main.py schedule --list show the next scheduled runs and exit
+    python src/main.py schedule --daemon  ... running each report in a child process
+    python src/main.py now             scrape and email all reports once
+    python src/main.py scrape          scrape and write the CSVs, no email
+    python src/main.py send            email the CSVs already in reports/
+    python src/main.py replay [RUN]    rebuild and email reports from a recorded scrape
+    python src/main.py resume [RUN]    finish a failed run from its journal, without a browser
+
+Selenium, APScheduler and requests are imported inside the commands that use
+them, so quick commands do not pay for the whole import graph.
+"""
+import argparse
 import os
 import sys
+import time
 import traceback
-import yaml
 
-from scraper import DashboardScraper
-from utils import write_csv
-from emailer import EmailJSClient
-from scheduler import ReportScheduler
+from config import config_service
+from metrics import metrics
 
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "../config/config.yaml")
 OUTPUT_CSV = os.path.join(os.path.dirname(__file__), "../dashboard_report.csv")
 
-def load_config():
-    with open(CONFIG_PATH, "r") as f:
-        return yaml.safe_load(f)
+def load_config(config_path=None):
+    # Parsed once and shared with the scraper; re-read only when the file changes
+    return config_service(resolve_config_path(config_path)).get()
 
-def send_error_alert(config, error_msg):
-    return
+def resolve_config_path(config_path=None):
+    """
+    The config file to use: `config_path`, or config/config.yaml when None.
+    """
+    return config_path or CONFIG_PATH
 
-def generate_and_send_report():
-    import collections
-
-    config = load_config()
-    scraper = DashboardScraper(CONFIG_PATH)
+def send_error_alert(config, error_msg):
+    """
+    With `send_error_alerts: true`, email a failed run's error through
+    EmailJS to `error_alert_recipients` (default: every address in
+    `emails`), with the full error attached as report_error.txt. Never
+    raises: it runs while a failure is already being handled.
+    """
+    if not config or not config.get("send_error_alerts", False):
+        return
     try:
-        data = scraper.scrape_dashboard()
-        # Group data by student name
-        students = collections.defaultdict(list)
-        for row in data:
-            students[row["Student Name"]].append(row)
-
-        # Ensure reports directory exists
-        reports_dir = os.path.join(os.path.dirname(__file__), "../reports")
-        os.makedirs(reports_dir, exist_ok=True)
+        from attachments import Attachment
+        from emailer import EmailJSClient
 
+        recipients = config.get("error_alert_recipients")
+        if not recipients:
+            unique = {}
+            for addresses in (config.get("emails") or {}).values():
+                for address in addresses or []:
+                    unique.setdefault(address.strip().lower(), address.strip())
+            recipients = list(unique.values())
+        if not recipients:
+            return
         emailjs = config["emailjs"]
         client = EmailJSClient(
             emailjs["service_id"],
             emailjs["template_id"],
-            emailjs["public_key"]
+            emailjs["public_key"],
+            transport=emailjs.get("transport", "http"),
+            api_url=emailjs.get("api_url")
         )
+        try:
+            attachment = Attachment.from_bytes(error_msg.encode("utf-8"), "report_error.txt", "text/plain")
+            first_line = (error_msg.strip().splitlines() or ["unknown error"])[0]
+            status, response = client.send_report(
+                attachment, recipients, "Report run failed",
+                grade_summary="Today's report run failed; the error is attached.",
+                alerts=f"! {first_line}"
+            )
+        finally:
+            client.close()
+        if status != 200:
+            print(f"Could not email the error alert: STATUS:{status} {response}")
+    except Exception as e:
+        print(f"Could not email the error alert: {e}")
 
-        for student_name, student_data in students.items():
-            # Write CSV for this student
-            safe_name = student_name.replace(" ", "_")
-            csv_path = os.path.join(reports_dir, f"{safe_name}.csv")
-            write_csv(student_data, csv_path)
-
-            # Calculate grade_summary (bulleted, multi-line format)
-            from collections import defaultdict
-            grade_map = defaultdict(list)
-            for row in student_data:
-                grade = row.get("Current Grade Level", "")
-                course = row.get("Course Name", "")
-                if grade and course:
-                    grade_map[grade].append((course))
-            grade_order = ["A", "B", "C", "D", "F"]
-            summary_lines = []
-            for grade in grade_order:
-                courses = grade_map.get(grade, [])
-                if courses:
-                    summary_lines.append(f"({len(courses)}) {grade}")
-                    for course in courses:
-                        summary_lines.append(f"- {course}")
-            grade_summary = "\n".join(summary_lines)
-
-            # Calculate total_assignments and total_past_due
-            def safe_int(val):
-                try:
-                    v = int(val)
-                    return v if v > 0 else 0
-                except Exception:
-                    return 0
-            total_assignments = sum(safe_int(row.get("Expected Assignments", 0)) for row in student_data)
-            total_past_due = sum(safe_int(row.get("Overdue Assignments", 0)) for row in student_data)
-
-            # Get emails for this student
-            emails_dict = config.get("emails", {})
-            recipients = emails_dict.get(student_name, [])
-            if not recipients:
-                print(f"No emails found for student: {student_name}, skipping email.")
-                continue
+def export_metrics(config):
+    """
+    Write the run's stage timings and counters as JSON and Prometheus text.
+    """
+    opts = config.get("metrics") or {}
+    if not opts.get("enabled", True):
+        return
+    metrics_dir = opts.get("dir", "reports/metrics")
+    if not os.path.isabs(metrics_dir):
+        metrics_dir = os.path.join(os.path.dirname(__file__), "..", metrics_dir)
+    try:
+        json_path, prom_path = metrics.export(metrics_dir)
+        print(f"Run metrics written to {json_path} and {prom_path}")
+    except OSError as e:
+        print(f"Could not write run metrics: {e}")
+
+def scraped_batches(scraper, streaming: bool):
+    """
+    Yield scraped rows in batches: one batch per student tab as soon as it is
+    parsed when `streaming`, otherwise a single batch after the full scrape.
+    """
+    if streaming:
+        for _tab_idx, _student_name, rows in scraper.iter_student_rows():
+            yield rows
+        scraper.persist_missing_courses(scraper.missing_courses)
+    else:
+        with metrics.span("scrape"):
+            data = scraper.scrape_dashboard()
+        yield data
+
+def reports_dir_from_config(config):
+    """
+    Directory for the per-student CSV reports (`reports_dir`, default reports/).
+    """
+    path = config.get("reports_dir") or "reports"
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(__file__), "..", path)
+    return path
+
+def digest_enabled(config):
+    return bool((config.get("digest") or {}).get("enabled", False))
+
+def report_params(summary):
+    """
+    EmailJS template values for one student's report email.
+    """
+    return dict(
+        grade_summary=summary.grade_summary,
+        total_assignments=str(summary.total_expected),
+        total_past_due=str(summary.total_overdue),
+        at_risk=summary.at_risk_summary,
+        alerts=summary.alerts_summary
+    )
+
+def queue_student_report(config, reports_dir, summary, dispatcher, builder, changed=None, digests=None, journal=None):
+    """
+    Build one student's CSV attachment in memory, archive it to
+    `reports_dir` when enabled, and queue their email. `changed` is the
+    student -> changed courses map when change detection is on. With a
+    `DigestQueue` in `digests` the summary is held for the recipients'
+    digests instead of being emailed on its own. With a `RunJournal`, a CSV
+    the run already archived is not written again.
+    """
+    student_name = summary.student_name
+    safe_name = student_name.replace(" ", "_")
+    with metrics.span("build_attachment"):
+        attachment = builder.build(summary.rows, safe_name)
+    # Without a dispatcher (scrape only) the CSV is always written
+    if dispatcher is None or (config.get("attachments") or {}).get("archive", True):
+        path = os.path.join(reports_dir, attachment.filename)
+        if journal is None or not journal.csv_written(student_name, attachment.digest, path):
+            with metrics.span("write_csv"):
+                attachment.archive(reports_dir)
+            if journal is not None:
+                journal.record_csv(student_name, attachment.digest, path)
+    if dispatcher is None:
+        return
+    if digests is not None:
+        digests.add(summary, changed)
+        return
+
+    send_only_on_change = changed is not None and (config.get("snapshots") or {}).get("send_only_on_change", False)
+    if send_only_on_change and student_name not in changed:
+        print(f"No changes for student: {student_name}, skipping email.")
+        return
+
+    # Get emails for this student
+    emails_dict = config.get("emails", {})
+    recipients = emails_dict.get(student_name, [])
+    if not recipients:
+        print(f"No emails found for student: {student_name}, skipping email.")
+        return
+
+    # Queue email with CSV and new template params
+    dispatcher.submit(attachment, recipients, student_name, **report_params(summary))
+
+def queue_digests(digests, dispatcher, builder):
+    """
+    Queue one email per digest: every student's summary and a merged CSV.
+    Returns digest label -> students, to map failed sends back to students.
+    """
+    labels = {}
+    for digest in digests.digests():
+        with metrics.span("build_attachment"):
+            attachment = builder.build(digest.rows, digest.name)
+        label = ", ".join(digest.students)
+        labels[label] = digest.students
+        dispatcher.submit(attachment, digest.recipients, label, **digest.template_params())
+    metrics.incr("digests_queued", len(labels))
+    return labels
+
+def create_dispatcher(config):
+    """
+    EmailJS client and the dispatcher that sends through it.
+    """
+    from dispatch import EmailDispatcher
+    from emailer import EmailJSClient
+
+    emailjs = config["emailjs"]
+    client = EmailJSClient(
+        emailjs["service_id"],
+        emailjs["template_id"],
+        emailjs["public_key"],
+        transport=emailjs.get("transport", "http"),
+        api_url=emailjs.get("api_url")
+    )
+    return client, EmailDispatcher.from_config(client, config)
+
+def generate_and_send_report(config_path=None, send=True, replay=None, resume=None):
+    """
+    Scrape, build and email every student's report for the account
+    configured in `config_path` (default: config/config.yaml). With
+    `send=False` the CSVs are written but nothing is emailed and the
+    change-detection snapshots are left as they were.
+
+    `replay` is a `ReplayScraper` serving a recorded run instead of the
+    live portal; replays leave the snapshots and grade history untouched.
+
+    With `digest.enabled`, each recipient gets one email covering all of
+    their students, sent once the whole dashboard has been scraped.
+
+    Emailing runs are journaled (see journal.py). `resume` is the
+    `RunJournal` of an earlier run to finish from its journaled rows; emails
+    that run already sent are not sent again.
+
+    Errors are reported (printed, and emailed when `send_error_alerts` is
+    on) rather than raised; returns False if the run failed.
+    """
+    from aggregate import summarize_from_config
+    from alerts import AlertEngine
+    from attachments import AttachmentBuilder
+    from digest import DigestQueue
+    from history import GradeHistory
+    from journal import DONE, SCRAPED, SCRAPING, JournalScraper, OutboxDispatcher, RunJournal
+    from replay import RunRecorder
+    from snapshots import SnapshotStore
+
+    config_path = resolve_config_path(config_path)
+    metrics.reset()
+    run_started = time.perf_counter()
+    config = load_config(config_path)
+    snapshots = None
+    recorder = None
+    journal = resume
+    # Resuming a run that stopped mid-scrape can only email the students it reached
+    partial = resume is not None and resume.stage == SCRAPING
+    if resume is not None:
+        if partial:
+            print(f"Run {resume.run_id} stopped before the whole dashboard was scraped; "
+                  "finishing the students it scraped. Run `now` for a complete report.")
+        scraper = JournalScraper(resume)
+        snapshots = SnapshotStore.from_config(config)
+    elif replay is not None:
+        scraper = replay
+    else:
+        from scraper import DashboardScraper
+        from scraper_pool import ScraperPool
 
-            # Send email with CSV and new template params
-            client.send_csv_report(
-                csv_path,
-                recipients,
-                student_name,
-                grade_summary=grade_summary,
-                total_assignments=str(total_assignments),
-                total_past_due=str(total_past_due)
+        snapshots = SnapshotStore.from_config(config)
+        recorder = RunRecorder.from_config(config)
+        if ScraperPool.enabled(config):
+            scraper = ScraperPool(config_path, snapshots=snapshots, recorder=recorder)
+        else:
+            scraper = DashboardScraper(config_path, snapshots=snapshots, recorder=recorder)
+        journal_path = RunJournal.path_from_config(config) if send else None
+        if journal_path:
+            journal = RunJournal.begin(journal_path, os.path.abspath(config_path),
+                                       keep=(config.get("journal") or {}).get("keep", 30))
+    streaming = bool(config.get("streaming", False))
+    client = None
+    dispatcher = None
+    history = None
+    try:
+        # Ensure reports directory exists
+        reports_dir = reports_dir_from_config(config)
+        os.makedirs(reports_dir, exist_ok=True)
+
+        if send:
+            client, dispatcher = create_dispatcher(config)
+            if journal is not None:
+                dispatcher = OutboxDispatcher(dispatcher, journal)
+        builder = AttachmentBuilder.from_config(config)
+        alert_engine = AlertEngine.from_config(config)
+        digests = None
+        if dispatcher is not None and digest_enabled(config):
+            digests = DigestQueue(
+                config.get("emails") or {},
+                send_only_on_change=snapshots is not None and (config.get("snapshots") or {}).get("send_only_on_change", False)
             )
-            print(f"Report for {student_name} generated and emailed to: {', '.join(recipients)}")
 
+        # Keep every run's rows for trend queries (the per-student CSVs are overwritten)
+        if replay is None:
+            history = GradeHistory.from_config(config)
+
+        students = []
+        snapshot_rows = []
+        # With streaming on, each student's CSV and email go out while the next tab loads
+        for rows in scraped_batches(scraper, streaming):
+            metrics.incr("rows_scraped", len(rows))
+            if journal is not None and resume is None:
+                with metrics.span("journal"):
+                    journal.record_batch(rows)
+            # Group by student and compute every per-student summary in one pass
+            with metrics.span("aggregate"):
+                summaries = summarize_from_config(rows, config)
+
+            # Compare with the previous run; optionally only email students whose data changed
+            changed = snapshots.changed_courses(rows) if snapshots is not None else None
+            if changed is not None:
+                for student_name in summaries:
+                    courses = changed.get(student_name, [])
+                    print(f"{student_name}: {len(courses)} changed course(s) since last run" + (f" ({', '.join(courses)})" if courses else ""))
+                snapshot_rows.extend(rows)
+
+            # Rule-based alerts against the previous run's values (the snapshot is not updated yet)
+            if alert_engine is not None:
+                with metrics.span("alerts"):
+                    found = alert_engine.evaluate(rows, snapshots.get if snapshots is not None else None)
+                metrics.incr("alerts", len(found))
+                for student_name, student_alerts in alert_engine.by_student(found).items():
+                    if student_name in summaries:
+                        summaries[student_name].alerts = student_alerts
+
+            if history is not None:
+                with metrics.span("history_append"):
+                    stored = history.append(rows)
+                print(f"Stored {stored} rows in grade history {history.path}")
+
+            for summary in summaries.values():
+                queue_student_report(config, reports_dir, summary, dispatcher, builder, changed, digests, journal)
+            students.extend(summaries)
+        if recorder is not None:
+            recorder.finish()
+        if journal is not None and resume is None:
+            journal.set_stage(SCRAPED)
+        labels = queue_digests(digests, dispatcher, builder) if digests is not None else {}
+
+        if dispatcher is None:
+            print(f"Wrote CSV reports for {len(students)} student(s) to {reports_dir}")
+            return True
+        with metrics.span("dispatch_wait"):
+            results = dispatcher.join()
+        failed = [r for r in results if not r.ok]
+        if snapshots is not None:
+            # Students whose email failed keep their old snapshot so the change is sent next run
+            unsent = {name for r in failed for name in labels.get(r.student_name, [r.student_name])}
+            sent = set(students) - unsent
+            if resume is not None:
+                # The failed run already moved these students' snapshots when it emailed them
+                sent -= {name for label in dispatcher.already_sent for name in labels.get(label, [label])}
+            snapshots.update(snapshot_rows, students=sent)
+            snapshots.save()
+        report_results(results)
+        if partial:
+            # Students after the failure point got no report, so the run stays unfinished
+            print(f"Emailed the {len(students)} student(s) run {journal.run_id} scraped before it failed; "
+                  "the rest of the dashboard was never scraped. Run `now` for a complete report.")
+            return False
+        if journal is not None:
+            journal.set_stage(DONE)
         print("All student reports generated and emailed successfully.")
+        return True
     except Exception as e:
         tb = traceback.format_exc()
         print(f"Error: {e}\n{tb}")
+        metrics.incr("run_errors")
+        if journal is not None:
+            journal.fail(f"{e}\n{tb}")
+            print(f"Finish this run without scraping again: python src/main.py resume {journal.run_id}")
         send_error_alert(config, f"{e}\n{tb}")
+        return False
     finally:
         scraper.close()
+        if dispatcher is not None:
+            dispatcher.close()
+        if client is not None:
+            client.close()
+        if history is not None:
+            history.close()
+        if journal is not None:
+            journal.close()
+        metrics.observe("run", time.perf_counter() - run_started)
+        export_metrics(config)
 
-def main():
-    config = load_config()
-    scheduler = ReportScheduler(
-        report_func=generate_and_send_report,
-        timezone=config.get("timezone", "America/Chicago"),
-        report_time=config.get("report_time", "08:00")
-    )
-    scheduler.print_current_time()
-    if len(sys.argv) > 1 and sys.argv[1] == "now":
-        generate_and_send_report()
+def report_results(results):
+    """
+    Print each send's outcome; raises if any email failed.
+    """
+    failed = [r for r in results if not r.ok]
+    for r in results:
+        if r.ok:
+            print(f"Report for {r.student_name} generated and emailed to: {', '.join(r.recipients)}")
+        else:
+            print(f"Report for {r.student_name} could not be emailed after {r.attempts} attempt(s): {r.error}")
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {len(results)} report emails failed: "
+                           + ", ".join(r.student_name for r in failed))
+
+def send_stored_reports(config_path=None, students=None):
+    """
+    Email the CSVs already in `reports_dir` (e.g. to retry a failed send) without
+    scraping. Sends every student in `emails`, or only `students`. Finds
+    both plain and gzipped (``attachments.gzip``) archives, preferring the
+    kind the config currently writes. Raises RuntimeError if a student named
+    in `students` has no report or no recipients, or if any email fails.
+
+    The template values are rebuilt as in `now`, with alerts against the
+    change-detection snapshot. A failed send leaves its students' snapshot
+    as it was, so their alerts come out the same as in the failed run.
+    """
+    import csv
+    import gzip
+    from aggregate import summarize_from_config
+    from alerts import AlertEngine
+    from attachments import Attachment
+    from snapshots import SnapshotStore
+
+    config = load_config(config_path)
+    alert_engine = AlertEngine.from_config(config)
+    snapshots = SnapshotStore.from_config(config) if alert_engine is not None else None
+    reports_dir = reports_dir_from_config(config)
+    emails_dict = config.get("emails") or {}
+    extensions = [".csv", ".csv.gz"]
+    if (config.get("attachments") or {}).get("gzip", False):
+        extensions.reverse()
+    skipped = []
+    client, dispatcher = create_dispatcher(config)
+    try:
+        for student_name in students or list(emails_dict):
+            base = os.path.join(reports_dir, student_name.replace(" ", "_"))
+            csv_path = next((base + ext for ext in extensions if os.path.exists(base + ext)), None)
+            if csv_path is None:
+                print(f"No CSV report for student: {student_name} ({base}{extensions[0]}), skipping email.")
+                skipped.append(student_name)
+                continue
+            recipients = emails_dict.get(student_name, [])
+            if not recipients:
+                print(f"No emails found for student: {student_name}, skipping email.")
+                skipped.append(student_name)
+                continue
+            opener = gzip.open if csv_path.endswith(".gz") else open
+            with opener(csv_path, "rt", newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+            summary = summarize_from_config(rows, config).get(student_name)
+            params = {}
+            if summary is not None:
+                if alert_engine is not None:
+                    found = alert_engine.evaluate(rows, snapshots.get if snapshots is not None else None)
+                    summary.alerts = alert_engine.by_student(found).get(student_name, [])
+                params = report_params(summary)
+            dispatcher.submit(Attachment.from_file(csv_path), recipients, student_name, **params)
+        results = dispatcher.join()
+    finally:
+        dispatcher.close()
+        client.close()
+    report_results(results)
+    if students and skipped:
+        raise RuntimeError(f"No report sent for: {', '.join(skipped)}")
+    return results
+
+def report_command(config_path=None):
+    """
+    Command line of a one-off report run (`now`) for `config_path`.
+    """
+    return [sys.executable, os.path.abspath(__file__), "--config", os.path.abspath(resolve_config_path(config_path)), "now"]
+
+def schedule(config_path=None, list_only=False, daemon=False):
+    """
+    Run the daily report on schedule: one job for the config, or one per
+    account config when `scheduler.accounts_dir` is set. In daemon mode
+    (`daemon` or `daemon.enabled`) each run is a separate `now` process
+    with a time budget and memory cap, see daemon.py.
+    """
+    import functools
+    from scheduler import MultiAccountScheduler, ReportScheduler
+
+    config_path = resolve_config_path(config_path)
+    config = load_config(config_path)
+    opts = config.get("scheduler") or {}
+    daemon = daemon or bool((config.get("daemon") or {}).get("enabled", False))
+    report_func = generate_and_send_report
+    if daemon and not list_only:
+        from daemon import IsolatedRunner, become_subreaper
+
+        if not become_subreaper():
+            print("Could not become a child subreaper; orphaned browser processes are still killed but reaped by init.")
+        report_func = IsolatedRunner.from_config(report_command, config)
+    accounts_dir = opts.get("accounts_dir")
+    if accounts_dir:
+        if not os.path.isabs(accounts_dir):
+            accounts_dir = os.path.join(os.path.dirname(__file__), "..", accounts_dir)
+        scheduler = MultiAccountScheduler(
+            report_func=report_func,
+            accounts_dir=accounts_dir,
+            max_workers=opts.get("max_workers", 2),
+            jitter=opts.get("jitter", 300),
+            default_timezone=config.get("timezone", "America/Chicago"),
+            default_report_time=config.get("report_time", "08:00"),
+            watch_interval=opts.get("watch_interval", 60),
+            # Daemon runs are already separate processes
+            process_pool=not daemon
+        )
+    else:
+        if daemon and not list_only:
+            report_func = functools.partial(report_func, config_path)
+        scheduler = ReportScheduler(
+            report_func=report_func,
+            timezone=config.get("timezone", "America/Chicago"),
+            report_time=config.get("report_time", "08:00"),
+            config_path=config_path,
+            watch_interval=opts.get("watch_interval", 60)
+        )
+        scheduler.print_current_time()
+    if list_only:
+        for line in scheduler.describe():
+            print(line)
     else:
         scheduler.start()
 
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="Scrape the school portal dashboard and email per-student reports.")
+    parser.add_argument("--config", default=None, help="Config file (default: config/config.yaml)")
+    commands = parser.add_subparsers(dest="command")
+    sched = commands.add_parser("schedule", help="Run the daily report on schedule (default)")
+    sched.add_argument("--list", action="store_true", help="Show the next scheduled runs and exit")
+    sched.add_argument("--daemon", action="store_true", help="Run each report in a child process with a time budget and memory cap")
+    commands.add_parser("now", help="Scrape and email all reports once")
+    commands.add_parser("scrape", help="Scrape and write the CSV reports without emailing")
+    send = commands.add_parser("send", help="Email the CSV reports already in reports_dir")
+    send.add_argument("students", nargs="*", help="Students to send (default: everyone in `emails`)")
+    replay = commands.add_parser("replay", help="Rebuild and email reports from a recorded scrape, without a browser")
+    replay.add_argument("run", nargs="?", help="Run id or directory (default: the latest recorded run)")
+    replay.add_argument("--reparse", action="store_true", help="Parse the saved page HTML again instead of using the saved rows")
+    replay.add_argument("--no-send", action="store_true", help="Write the CSVs only")
+    replay.add_argument("--list", action="store_true", help="List the recorded runs and exit")
+    resume = commands.add_parser("resume", help="Finish a failed run from its journal, without a browser")
+    resume.add_argument("run", nargs="?", help="Run id (default: the latest unfinished run)")
+    resume.add_argument("--list", action="store_true", help="List the journaled runs and exit")
+    return parser
+
+def replay_run(config_path=None, run=None, reparse=False, send=True, list_only=False):
+    """
+    Run the report pipeline on a recorded scrape (see replay.py). Returns
+    False if the run failed.
+    """
+    from course_filter import GradeRubric
+    from replay import ReplayScraper, find_run, list_runs, runs_dir
+
+    config = load_config(config_path)
+    root = runs_dir(config)
+    if list_only:
+        runs = list_runs(root)
+        print("\n".join(runs) if runs else f"No recorded runs in {root}")
+        return True
+    run_dir = find_run(root, run)
+    print(f"Replaying {run_dir}")
+    scraper = ReplayScraper(run_dir, config.get("courses"), reparse, GradeRubric.from_config(config))
+    return generate_and_send_report(config_path, send=send, replay=scraper)
+
+def resume_run(config_path=None, run=None, list_only=False):
+    """
+    Finish a journaled run (default: the latest unfinished one) without
+    starting the browser. Uses the config file the run was started with
+    unless `config_path` is given. Returns False if the run failed.
+    """
+    from journal import RunJournal
+
+    config = load_config(config_path)
+    path = RunJournal.path_from_config(config)
+    if path is None:
+        raise FileNotFoundError("The run journal is disabled (journal.enabled: false)")
+    if list_only:
+        runs = RunJournal.list_runs(path)
+        print("\n".join(runs) if runs else f"No journaled runs in {path}")
+        return True
+    journal = RunJournal.open(path, run)
+    print(f"Resuming run {journal.run_id} ({journal.stage})")
+    return generate_and_send_report(config_path or journal.config_path, resume=journal)
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    command = args.command or "schedule"
+    # A non-zero exit status marks a failed run (e.g. for daemon mode's run log)
+    if command == "now":
+        return 0 if generate_and_send_report(args.config) else 1
+    elif command == "scrape":
+        return 0 if generate_and_send_report(args.config, send=False) else 1
+    elif command == "replay":
+        try:
+            return 0 if replay_run(args.config, args.run, args.reparse, not args.no_send, args.list) else 1
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            return 1
+    elif command == "resume":
+        try:
+            return 0 if resume_run(args.config, args.run, args.list) else 1
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            return 1
+    elif command == "send":
+        try:
+            send_stored_reports(args.config, args.students)
+        except (RuntimeError, FileNotFoundError) as e:
+            print(f"Error: {e}")
+            return 1
+        except KeyError as e:
+            print(f"Error: missing config setting {e}")
+            return 1
+    else:
+        if command == "schedule":
+            schedule(args.config, list_only=args.list, daemon=args.daemon)
+        else:
+            schedule(args.config)
+    return 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
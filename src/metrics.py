@@ -0,0 +1,170 @@
+"""
+Per-run timing spans and counters for the report pipeline.
+
+Stages wrap their work in ``metrics.span("name")`` and bump counters with
+``metrics.incr("name")``. At the end of a run the collected values are
+exported as a JSON run summary and a Prometheus text-format file (suitable
+for node_exporter's textfile collector).
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Tuple
+
+PROMETHEUS_PREFIX = "school_report"
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _atomic_write(path: str, text: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class Metrics:
+    """
+    Thread-safe collection of stage timings (count, total and max seconds
+    per stage) and labelled counters for one run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.spans: Dict[str, Dict[str, float]] = {}
+            self.counters: Dict[LabelKey, float] = {}
+
+    @contextmanager
+    def span(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            s = self.spans.setdefault(stage, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            s["count"] += 1
+            s["total_seconds"] += seconds
+            s["max_seconds"] = max(s["max_seconds"], seconds)
+
+    def incr(self, name: str, value: float = 1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def counter(self, name: str, **labels) -> float:
+        return self.counters.get(_key(name, labels), 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Picklable copy of the collected values, e.g. to send back from a worker process.
+        """
+        with self._lock:
+            return {
+                "spans": {k: dict(v) for k, v in self.spans.items()},
+                "counters": [(name, list(labels), value) for (name, labels), value in self.counters.items()],
+            }
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """
+        Add a worker's `snapshot()` into this collection.
+        """
+        with self._lock:
+            for stage, other in snapshot["spans"].items():
+                s = self.spans.setdefault(stage, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+                s["count"] += other["count"]
+                s["total_seconds"] += other["total_seconds"]
+                s["max_seconds"] = max(s["max_seconds"], other["max_seconds"])
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            counters: Dict[str, Any] = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                if labels:
+                    counters.setdefault(name, {})[",".join(f"{k}={v}" for k, v in labels)] = value
+                else:
+                    counters[name] = value
+            return {
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "duration_seconds": round(time.time() - self.started, 3),
+                "stages": {
+                    k: {"count": v["count"], "total_seconds": round(v["total_seconds"], 4), "max_seconds": round(v["max_seconds"], 4)}
+                    for k, v in self.spans.items()
+                },
+                "counters": counters,
+            }
+
+    def to_prometheus(self) -> str:
+        p = PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {p}_stage_seconds Time spent in each pipeline stage during the last run.",
+            f"# TYPE {p}_stage_seconds gauge",
+        ]
+        with self._lock:
+            spans = sorted(self.spans.items())
+            counters = sorted(self.counters.items())
+        for stage, s in spans:
+            lines.append(f'{p}_stage_seconds{{stage="{stage}"}} {s["total_seconds"]:.6f}')
+        lines += [f"# HELP {p}_stage_calls Times each stage ran during the last run.", f"# TYPE {p}_stage_calls gauge"]
+        for stage, s in spans:
+            lines.append(f'{p}_stage_calls{{stage="{stage}"}} {s["count"]}')
+        lines += [f"# HELP {p}_stage_seconds_max Slowest single call of each stage.", f"# TYPE {p}_stage_seconds_max gauge"]
+        for stage, s in spans:
+            lines.append(f'{p}_stage_seconds_max{{stage="{stage}"}} {s["max_seconds"]:.6f}')
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# TYPE {p}_{name} gauge")
+            lines.append(f"{p}_{name}{_format_labels(labels)} {value:g}")
+        lines.append(f"# TYPE {p}_last_run_timestamp_seconds gauge")
+        lines.append(f"{p}_last_run_timestamp_seconds {self.started:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: str) -> Tuple[str, str]:
+        """
+        Write run_summary.json and metrics.prom into `directory`.
+        """
+        json_path = os.path.join(directory, "run_summary.json")
+        prom_path = os.path.join(directory, "metrics.prom")
+        _atomic_write(json_path, json.dumps(self.summary(), indent=2) + "\n")
+        _atomic_write(prom_path, self.to_prometheus())
+        return json_path, prom_path
+
+
+# Process-wide collector shared by the scraper, emailer and main pipeline
+metrics = Metrics()
@@ -0,0 +1,137 @@
+"""
+Direct HTTP client for the FEDashboard.aspx student tabs.
+
+The dashboard is an ASP.NET WebForms page: each student tab in ``ul#nav2``
+is a ``__doPostBack`` link, and switching students posts the page's form
+(``__VIEWSTATE``, ``__EVENTVALIDATION``, ...) back with ``__EVENTTARGET``
+set to the tab. ``PortalClient`` replays those postbacks over a
+``requests.Session`` carrying the cookies of a browser login, and hands each
+returned page to ``dashboard_parser``, so a scrape is a handful of HTTP
+calls instead of a browser render per student.
+
+Anything unexpected (login page, unknown tab link, HTTP error) raises
+``PortalAPIError`` so the caller can fall back to the Selenium scraper.
+"""
+import re
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+from lxml import html as lxml_html
+
+from metrics import metrics
+
+TAB_XPATH = "//ul[@id='nav2']//li/a"
+# __doPostBack('target','argument') or WebForm_DoPostBackWithOptions(new WebForm_PostBackOptions("target", "argument", ...))
+_POSTBACK_RE = re.compile(
+    r"""__doPostBack\(\s*['"]([^'"]*)['"]\s*,\s*['"]([^'"]*)['"]\s*\)"""
+    r"""|WebForm_PostBackOptions\(\s*['"]([^'"]*)['"]\s*,\s*['"]([^'"]*)['"]"""
+)
+
+
+class PortalAPIError(Exception):
+    """The portal did not answer the way the HTTP client expects."""
+
+
+class SessionExpired(PortalAPIError):
+    """The cookies were rejected and the portal sent us to the login page."""
+
+
+class PortalClient:
+    """
+    Fetches the dashboard page of every student tab over plain HTTP using an
+    authenticated portal session.
+    """
+
+    def __init__(self, dashboard_url: str, cookies: List[dict], timeout: float = 30, user_agent: Optional[str] = None):
+        self.dashboard_url = dashboard_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+        for c in cookies:
+            self.session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+
+    def close(self):
+        self.session.close()
+
+    def _check(self, resp: requests.Response) -> str:
+        if resp.status_code != 200:
+            raise PortalAPIError(f"{resp.request.method} {resp.url} returned HTTP {resp.status_code}")
+        text = resp.text
+        if "iFrameLogin" in text or "PublicWelcome.aspx" in resp.url:
+            raise SessionExpired("portal session expired")
+        return text
+
+    def _request(self, method: str, url: str, **kwargs) -> str:
+        with metrics.span("http_fetch"):
+            try:
+                resp = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except requests.RequestException as e:
+                raise PortalAPIError(f"{method} {url} failed: {e}") from e
+        return self._check(resp)
+
+    def get_dashboard(self) -> str:
+        return self._request("GET", self.dashboard_url)
+
+    def postback(self, page: str, target: str, argument: str = "") -> str:
+        """
+        Submit `page`'s form as the browser would when `target` fires.
+        """
+        doc = lxml_html.fromstring(page)
+        forms = doc.xpath("//form")
+        if not forms:
+            raise PortalAPIError("dashboard page has no form to post back")
+        form = forms[0]
+        fields = {
+            inp.get("name"): inp.get("value", "")
+            for inp in form.xpath(".//input[@type='hidden' and @name]")
+        }
+        fields["__EVENTTARGET"] = target
+        fields["__EVENTARGUMENT"] = argument
+        action = urljoin(self.dashboard_url, form.get("action") or self.dashboard_url)
+        return self._request("POST", action, data=fields)
+
+    @staticmethod
+    def student_tabs(page: str) -> List[Tuple[str, str, bool]]:
+        """
+        (student name, tab href, is active) for each tab on `page`.
+        """
+        doc = lxml_html.fromstring(page)
+        tabs = []
+        for a in doc.xpath(TAB_XPATH):
+            classes = f"{a.get('class') or ''} {a.getparent().get('class') or ''}".split()
+            tabs.append((a.text_content().strip(), a.get("href") or "", "active" in classes))
+        return tabs
+
+    def open_tab(self, page: str, href: str) -> str:
+        """
+        The dashboard page after following tab link `href` from `page`.
+        """
+        match = _POSTBACK_RE.search(href)
+        if match:
+            target, argument = (match.group(1), match.group(2)) if match.group(1) is not None else (match.group(3), match.group(4))
+            return self.postback(page, target, argument)
+        if href and not href.startswith(("#", "javascript:")):
+            return self._request("GET", urljoin(self.dashboard_url, href))
+        raise PortalAPIError(f"don't know how to open student tab link {href!r}")
+
+    def iter_student_pages(self, shard: Tuple[int, int] = (0, 1)) -> Iterator[Tuple[int, str, str]]:
+        """
+        Yield (tab index, student name, page HTML) for the tabs in `shard`.
+        """
+        shard_idx, shard_count = shard
+        page = self.get_dashboard()
+        tabs = self.student_tabs(page)
+        if not tabs:
+            raise PortalAPIError("no student tabs on the dashboard page")
+        for tab_idx in range(shard_idx, len(tabs), shard_count):
+            student_name, href, active = tabs[tab_idx]
+            if not active:
+                # Post back from the latest page so __VIEWSTATE/__EVENTVALIDATION are current
+                page = self.open_tab(page, href)
+                tabs = self.student_tabs(page)
+                shown = [name for name, _href, is_active in tabs if is_active]
+                if len(tabs) <= tab_idx or (shown and shown[0] != student_name):
+                    raise PortalAPIError(f"opening the tab for {student_name} showed {shown[0] if shown else 'another page'}")
+            yield tab_idx, student_name, page
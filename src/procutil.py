@@ -0,0 +1,158 @@
+"""
+Process-tree inspection and memory sampling from /proc (Linux).
+
+Used to measure the browser's footprint: chromedriver starts Chrome, which
+starts its renderer, GPU and utility processes, so the memory that matters
+is the RSS summed over the whole tree. The scheduler daemon also uses these
+helpers to find and reap browser processes a run left behind. On systems
+without /proc the helpers report 0 or no processes.
+"""
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _parent_map() -> Dict[int, int]:
+    parents = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return parents
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces; fields resume after the last ")"
+        fields = stat[stat.rfind(b")") + 2:].split()
+        parents[int(entry)] = int(fields[1])
+    return parents
+
+
+def descendants(pid: int) -> List[int]:
+    """
+    All live descendants of `pid` (children, grandchildren, ...).
+    """
+    children: Dict[int, List[int]] = {}
+    for child, parent in _parent_map().items():
+        children.setdefault(parent, []).append(child)
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def zombie_children(pid: int) -> List[int]:
+    """
+    Exited children of `pid` that have not been waited for yet.
+    """
+    zombies = []
+    for child, parent in _parent_map().items():
+        if parent != pid:
+            continue
+        try:
+            with open(f"/proc/{child}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        if stat[stat.rfind(b")") + 2:].split()[0] == b"Z":
+            zombies.append(child)
+    return zombies
+
+
+def pids_with_env(name: str, value: Optional[str] = None) -> List[int]:
+    """
+    Processes whose environment (as started) sets `name`, to `value` if given.
+    Only processes of the current user are readable.
+    """
+    prefix = f"{name}=".encode()
+    wanted = prefix + value.encode() if value is not None else None
+    found = []
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return found
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/environ", "rb") as f:
+                env = f.read().split(b"\0")
+        except OSError:
+            continue
+        if any(var == wanted if wanted else var.startswith(prefix) for var in env):
+            found.append(int(entry))
+    return found
+
+
+def rss_bytes(pid: int) -> int:
+    """
+    Resident set size of one process, 0 if it is gone.
+    """
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def tree_rss_bytes(pid: int) -> int:
+    """
+    RSS of `pid` plus all of its descendants. Shared pages are counted once
+    per process, so this is an upper bound on the tree's real footprint.
+    """
+    return sum(rss_bytes(p) for p in [pid] + descendants(pid))
+
+
+class PeakRSS:
+    """
+    Samples the RSS of a process tree on a background thread while active;
+    `peak` is the largest total seen. `pid` may be a callable for processes
+    that are started inside the block.
+
+        with PeakRSS(lambda: driver.service.process.pid) as mem:
+            ...
+        print(mem.peak_mb)
+    """
+
+    def __init__(self, pid, interval: float = 0.05):
+        self._pid: Callable[[], Optional[int]] = pid if callable(pid) else (lambda: pid)
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> int:
+        try:
+            pid = self._pid()
+        except Exception:
+            pid = None
+        current = tree_rss_bytes(pid) if pid else 0
+        self.peak = max(self.peak, current)
+        return current
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self) -> "PeakRSS":
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="peak-rss", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak / (1024 * 1024)
@@ -0,0 +1,180 @@
+"""
+Record scraped dashboard pages and replay them without a browser.
+
+With ``recording.enabled`` every run saves, per student tab, the raw page
+HTML and the parsed rows under ``recording.dir/<run id>/``. ``ReplayScraper``
+serves such a run through the same interface as ``DashboardScraper``, so
+the aggregation, CSV and email path can be re-run (``main.py replay``) in
+milliseconds: to iterate on summaries or templates, to benchmark, or to
+retry a failed send without logging in again.
+
+Usage:
+    python src/main.py replay [RUN] [--reparse] [--no-send]
+    python src/main.py replay --list
+"""
+import json
+import os
+import shutil
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from course_filter import CourseFilter, GradeRubric
+from dashboard_parser import parse_dashboard_html, report_date_today
+from metrics import metrics
+
+DEFAULT_DIR = "reports/runs"
+_META = "run.json"
+
+
+def _resolve(path: str) -> str:
+    if os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(__file__), "..", path)
+
+
+def _write(path: str, data: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def runs_dir(config: dict) -> str:
+    return _resolve((config.get("recording") or {}).get("dir", DEFAULT_DIR))
+
+
+def list_runs(root: str) -> List[str]:
+    """
+    Recorded run ids under `root`, oldest first.
+    """
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root) if os.path.isfile(os.path.join(root, d, _META)))
+
+
+def find_run(root: str, run: Optional[str] = None) -> str:
+    """
+    Directory of run `run` (an id, a path, or None for the latest run).
+    """
+    if run and os.path.isdir(run):
+        return run
+    runs = list_runs(root)
+    if not runs:
+        raise FileNotFoundError(f"No recorded runs in {root}; set recording.enabled: true and run a scrape first")
+    if run is None:
+        return os.path.join(root, runs[-1])
+    if run not in runs:
+        raise FileNotFoundError(f"No recorded run {run!r} in {root}")
+    return os.path.join(root, run)
+
+
+class RunRecorder:
+    """
+    Writes one run's pages and rows: ``<tab>_<Student>.html`` and
+    ``<tab>_<Student>.json`` per student tab, plus ``run.json`` once the
+    scrape is complete. Several scraper processes may record into the same
+    run directory.
+    """
+
+    def __init__(self, run_dir: str, keep: int = 0):
+        self.run_dir = run_dir
+        self.keep = keep
+        os.makedirs(run_dir, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["RunRecorder"]:
+        opts = config.get("recording") or {}
+        if not opts.get("enabled", False):
+            return None
+        return cls(os.path.join(runs_dir(config), time.strftime("%Y%m%d-%H%M%S")), keep=opts.get("keep", 14))
+
+    @staticmethod
+    def _stem(tab_idx: int, student_name: str) -> str:
+        return f"{tab_idx:03d}_{student_name.replace(' ', '_').replace(os.sep, '_')}"
+
+    def record(self, tab_idx: int, student_name: str, page_source: str, rows: List[Dict[str, Any]]):
+        stem = os.path.join(self.run_dir, self._stem(tab_idx, student_name))
+        with metrics.span("record_page"):
+            _write(f"{stem}.html", page_source.encode("utf-8"))
+            _write(f"{stem}.json", json.dumps({"student_name": student_name, "rows": rows}).encode("utf-8"))
+
+    def finish(self):
+        """
+        Mark the run complete and drop runs beyond the newest `keep`.
+        """
+        meta = {"finished": time.strftime("%Y-%m-%dT%H:%M:%S"), "report_date": report_date_today()}
+        _write(os.path.join(self.run_dir, _META), json.dumps(meta).encode("utf-8"))
+        print(f"Recorded scraped pages to {self.run_dir}")
+        if self.keep:
+            root = os.path.dirname(self.run_dir)
+            for run in list_runs(root)[:-self.keep]:
+                shutil.rmtree(os.path.join(root, run), ignore_errors=True)
+
+
+class ReplayScraper:
+    """
+    Stands in for ``DashboardScraper``, serving the students of a recorded
+    run. Rows are the recorded ones, or re-parsed from the saved HTML with
+    the current parser, `courses` filter and grade `rubric` when `reparse`
+    is set.
+    """
+
+    def __init__(
+        self,
+        run_dir: str,
+        courses: Optional[Dict[str, bool]] = None,
+        reparse: bool = False,
+        rubric: Optional[GradeRubric] = None,
+    ):
+        self.run_dir = run_dir
+        self.courses = CourseFilter(courses) if courses is not None else None
+        self.rubric = rubric
+        self.reparse = reparse
+        self.missing_courses = set()
+        with open(os.path.join(run_dir, _META), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+    def _tabs(self) -> List[Tuple[int, str]]:
+        stems = sorted(name[:-len(".json")] for name in os.listdir(self.run_dir)
+                       if name.endswith(".json") and name != _META)
+        return [(int(stem.split("_", 1)[0]), stem) for stem in stems]
+
+    def iter_student_rows(self) -> Iterator[Tuple[int, str, List[Dict[str, Any]]]]:
+        seen = set()
+        for tab_idx, stem in self._tabs():
+            path = os.path.join(self.run_dir, stem)
+            with open(f"{path}.json", "r", encoding="utf-8") as f:
+                recorded = json.load(f)
+            student_name = recorded["student_name"]
+            rows = recorded["rows"]
+            if self.reparse:
+                with open(f"{path}.html", "r", encoding="utf-8") as f:
+                    page_source = f.read()
+                report_date = rows[0]["Report Date"] if rows else self.meta.get("report_date") or None
+                with metrics.span("card_parse"):
+                    rows, missing = parse_dashboard_html(
+                        page_source, student_name, self.courses, report_date=report_date, rubric=self.rubric,
+                    )
+                self.missing_courses.update(missing)
+            # A student recorded under two accounts (scraper pool) is kept once
+            rows = [r for r in rows if (r["Student Name"], r["Course Name"]) not in seen]
+            seen.update((r["Student Name"], r["Course Name"]) for r in rows)
+            if not rows:
+                continue
+            metrics.incr("student_tabs")
+            yield tab_idx, student_name, rows
+
+    def scrape_dashboard(self) -> List[Dict[str, Any]]:
+        data = []
+        for _tab_idx, _student_name, rows in self.iter_student_rows():
+            data.extend(rows)
+        return data
+
+    def persist_missing_courses(self, missing_courses):
+        # Replays never edit the config
+        if missing_courses:
+            print(f"Replay found {len(missing_courses)} course(s) not in config: {', '.join(sorted(missing_courses))}")
+
+    def close(self):
+        pass
+
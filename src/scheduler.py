@@ -1,9 +1,16 @@
+import glob
 import logging
+import os
+from apscheduler.executors.pool import ProcessPoolExecutor, ThreadPoolExecutor
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 import pytz
 import time
 from datetime import datetime
+from typing import Callable, Dict, List
+
+from config import config_service
 
 logging.basicConfig()
 logging.getLogger('apscheduler').setLevel(logging.DEBUG)
@@ -11,16 +18,55 @@ logging.getLogger('apscheduler').setLevel(logging.DEBUG)
 def report_func():
     print(">>> Report run at:", datetime.now())
 
+def daily_trigger(report_time: str, timezone, jitter: int = 0) -> CronTrigger:
+    """
+    Cron trigger firing every day at `report_time` ("HH:MM") in `timezone`,
+    delayed by up to `jitter` random seconds.
+    """
+    hour, minute = map(int, report_time.split(":"))
+    return CronTrigger(hour=hour, minute=minute, timezone=timezone, jitter=jitter or None)
+
 class ReportScheduler:
-    def __init__(self, report_func, timezone: str, report_time: str):
+    def __init__(self, report_func, timezone: str, report_time: str, config_path: str = None, watch_interval: float = 60):
         self.report_func = report_func
         self.timezone = pytz.timezone(timezone)
-        hour, minute = map(int, report_time.split(":"))
+        self.report_time = report_time
         self.scheduler = BackgroundScheduler(timezone=self.timezone)
-        self.trigger = CronTrigger(hour=hour, minute=minute, timezone=self.timezone)
+        self.trigger = daily_trigger(report_time, self.timezone)
+        # With a config path, timezone/report_time edits are picked up without a restart
+        self.config_path = config_path
+        self.watch_interval = watch_interval
+
+    def reload(self):
+        """
+        Reschedule the daily job if the config's timezone or report_time changed.
+        """
+        # Report runs share the cached config, so compare values rather than relying on changed()
+        config = config_service(self.config_path).get()
+        timezone = pytz.timezone(config.get("timezone", self.timezone.zone))
+        report_time = config.get("report_time", self.report_time)
+        if (timezone.zone, report_time) == (self.timezone.zone, self.report_time):
+            return
+        self.timezone, self.report_time = timezone, report_time
+        self.trigger = daily_trigger(report_time, timezone)
+        self.scheduler.reschedule_job("daily_report", trigger=self.trigger)
+        print(f"Config changed: daily report now runs at {report_time} {timezone.zone}")
+
+    def describe(self) -> List[str]:
+        """
+        The next few run times, without starting the scheduler.
+        """
+        now = datetime.now(self.timezone)
+        runs, previous = [], None
+        for _ in range(3):
+            previous = self.trigger.get_next_fire_time(previous, previous or now)
+            runs.append(f"daily_report: {previous.strftime('%Y-%m-%d %H:%M %Z')}")
+        return runs
 
     def start(self):
-        self.scheduler.add_job(self.report_func, self.trigger, id="daily_report", replace_existing=True)
+        self.scheduler.add_job(self.report_func, self.trigger, id="daily_report", replace_existing=True, max_instances=1)
+        if self.config_path and self.watch_interval > 0:
+            self.scheduler.add_job(self.reload, "interval", seconds=self.watch_interval, id="reload_config", replace_existing=True)
         self.scheduler.start()
         print("Scheduler started. Press Ctrl+C to exit.")
         try:
@@ -34,4 +80,168 @@ class ReportScheduler:
 
     def print_current_time(self):
         now = datetime.now(self.timezone)
-        print(f"Current time in {self.timezone.zone}: {now.strftime('%Y-%m-%d %H:%M:%S')}")
\ No newline at end of file
+        print(f"Current time in {self.timezone.zone}: {now.strftime('%Y-%m-%d %H:%M:%S')}")
+
+def load_account_configs(accounts_dir: str) -> Dict[str, str]:
+    """
+    Account name -> config path for every *.yaml / *.yml file in `accounts_dir`.
+    The name is the file name without its extension.
+    """
+    paths = glob.glob(os.path.join(accounts_dir, "*.yaml")) + glob.glob(os.path.join(accounts_dir, "*.yml"))
+    return {os.path.splitext(os.path.basename(p))[0]: p for p in sorted(paths)}
+
+# Per-account state that must not be shared by accounts: (section, key, default
+# path, enabled by default). A section of None is a top-level key. The run
+# journal is left out: accounts may share its file, runs are kept per config.
+_STATE_PATHS = [
+    (None, "reports_dir", "reports", True),
+    ("snapshots", "path", ".cache/snapshots.json", True),
+    ("history", "path", "reports/history.sqlite3", True),
+    ("recording", "dir", "reports/runs", False),
+    ("session_cache", "path", ".cache/sessions.json", True),
+    ("metrics", "dir", "reports/metrics", True),
+]
+
+def _resolve_state_path(path: str) -> str:
+    # Relative state paths are relative to the project root (see e.g. snapshots.py)
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(__file__), "..", path)
+    return os.path.normpath(os.path.abspath(path))
+
+class MultiAccountScheduler:
+    """
+    Runs a daily report for every account config in a directory, in one process.
+
+    Each account gets its own cron job at its own `timezone` and `report_time`,
+    with up to `jitter` seconds of random delay so accounts sharing a report
+    time do not all hit the portal at once. Jobs run in a pool of at most
+    `max_workers` worker processes, which keeps each run's browser, metrics
+    and module state separate. A job is skipped rather than started twice if
+    the previous run of the same account is still going.
+
+    With `process_pool=False` jobs run on threads instead; use it when
+    `report_func` already starts its own process (see daemon.py).
+    """
+
+    def __init__(
+        self,
+        report_func: Callable[[str], None],
+        accounts_dir: str,
+        max_workers: int = 2,
+        jitter: int = 300,
+        default_timezone: str = "America/Chicago",
+        default_report_time: str = "08:00",
+        watch_interval: float = 60,
+        process_pool: bool = True,
+    ):
+        self.report_func = report_func
+        self.accounts_dir = accounts_dir
+        self.jitter = jitter
+        self.default_timezone = default_timezone
+        self.default_report_time = default_report_time
+        self.watch_interval = watch_interval
+        self.scheduler = BlockingScheduler(
+            executors={
+                "default": (ProcessPoolExecutor if process_pool else ThreadPoolExecutor)(max(1, max_workers)),
+                # Config reloads run in the scheduler process itself
+                "watcher": ThreadPoolExecutor(1),
+            },
+            job_defaults={"max_instances": 1, "coalesce": True, "misfire_grace_time": 3600},
+        )
+        self._accounts: Dict[str, str] = {}
+
+    def add_accounts(self) -> List[str]:
+        """
+        Register (or replace) one job per account config; returns the job ids.
+        Accounts with `enabled: false` are left out.
+        """
+        job_ids = []
+        configs = {}
+        accounts = load_account_configs(self.accounts_dir)
+        for name, path in accounts.items():
+            config = config_service(path).get()
+            if not config.get("enabled", True):
+                print(f"Account {name} is disabled, not scheduling it.")
+                continue
+            configs[name] = config
+            timezone = pytz.timezone(config.get("timezone", self.default_timezone))
+            trigger = daily_trigger(config.get("report_time", self.default_report_time), timezone, self.jitter)
+            job_id = f"daily_report:{name}"
+            self.scheduler.add_job(
+                self.report_func, trigger, args=[os.path.abspath(path)],
+                id=job_id, name=name, replace_existing=True,
+            )
+            job_ids.append(job_id)
+        for job in self.scheduler.get_jobs():
+            if job.id.startswith("daily_report:") and job.id not in job_ids:
+                job.remove()
+        self._accounts = accounts
+        for warning in self.shared_state_warnings(configs):
+            print(f"Warning: {warning}")
+        return job_ids
+
+    @staticmethod
+    def shared_state_warnings(configs: Dict[str, dict]) -> List[str]:
+        """
+        Accounts whose state (CSV reports, snapshots, grade history, recorded
+        runs, session cache, metrics) resolves to the same path, where they
+        would overwrite each other's files.
+        """
+        warnings = []
+        for section, key, default, enabled in _STATE_PATHS:
+            setting = f"{section}.{key}" if section else key
+            owners: Dict[str, List[str]] = {}
+            for name, config in configs.items():
+                opts = config if section is None else (config.get(section) or {})
+                if section is not None and not opts.get("enabled", enabled):
+                    continue
+                owners.setdefault(_resolve_state_path(opts.get(key) or default), []).append(name)
+            for path, names in owners.items():
+                if len(names) > 1:
+                    warnings.append(f"accounts {', '.join(names)} share {setting} {path!r}; "
+                                    f"give each account its own {setting}")
+        return warnings
+
+    def reload(self):
+        """
+        Re-register the account jobs if a config file was added, removed or edited.
+        """
+        accounts = load_account_configs(self.accounts_dir)
+        if accounts == self._accounts and not any(config_service(p).changed() for p in accounts.values()):
+            return
+        job_ids = self.add_accounts()
+        print(f"Account configs changed: {len(job_ids)} account(s) scheduled")
+
+    def describe(self) -> List[str]:
+        """
+        Each account's next run time (before jitter), without starting the scheduler.
+        """
+        lines = []
+        for name, path in load_account_configs(self.accounts_dir).items():
+            config = config_service(path).get()
+            if not config.get("enabled", True):
+                lines.append(f"{name}: disabled")
+                continue
+            timezone = pytz.timezone(config.get("timezone", self.default_timezone))
+            trigger = daily_trigger(config.get("report_time", self.default_report_time), timezone)
+            next_run = trigger.get_next_fire_time(None, datetime.now(timezone))
+            lines.append(f"{name}: {next_run.strftime('%Y-%m-%d %H:%M %Z')}")
+        return lines or [f"No account configs found in {self.accounts_dir}"]
+
+    def start(self):
+        job_ids = self.add_accounts()
+        if not job_ids:
+            print(f"No account configs found in {self.accounts_dir}")
+            return
+        for job in self.scheduler.get_jobs():
+            print(f"Scheduled {job.name}: {job.trigger}")
+        if self.watch_interval > 0:
+            self.scheduler.add_job(
+                self.reload, "interval", seconds=self.watch_interval,
+                id="reload_configs", executor="watcher", replace_existing=True,
+            )
+        print(f"Scheduler started for {len(job_ids)} account(s). Press Ctrl+C to exit.")
+        try:
+            self.scheduler.start()
+        except (KeyboardInterrupt, SystemExit):
+            self.scheduler.shutdown()
@@ -1,10 +1,30 @@
-import time
-from typing import List, Dict, Any
-from selenium import webdriver
+import os
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
-import yaml
+from selenium.webdriver.support import expected_conditions as EC
+
+from browser import new_chrome
+from config import config_service
+from course_filter import CourseFilter, GradeRubric
+from dashboard_parser import (
+    ACTUAL_XPATH,
+    DAYS_XPATH,
+    EXPECTED_XPATH,
+    MINUTES_XPATH,
+    grade_level,
+    overdue,
+    parse_actual,
+    parse_dashboard_html,
+    parse_expected,
+    report_date_today,
+)
+from metrics import metrics
+from portal_api import PortalAPIError, PortalClient, SessionExpired
+from replay import RunRecorder
+from session_store import SessionStore
+from snapshots import SnapshotStore
+from waits import WaitRecorder, settled_element_count
 
 class DashboardScraper:
     """
@@ -14,60 +34,65 @@ class DashboardScraper:
     DASHBOARD_URL = "https://laurelsprings.geniussis.com/FEDashboard.aspx"
     LOGIN_URL = "https://laurelsprings.geniussis.com/PublicWelcome.aspx"
 
-    def __init__(self, config_path: str):
-        self.config = self._load_config(config_path)
+    DASHBOARD_HEADER_XPATH = '//h2[contains(@class, "border-bottom") and contains(text(),"Dashboard")]'
+
+    # Selectors used to decide when the dashboard is ready
+    TAB_LOCATOR = (By.CSS_SELECTOR, "ul#nav2 li a")
+    CARD_LOCATOR = (By.CSS_SELECTOR, "div.col-lg-4.col-xl-4.mb-3")
+
+    def __init__(
+        self,
+        config_path: str,
+        credentials: Optional[Dict[str, str]] = None,
+        snapshots: Optional[SnapshotStore] = None,
+        recorder: Optional[RunRecorder] = None,
+    ):
+        self.config_service = config_service(config_path)
+        self.config = self.config_service.get()
+        # Previous run's rows; lets unchanged course cards skip parsing
+        self.snapshots = snapshots
+        # Saves each tab's page and rows for offline replay
+        self.recorder = recorder
+        if credentials is not None:
+            # Scrape a different parent account than the one in config (the parsed config is shared)
+            self.config = dict(self.config, credentials=credentials)
+        portal_url = (self.config.get("scraper") or {}).get("portal_url")
+        if portal_url:
+            # Another portal host, e.g. the local simulator in benchmarks/simulator.py
+            self.DASHBOARD_URL = f"{portal_url.rstrip('/')}/FEDashboard.aspx"
+            self.LOGIN_URL = f"{portal_url.rstrip('/')}/PublicWelcome.aspx"
+        # Compiled once per run: course rules and the letter-grade rubric
+        self.course_filter = CourseFilter.from_config(self.config)
+        self.rubric = GradeRubric.from_config(self.config)
         self.driver = None
+        self.missing_courses = set()
+        self.waits = WaitRecorder(lambda: self.driver)
 
-    def _load_config(self, path: str) -> Dict[str, Any]:
-        with open(path, "r") as f:
-            return yaml.safe_load(f)
+    @property
+    def _wait_timeout(self) -> float:
+        return float((self.config.get("scraper") or {}).get("wait_timeout", 15))
 
-    def _init_driver(self):
-        options = Options()
-        # options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        self.driver = webdriver.Chrome(options=options)
-
-    def _add_courses_to_config(self, new_courses, config_path: str = "config/config.yaml"):
+    def _wait_for_cards(self, step: str, replaces: float = 0.0):
         """
-        Adds each course in `new_courses` (list or set) as `course_name: true` above '# Add more courses as needed'.
+        Wait for the course cards to finish rendering: document loaded, no
+        pending XHR/postback, and a card count that has stopped changing.
         """
-        if not new_courses:
-            return
-        with open(config_path, "r") as f:
-            lines = f.readlines()
-
-        # Locate courses section and insertion point
-        course_section_idx = None
-        insert_idx = None
-        for idx, line in enumerate(lines):
-            if line.strip() == "courses:":
-                course_section_idx = idx
-            if "# Add more courses as needed" in line:
-                insert_idx = idx
-                break
-
-        if course_section_idx is not None and insert_idx is not None:
-            # Prepare a set of existing course names in config
-            course_lines = lines[course_section_idx+1:insert_idx]
-            existing = set(l.split(':', 1)[0].strip() for l in course_lines if ':' in l)
-
-            insert_lines = [f"  {name}: true\n" for name in new_courses if name not in existing]
-            if insert_lines:
-                # Insert all new courses above the comment
-                for offset, il in enumerate(insert_lines):
-                    lines.insert(insert_idx + offset, il)
-                with open(config_path, "w") as f:
-                    f.writelines(lines)
-                    
+        quiet = float((self.config.get("scraper") or {}).get("settle_period", 0.4))
+        self.waits.wait(
+            step, settled_element_count(self.CARD_LOCATOR, quiet_period=quiet),
+            timeout=self._wait_timeout, replaces=replaces,
+        )
+
+    def _init_driver(self):
+        # "lean" (headless, no images/fonts/media) unless scraper.browser_profile is "full"
+        self.driver = new_chrome(self.config.get("scraper"))
+
     def _handle_post_login_alert(self, timeout=5):
         """
         Handles the post-login alert by clicking "DON'T SHOW AGAIN" and "CLOSE" if present,
         using robust selectors based on input[name$=...] patterns.
         """
         from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
         from selenium.common.exceptions import TimeoutException
 
         wait = WebDriverWait(self.driver, timeout)
@@ -94,16 +119,75 @@ class DashboardScraper:
                 )
             )
             close_btn.click()
-            time.sleep(2)
+            # The dialog posts back; wait until it is gone rather than sleeping
+            self.waits.wait(
+                "announcement_closed", EC.invisibility_of_element(close_btn),
+                timeout=self._wait_timeout, replaces=2,
+            )
         except TimeoutException:
             # Alert did not appear; nothing to do
             pass
 
+    def _session_store(self) -> Optional[SessionStore]:
+        opts = self.config.get("session_cache") or {}
+        if not opts.get("enabled", True):
+            return None
+        path = opts.get("path", ".cache/sessions.json")
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(__file__), "..", path)
+        return SessionStore(path, ttl_minutes=opts.get("ttl_minutes", 60))
+
+    def _restore_session(self, store: SessionStore) -> bool:
+        """
+        Load cached cookies into the browser and check the dashboard accepts
+        them. Returns False (and drops the cache entry) if the portal sends
+        us back to the login form.
+        """
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import TimeoutException
+
+        username = self.config["credentials"]["username"]
+        cookies = store.load(username)
+        if not cookies:
+            return False
+
+        # Cookies can only be set for the domain currently loaded
+        self.driver.get(self.DASHBOARD_URL)
+        for cookie in cookies:
+            try:
+                self.driver.add_cookie(cookie)
+            except Exception:
+                pass
+        self.driver.get(self.DASHBOARD_URL)
+        try:
+            landed = WebDriverWait(self.driver, self._wait_timeout).until(EC.any_of(
+                EC.presence_of_element_located((By.XPATH, self.DASHBOARD_HEADER_XPATH)),
+                EC.presence_of_element_located((By.ID, "iFrameLogin")),
+            ))
+        except TimeoutException:
+            landed = None
+        if landed is not None and landed.tag_name.lower() == "h2":
+            print(f"Reusing cached portal session for {username}")
+            return True
+        print(f"Cached portal session for {username} was rejected; logging in again")
+        store.clear(username)
+        return False
+
     def login(self):
+        with metrics.span("login"):
+            self._init_driver()
+            store = self._session_store()
+            if store is not None and self._restore_session(store):
+                metrics.incr("logins", method="session_cache")
+                return
+            self._login_with_credentials()
+            metrics.incr("logins", method="form")
+            if store is not None:
+                store.save(self.config["credentials"]["username"], self.driver.get_cookies())
+
+    def _login_with_credentials(self):
         from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
 
-        self._init_driver()
         self.driver.get(self.LOGIN_URL)
 
         # Wait for the login form to appear (up to 15 seconds)
@@ -135,171 +219,247 @@ class DashboardScraper:
 
         # Wait for dashboard header text after login
         wait.until(
-            EC.presence_of_element_located((By.XPATH, '//h2[contains(@class, "border-bottom") and contains(text(),"Dashboard")]'))
+            EC.presence_of_element_located((By.XPATH, self.DASHBOARD_HEADER_XPATH))
         )
 
         # Handle post-login alert if present
 
         # TODO: Add error handling for failed login
 
-    def scrape_dashboard(self) -> List[Dict[str, Any]]:
-        import datetime
-
-        self.login()
-        self.driver.get(self.DASHBOARD_URL)
-        time.sleep(2)
+    def scrape_dashboard(self, shard: Tuple[int, int] = (0, 1), persist_courses: bool = True) -> List[Dict[str, Any]]:
+        """
+        Log in and scrape every student tab (or this worker's `shard` of them,
+        given as (index, count)) into a flat list of CSV rows.
+        """
         data = []
-        missing_courses = []
+        for _tab_idx, _student_name, rows in self.iter_student_rows(shard):
+            data.extend(rows)
+        # At the END (right before return), update the yaml ONCE
+        if persist_courses:
+            self.persist_missing_courses(self.missing_courses)
+        print(self.waits.summary())
+        return data
+
+    def iter_student_rows(self, shard: Tuple[int, int] = (0, 1)) -> Iterator[Tuple[int, str, List[Dict[str, Any]]]]:
+        """
+        Yield (tab index, student name, rows) for each student tab in this
+        shard as soon as it is parsed, so callers can write and send one
+        student's report while the next tab loads. Course names not yet in
+        config are collected in `self.missing_courses`.
+        """
+        shard_idx, shard_count = shard
+        done = set()
+        if (self.config.get("scraper") or {}).get("fetch_mode", "browser") == "http":
+            try:
+                yield from self._iter_student_rows_http(shard, done)
+                return
+            except PortalAPIError as e:
+                metrics.incr("http_fallbacks")
+                print(f"Direct HTTP scrape failed ({e}); continuing in the browser")
+
+        if self.driver is None:
+            self.login()
+        with metrics.span("dashboard_load"):
+            self.driver.get(self.DASHBOARD_URL)
+            self._wait_for_cards("dashboard_ready", replaces=2)
+        parse_mode = (self.config.get("scraper") or {}).get("parse_mode", "html")
 
         # Get student tabs (if multiple students)
-        student_tabs = self.driver.find_elements(By.CSS_SELECTOR, "ul#nav2 li a")
+        student_tabs = self.driver.find_elements(*self.TAB_LOCATOR)
         num_tabs = len(student_tabs)
-        for tab_idx in range(num_tabs):
-            # Get fresh tabs each iteration because DOM may reload
-            student_tabs = self.driver.find_elements(By.CSS_SELECTOR, "ul#nav2 li a")
-            tab = student_tabs[tab_idx]  # this ref is fresh
-
-            student_name = tab.text.strip()
-            tab.click()
-            time.sleep(2)
-
-            # Find all course cards
-            course_cards = self.driver.find_elements(By.CSS_SELECTOR, 'div.col-lg-4.col-xl-4.mb-3')
-            for card in course_cards:
-                try:
-                    # Course Name
-                    course_name_elem = card.find_element(By.CSS_SELECTOR, ".card-title")
-                    course_name = course_name_elem.text.strip()
-                    
-                    # Collect missing courses, don't immediately update config
-                    if course_name not in self.config["courses"]:
-                        missing_courses.insert(0, course_name)
-
-                    # Filter by config
-                    if not self.config["courses"].get(course_name, True):
+        for tab_idx in range(shard_idx, num_tabs, shard_count):
+            if tab_idx in done:
+                continue
+            with metrics.span("tab_switch"):
+                # Get fresh tabs each iteration because DOM may reload
+                student_tabs = self.driver.find_elements(*self.TAB_LOCATOR)
+                tab = student_tabs[tab_idx]  # this ref is fresh
+
+                student_name = tab.text.strip()
+                # Content that the tab switch replaces; it goes stale once the new tab renders
+                old_content = self.driver.find_elements(*self.CARD_LOCATOR)[:1] or self.driver.find_elements(By.TAG_NAME, "body")
+                already_active = self._is_active_tab(tab)
+                tab.click()
+                if old_content and not already_active:
+                    self.waits.wait(
+                        f"tab_switch[{student_name}]", EC.staleness_of(old_content[0]),
+                        timeout=float((self.config.get("scraper") or {}).get("tab_switch_timeout", 5)),
+                    )
+                self._wait_for_cards(f"tab_ready[{student_name}]", replaces=2)
+
+            page_source = None
+            with metrics.span("card_parse"):
+                if parse_mode == "webdriver":
+                    missing_courses = []
+                    rows = self._parse_cards_webdriver(student_name, missing_courses)
+                else:
+                    # One page_source transfer per tab, then parse every card locally
+                    page_source = self.driver.page_source
+                    rows, missing_courses = parse_dashboard_html(
+                        page_source, student_name, self.course_filter,
+                        snapshots=self.snapshots, rubric=self.rubric,
+                    )
+            if self.recorder is not None:
+                self.recorder.record(tab_idx, student_name, page_source or self.driver.page_source, rows)
+            metrics.incr("student_tabs")
+            self.missing_courses.update(missing_courses)
+            yield tab_idx, student_name, rows
+
+    def _iter_student_rows_http(self, shard: Tuple[int, int], done: set) -> Iterator[Tuple[int, str, List[Dict[str, Any]]]]:
+        """
+        Fetch each student tab with `PortalClient` postbacks instead of
+        clicking through the browser. With cached session cookies Chrome is
+        never started; otherwise the browser logs in and lends its cookies.
+        Tab indexes already yielded are added to `done`.
+        """
+        store = self._session_store()
+        username = self.config["credentials"]["username"]
+        cookies = store.load(username) if store is not None else None
+        while True:
+            user_agent = None
+            if not cookies:
+                self.login()
+                cookies = self.driver.get_cookies()
+                user_agent = self.driver.execute_script("return navigator.userAgent")
+            client = PortalClient(self.DASHBOARD_URL, cookies, timeout=self._wait_timeout, user_agent=user_agent)
+            try:
+                for tab_idx, student_name, page_source in client.iter_student_pages(shard):
+                    if tab_idx in done:
                         continue
-
-                    # Course Period
-                    period_elem = card.find_element(By.CSS_SELECTOR, "small.text-muted")
-                    course_period = period_elem.text.strip()
-
-                    # Current Grade (%)
-                    try:
-                        grade_elem = card.find_element(By.CSS_SELECTOR, ".card-grade")
-                        current_grade = grade_elem.text.replace("%", "").replace(" ", "").strip()
-                    except Exception:
-                        current_grade = ""
-
-                    # Current Grade Level (Letter, per rubric)
-                    try:
-                        grade_num = float(current_grade)
-                        if grade_num < 70:
-                            current_grade_level = "F"
-                        elif 70 <= grade_num < 75:
-                            current_grade_level = "D"
-                        elif 75 <= grade_num < 80:
-                            current_grade_level = "C"
-                        elif 80 <= grade_num < 90:
-                            current_grade_level = "B"
-                        elif grade_num >= 90:
-                            current_grade_level = "A"
-                        else:
-                            current_grade_level = ""
-                    except Exception:
-                        current_grade_level = ""
-
-                    # Total Assignments, Expected, Completed, Overdue
-                    actual_assignments = ""
-                    expected_assignments = ""
-                    completed_assignments = ""
-                    overdue_assignments = ""
-                    try:
-                        actual_elem = card.find_element(By.XPATH, ".//span[contains(@class,'progress-mark-tooltip-label') and contains(text(), 'Actual')]/following-sibling::span//label")
-                        actual_text = actual_elem.text.strip()  # e.g., "2 of 2"
-                        if "of" in actual_text:
-                            completed_assignments, actual_assignments = [s.strip() for s in actual_text.split("of", 1)]
-                        else:
-                            completed_assignments = actual_text.strip()
-                            actual_assignments = ""
-                    except Exception:
-                        pass
-                    try:
-                        # Grab the "expected" line (e.g., "10 of 40")
-                        expected_elem = card.find_element(
-                            By.XPATH,
-                            ".//span[contains(@class, 'progress-mark-tooltip expected')]" +
-                            "/span[contains(@class, 'progress-mark-tooltip-container')]" +
-                            "/span[contains(@class, 'progress-mark-tooltip-content')]"
-                        )
-                        expected_text = expected_elem.text.strip()  # e.g. "10 of 40"
-                        if "of" in expected_text:
-                            expected_assignments = expected_text.split("of")[0].strip()
-                        else:
-                            # fallback if not in expected format
-                            expected_assignments = expected_text.strip()
-                    except Exception as e:
-                        print(f"[ERROR] Failed to get expected_assignments: {e}")
-                        expected_assignments = ""
-                        return
-                    try:
-                        overdue_assignments = str(int(expected_assignments) - int(completed_assignments))
-                    except Exception:
-                        overdue_assignments = ""
-
-                    # Minutes Spent
-                    try:
-                        min_elem = card.find_element(
-                            By.XPATH,
-                            './/div[contains(@class, "text-right") and contains(., "min")]'
-                        )
-                        minutes_spent = min_elem.text.replace("min", "").strip()
-                    except Exception:
-                        minutes_spent = ""
-
-                    # Days Left
-                    try:
-                        days_elem = card.find_element(
-                            By.XPATH,
-                            './/div[contains(@class,"align-self-center")][contains(., "left")]'
+                    with metrics.span("card_parse"):
+                        rows, missing_courses = parse_dashboard_html(
+                            page_source, student_name, self.course_filter,
+                            snapshots=self.snapshots, rubric=self.rubric,
                         )
-                        days_left = (
-                            days_elem.text.replace("left", "")
-                            .replace("d", "")
-                            .strip()
-                        )
-                    except Exception:
-                        days_left = ""
-
-                    # Class Status (Active, etc.)
-                    class_status = "Active"  # Default, or parse if available
-
-                    # Report Date
-                    report_date = datetime.datetime.now().strftime("%-m/%-d/%Y")
-
-                    data.append({
-                        "Student Name": student_name,
-                        "Course Name": course_name,
-                        "Course Period": course_period,
-                        "Current Grade (%)": current_grade,
-                        "Current Grade Level": current_grade_level,
-                        "Total Assignments": actual_assignments,
-                        "Expected Assignments": expected_assignments,
-                        "Completed Assignments": completed_assignments,
-                        "Overdue Assignments": overdue_assignments,
-                        "Minutes Spent": minutes_spent,
-                        "Days Left": days_left,
-                        "Class Status": class_status,
-                        "Report Date": report_date
-                    })
+                    if self.recorder is not None:
+                        self.recorder.record(tab_idx, student_name, page_source, rows)
+                    metrics.incr("student_tabs")
+                    self.missing_courses.update(missing_courses)
+                    done.add(tab_idx)
+                    yield tab_idx, student_name, rows
+                return
+            except SessionExpired:
+                if self.driver is not None:
+                    # Fresh browser cookies were rejected too
+                    raise
+                print(f"Cached portal session for {username} was rejected; logging in again")
+                store.clear(username)
+                cookies = None
+            finally:
+                client.close()
+
+    def persist_missing_courses(self, missing_courses):
+        """
+        Add newly seen course names to the config file and in-memory config.
+        """
+        if missing_courses:
+            added = self.config_service.add_courses(missing_courses)
+            if added:
+                print(f"Added {len(added)} new course(s) to {self.config_service.path}")
+
+    @staticmethod
+    def _is_active_tab(tab) -> bool:
+        """
+        Whether `tab` is the currently selected student; clicking it may not
+        reload anything, so there is no old content to wait on.
+        """
+        try:
+            classes = f"{tab.get_attribute('class') or ''} {tab.find_element(By.XPATH, './..').get_attribute('class') or ''}"
+        except Exception:
+            return False
+        return any(c in ("active", "selected") for c in classes.split())
+
+    def _parse_cards_webdriver(self, student_name: str, missing_courses: List[str]) -> List[Dict[str, Any]]:
+        """
+        Reads each course card of the current tab through WebDriver element
+        lookups. Slower than the page_source parser; kept as a fallback.
+        """
+        data = []
+        report_date = report_date_today()
+
+        # Find all course cards
+        course_cards = self.driver.find_elements(By.CSS_SELECTOR, 'div.col-lg-4.col-xl-4.mb-3')
+        for card in course_cards:
+            try:
+                # Course Name
+                course_name_elem = card.find_element(By.CSS_SELECTOR, ".card-title")
+                course_name = course_name_elem.text.strip()
+
+                # Collect missing courses, don't immediately update config
+                include = self.course_filter.classify(course_name)
+                if include is None:
+                    missing_courses.insert(0, course_name)
+
+                # Filter by config
+                if include is False:
+                    metrics.incr("cards_filtered")
+                    continue
+
+                # Course Period
+                period_elem = card.find_element(By.CSS_SELECTOR, "small.text-muted")
+                course_period = period_elem.text.strip()
+
+                # Current Grade (%)
+                try:
+                    grade_elem = card.find_element(By.CSS_SELECTOR, ".card-grade")
+                    current_grade = grade_elem.text.replace("%", "").replace(" ", "").strip()
                 except Exception:
+                    current_grade = ""
+
+                # Total Assignments, Expected, Completed, Overdue
+                actual_assignments = ""
+                completed_assignments = ""
+                try:
+                    actual_elem = card.find_element(By.XPATH, ACTUAL_XPATH)
+                    completed_assignments, actual_assignments = parse_actual(actual_elem.text)  # e.g., "2 of 2"
+                except Exception:
+                    pass
+                try:
+                    # Grab the "expected" line (e.g., "10 of 40")
+                    expected_elem = card.find_element(By.XPATH, EXPECTED_XPATH)
+                    expected_assignments = parse_expected(expected_elem.text)
+                except Exception as e:
+                    print(f"[ERROR] Failed to get expected_assignments: {e}")
+                    metrics.incr("cards_skipped", reason="no_expected")
                     continue
-        # At the END (right before return), update the yaml ONCE
-        if missing_courses:
-            self._add_courses_to_config(set(missing_courses), "config/config.yaml")
-            # Also update in-memory config
-            for c in set(missing_courses):
-                self.config["courses"][c] = True
-        print(data)
+
+                # Minutes Spent
+                try:
+                    min_elem = card.find_element(By.XPATH, MINUTES_XPATH)
+                    minutes_spent = min_elem.text.replace("min", "").strip()
+                except Exception:
+                    minutes_spent = ""
+
+                # Days Left
+                try:
+                    days_elem = card.find_element(By.XPATH, DAYS_XPATH)
+                    days_left = (
+                        days_elem.text.replace("left", "")
+                        .replace("d", "")
+                        .strip()
+                    )
+                except Exception:
+                    days_left = ""
+
+                data.append({
+                    "Student Name": student_name,
+                    "Course Name": course_name,
+                    "Course Period": course_period,
+                    "Current Grade (%)": current_grade,
+                    "Current Grade Level": grade_level(current_grade, self.rubric),
+                    "Total Assignments": actual_assignments,
+                    "Expected Assignments": expected_assignments,
+                    "Completed Assignments": completed_assignments,
+                    "Overdue Assignments": overdue(expected_assignments, completed_assignments),
+                    "Minutes Spent": minutes_spent,
+                    "Days Left": days_left,
+                    "Class Status": "Active",  # Default, or parse if available
+                    "Report Date": report_date
+                })
+                metrics.incr("cards_parsed")
+            except Exception:
+                metrics.incr("cards_skipped", reason="error")
+                continue
         return data
 
     def close(self):
@@ -0,0 +1,145 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import config_service
+from metrics import metrics
+from replay import RunRecorder
+from scraper import DashboardScraper
+from snapshots import SnapshotStore
+
+
+def _scrape_shard(
+    config_path: str,
+    credentials: Optional[Dict[str, str]],
+    shard: Tuple[int, int],
+    snapshot_path: Optional[str],
+    record_dir: Optional[str] = None,
+):
+    """
+    Worker entry point: log in with its own browser session and scrape the
+    student tabs in `shard`. Returns [(tab index, rows), ...], the course
+    names missing from config and the card fingerprints seen.
+    """
+    snapshots = SnapshotStore(snapshot_path) if snapshot_path else None
+    recorder = RunRecorder(record_dir) if record_dir else None
+    scraper = DashboardScraper(config_path, credentials=credentials, snapshots=snapshots, recorder=recorder)
+    try:
+        tabs = [(tab_idx, rows) for tab_idx, _name, rows in scraper.iter_student_rows(shard)]
+        print(scraper.waits.summary())
+        card_hashes = list(snapshots.card_hashes.items()) if snapshots else []
+        return tabs, sorted(scraper.missing_courses), card_hashes, metrics.snapshot()
+    finally:
+        scraper.close()
+
+
+class ScraperPool:
+    """
+    Scrapes student tabs across several authenticated browser sessions in
+    parallel worker processes.
+
+    Each account in config (``accounts``, or the single ``credentials``
+    entry) is split into ``scraper_pool.sessions_per_account`` shards; shard
+    i of n scrapes tabs i, i+n, i+2n... so no up-front tab discovery is
+    needed. Results are merged into the same flat row list that
+    ``DashboardScraper.scrape_dashboard`` returns.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        sessions_per_account: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        snapshots: Optional[SnapshotStore] = None,
+        recorder: Optional[RunRecorder] = None,
+    ):
+        self.config_path = config_path
+        self.snapshots = snapshots
+        self.recorder = recorder
+        self.config = config_service(config_path).get()
+        opts = self.config.get("scraper_pool") or {}
+        self.accounts = self.config.get("accounts") or [self.config["credentials"]]
+        self.sessions_per_account = max(1, sessions_per_account or opts.get("sessions_per_account", 2))
+        self.max_workers = max(1, max_workers or opts.get("max_workers", 4))
+        self.missing_courses = set()
+
+    @classmethod
+    def enabled(cls, config: Dict[str, Any]) -> bool:
+        opts = config.get("scraper_pool") or {}
+        return bool(opts.get("enabled")) or len(config.get("accounts") or []) > 1
+
+    def _iter_shards(self) -> Iterator[Tuple[int, List[Tuple[int, List[Dict[str, Any]]]]]]:
+        """
+        Run every shard and yield (account index, [(tab index, rows), ...])
+        as each worker finishes. Missing courses and card fingerprints are
+        collected on the pool.
+        """
+        jobs = [
+            (account_idx, credentials, (shard_idx, self.sessions_per_account))
+            for account_idx, credentials in enumerate(self.accounts)
+            for shard_idx in range(self.sessions_per_account)
+        ]
+        # spawn: each worker starts clean rather than inheriting a forked scheduler/threads
+        ctx = multiprocessing.get_context("spawn")
+        snapshot_path = self.snapshots.path if self.snapshots is not None else None
+        record_dir = self.recorder.run_dir if self.recorder is not None else None
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(jobs)), mp_context=ctx) as pool:
+            futures = {
+                pool.submit(_scrape_shard, self.config_path, credentials, shard, snapshot_path, record_dir): account_idx
+                for account_idx, credentials, shard in jobs
+            }
+            for future in as_completed(futures):
+                shard_tabs, shard_missing, card_hashes, worker_metrics = future.result()
+                metrics.merge(worker_metrics)
+                self.missing_courses.update(shard_missing)
+                if self.snapshots is not None:
+                    self.snapshots.card_hashes.update((tuple(key), h) for key, h in card_hashes)
+                yield futures[future], shard_tabs
+
+    @staticmethod
+    def _new_rows(rows: List[Dict[str, Any]], seen: set) -> List[Dict[str, Any]]:
+        # A student shared by two accounts is kept once
+        fresh = []
+        for row in rows:
+            key = (row["Student Name"], row["Course Name"])
+            if key not in seen:
+                seen.add(key)
+                fresh.append(row)
+        return fresh
+
+    def iter_student_rows(self) -> Iterator[Tuple[int, str, List[Dict[str, Any]]]]:
+        """
+        Yield (tab index, student name, rows) for each student as soon as
+        the worker that scraped it finishes, for streaming consumers.
+        """
+        seen = set()
+        for _account_idx, shard_tabs in self._iter_shards():
+            for tab_idx, rows in shard_tabs:
+                rows = self._new_rows(rows, seen)
+                if rows:
+                    yield tab_idx, rows[0]["Student Name"], rows
+
+    def scrape_dashboard(self) -> List[Dict[str, Any]]:
+        tabs = []
+        for account_idx, shard_tabs in self._iter_shards():
+            tabs.extend((account_idx, tab_idx, rows) for tab_idx, rows in shard_tabs)
+
+        # Merge in account/tab order
+        data = []
+        seen = set()
+        for _account_idx, _tab_idx, rows in sorted(tabs, key=lambda t: t[:2]):
+            data.extend(self._new_rows(rows, seen))
+
+        self.persist_missing_courses(self.missing_courses)
+        print(f"Scraper pool: {len(data)} rows from {len(tabs)} student tabs across {len(self.accounts) * self.sessions_per_account} sessions")
+        return data
+
+    def persist_missing_courses(self, missing_courses):
+        if missing_courses:
+            added = config_service(self.config_path).add_courses(missing_courses)
+            if added:
+                print(f"Added {len(added)} new course(s) to {self.config_path}")
+
+    def close(self):
+        # Worker sessions are closed inside each worker process
+        pass
@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+
+class SessionStore:
+    """
+    Disk cache of authenticated portal cookies, keyed by username, so later
+    runs can skip the login form until the session expires or is rejected.
+
+    The file holds live session cookies and is written with owner-only
+    permissions.
+    """
+
+    def __init__(self, path: str, ttl_minutes: float = 60):
+        self.path = path
+        self.ttl = ttl_minutes * 60
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, entries: Dict[str, dict]):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".sessions-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load(self, username: str) -> Optional[List[dict]]:
+        """
+        Cookies saved for `username`, or None if missing or expired.
+        """
+        entry = self._read().get(username)
+        if not entry or entry.get("expires_at", 0) <= time.time():
+            return None
+        return entry.get("cookies") or None
+
+    def save(self, username: str, cookies: List[dict]):
+        entries = self._read()
+        entries[username] = {"expires_at": time.time() + self.ttl, "cookies": cookies}
+        self._write(entries)
+
+    def clear(self, username: str):
+        entries = self._read()
+        if entries.pop(username, None) is not None:
+            self._write(entries)
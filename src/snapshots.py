@@ -0,0 +1,131 @@
+import copy
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from utils import CSV_HEADER
+
+# Report Date changes every day, so it is left out of the content hash
+HASHED_FIELDS = [f for f in CSV_HEADER if f != "Report Date"]
+
+_SEP = "\x1f"
+
+
+def row_hash(row: Dict[str, Any]) -> str:
+    return hashlib.sha1(_SEP.join(str(row.get(f, "")) for f in HASHED_FIELDS).encode("utf-8")).hexdigest()
+
+
+def _key(student_name: str, course_name: str) -> str:
+    return f"{student_name}{_SEP}{course_name}"
+
+
+class SnapshotStore:
+    """
+    Last scraped row per (student, course), with a hash of the row content
+    and of the course card's raw HTML.
+
+    During a scrape, cards whose HTML is byte-identical to the previous run
+    reuse the stored row instead of being parsed again (`reuse_card`).
+    After the run, `changed_students` tells which students have any course
+    added, removed or changed, and `update` + `save` record the new state.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, dict] = self._read()
+        # Card fingerprints seen during this run, keyed by (student, course)
+        self.card_hashes: Dict[Tuple[str, str], str] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["SnapshotStore"]:
+        opts = config.get("snapshots") or {}
+        if not opts.get("enabled", True):
+            return None
+        path = opts.get("path", ".cache/snapshots.json")
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(__file__), "..", path)
+        return cls(path)
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, student_name: str, course_name: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(_key(student_name, course_name))
+        return entry["row"] if entry else None
+
+    def reuse_card(self, student_name: str, course_name: str, card_hash: str, report_date: str) -> Optional[Dict[str, Any]]:
+        """
+        Note the card fingerprint for this run and, if the card HTML is
+        unchanged since the last snapshot, return a copy of the stored row
+        dated `report_date`.
+        """
+        self.card_hashes[(student_name, course_name)] = card_hash
+        entry = self.entries.get(_key(student_name, course_name))
+        if not entry or entry.get("card_hash") != card_hash:
+            return None
+        row = copy.copy(entry["row"])
+        row["Report Date"] = report_date
+        return row
+
+    def changed_courses(self, rows: Iterable[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """
+        Map student name -> course names that are new, changed, or no longer
+        present compared with the stored snapshot.
+        """
+        changed: Dict[str, List[str]] = {}
+        current: Set[str] = set()
+        for row in rows:
+            student, course = row["Student Name"], row["Course Name"]
+            key = _key(student, course)
+            current.add(key)
+            entry = self.entries.get(key)
+            if entry is None or entry["hash"] != row_hash(row):
+                changed.setdefault(student, []).append(course)
+        students = {key.split(_SEP, 1)[0] for key in current}
+        for key in self.entries:
+            student, course = key.split(_SEP, 1)
+            if key not in current and student in students:
+                changed.setdefault(student, []).append(course)
+        return changed
+
+    def changed_students(self, rows: Iterable[Dict[str, Any]]) -> Set[str]:
+        return set(self.changed_courses(rows))
+
+    def update(self, rows: Iterable[Dict[str, Any]], students: Optional[Set[str]] = None):
+        """
+        Replace the snapshot of every student in `rows` (or only those in
+        `students`) with the given rows.
+        """
+        by_student: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            if students is None or row["Student Name"] in students:
+                by_student.setdefault(row["Student Name"], []).append(row)
+        stale = [k for k in self.entries if k.split(_SEP, 1)[0] in by_student]
+        for key in stale:
+            del self.entries[key]
+        for student, student_rows in by_student.items():
+            for row in student_rows:
+                entry = {"hash": row_hash(row), "row": dict(row)}
+                card_hash = self.card_hashes.get((student, row["Course Name"]))
+                if card_hash:
+                    entry["card_hash"] = card_hash
+                self.entries[_key(student, row["Course Name"])] = entry
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshots-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
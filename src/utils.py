@@ -1,5 +1,8 @@
 import csv
-from typing import List, Dict
+import datetime
+import io
+import math
+from typing import List, Dict, Optional
 
 CSV_HEADER = [
     "Student Name",
@@ -17,12 +20,48 @@ CSV_HEADER = [
     "Report Date"
 ]
 
+def csv_bytes(data: List[Dict]) -> bytes:
+    """
+    Serialize dashboard data to CSV in the required format, in memory.
+    """
+    buf = io.StringIO(newline="")
+    writer = csv.DictWriter(buf, fieldnames=CSV_HEADER)
+    writer.writeheader()
+    writer.writerows(data)
+    return buf.getvalue().encode("utf-8")
+
 def write_csv(data: List[Dict], output_path: str):
     """
     Write dashboard data to CSV in the required format.
     """
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_HEADER)
-        writer.writeheader()
-        for row in data:
-            writer.writerow(row)
+    with open(output_path, "wb") as f:
+        f.write(csv_bytes(data))
+
+
+def to_float(val) -> Optional[float]:
+    """
+    Parse a scraped numeric string ("90.15", "-", "") into a float, or None.
+    """
+    try:
+        return float(str(val).replace("%", "").replace(",", "").strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def to_int(val) -> Optional[int]:
+    """
+    Parse a scraped integer string ("155107", "-1", "") into an int, or None
+    (also for "NaN" and "Infinity").
+    """
+    f = to_float(val)
+    return int(f) if f is not None and math.isfinite(f) else None
+
+
+def parse_report_date(val: str) -> Optional[datetime.date]:
+    """
+    Parse the "Report Date" column (m/d/YYYY, as written by the scraper).
+    """
+    try:
+        return datetime.datetime.strptime(val.strip(), "%m/%d/%Y").date()
+    except (AttributeError, ValueError):
+        return None
@@ -0,0 +1,123 @@
+"""
+Readiness conditions for the dashboard scraper and a recorder for how long
+each wait actually took.
+
+The conditions follow Selenium's expected-condition protocol: callables that
+take the driver and return a truthy value once the page is ready.
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from metrics import metrics
+
+# Outstanding jQuery / ASP.NET AJAX requests, 0 when the network has gone quiet
+_PENDING_REQUESTS_JS = """
+var pending = 0;
+if (window.jQuery && window.jQuery.active) { pending += window.jQuery.active; }
+try {
+    if (window.Sys && Sys.WebForms && Sys.WebForms.PageRequestManager.getInstance().get_isInAsyncPostBack()) { pending += 1; }
+} catch (e) {}
+return [document.readyState, pending, performance.getEntriesByType('resource').length];
+"""
+
+
+class settled_element_count:
+    """
+    True once the page has finished loading, no XHR/postback is pending and
+    the number of elements matching `locator` has not changed for
+    `quiet_period` seconds. Returns the matching elements.
+    """
+
+    def __init__(self, locator, quiet_period: float = 0.4, allow_empty: bool = True):
+        self.locator = locator
+        self.quiet_period = quiet_period
+        self.allow_empty = allow_empty
+        self._last = None
+        self._since = 0.0
+
+    def __call__(self, driver):
+        try:
+            ready_state, pending, resources = driver.execute_script(_PENDING_REQUESTS_JS)
+        except WebDriverException:
+            return False
+        elements = driver.find_elements(*self.locator)
+        state = (ready_state, pending, resources, len(elements))
+        now = time.monotonic()
+        if state != self._last:
+            self._last = state
+            self._since = now
+            return False
+        if ready_state != "complete" or pending:
+            return False
+        if not elements and not self.allow_empty:
+            return False
+        if now - self._since < self.quiet_period:
+            return False
+        return elements or True
+
+
+@dataclass
+class WaitRecord:
+    step: str
+    seconds: float
+    timed_out: bool
+    replaces: float = 0.0
+
+    @property
+    def saved(self) -> float:
+        """Seconds saved relative to the fixed sleep this wait replaced."""
+        return self.replaces - self.seconds
+
+
+class WaitRecorder:
+    """
+    Runs WebDriverWait conditions and keeps the measured duration of each.
+    """
+
+    def __init__(self, driver_getter: Callable[[], Any], poll_frequency: float = 0.1):
+        self._driver_getter = driver_getter
+        self.poll_frequency = poll_frequency
+        self.records: List[WaitRecord] = []
+
+    def wait(self, step: str, condition, timeout: float, replaces: float = 0.0, required: bool = False) -> Optional[Any]:
+        """
+        Wait up to `timeout` seconds for `condition`. A timeout is recorded and
+        returns None unless `required` is set, in which case it is re-raised.
+        `replaces` is the fixed sleep this wait stands in for.
+        """
+        started = time.monotonic()
+        try:
+            result = WebDriverWait(self._driver_getter(), timeout, poll_frequency=self.poll_frequency).until(condition)
+            timed_out = False
+        except TimeoutException:
+            result = None
+            timed_out = True
+        record = WaitRecord(step, time.monotonic() - started, timed_out, replaces)
+        self.records.append(record)
+        # Per-student step names ("tab_ready[Name]") are aggregated by step kind
+        metrics.observe(f"wait_{step.split('[', 1)[0]}", record.seconds)
+        if timed_out and required:
+            raise TimeoutException(f"Timed out after {timeout}s waiting for {step}")
+        return result
+
+    @property
+    def total(self) -> float:
+        return sum(r.seconds for r in self.records)
+
+    @property
+    def total_saved(self) -> float:
+        return sum(r.saved for r in self.records if r.replaces)
+
+    def summary(self) -> str:
+        lines = ["Wait timings:"]
+        for r in self.records:
+            note = " (timed out)" if r.timed_out else ""
+            if r.replaces:
+                note += f", was a fixed {r.replaces:g}s sleep"
+            lines.append(f"  {r.step}: {r.seconds:.2f}s{note}")
+        lines.append(f"  total: {self.total:.2f}s, saved vs fixed sleeps: {self.total_saved:.2f}s")
+        return "\n".join(lines)
@@ -0,0 +1,33 @@
+"""
+Per-student summaries of scraped rows. Run with pytest or directly:
+python test_aggregate.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregate import summarize_students  # noqa: E402
+
+
+def _row(course, level, expected, overdue, minutes):
+    return {"Student Name": "Ann Example", "Course Name": course, "Current Grade Level": level,
+            "Expected Assignments": expected, "Overdue Assignments": overdue, "Minutes Spent": minutes}
+
+
+def test_counts_parse_like_scraped_numbers():
+    summary = summarize_students([
+        _row("Algebra 1", "A", "12", "-2", "1,234"),
+        _row("Chemistry", "F", None, "", "-"),
+        _row("Spanish 2", "B", 3, "4", 60),
+    ])["Ann Example"]
+    assert summary.total_expected == 15
+    assert summary.total_overdue == 4
+    assert summary.minutes_spent == 1294
+    assert summary.grade_buckets["A"] == ["Algebra 1"]
+    assert summary.at_risk == ["Chemistry", "Spanish 2"]
+
+
+if __name__ == "__main__":
+    test_counts_parse_like_scraped_numbers()
+    print("ok")
@@ -0,0 +1,98 @@
+"""
+Alert rules: edge-triggered firing against the previous run's row, the
+`where` conditions, and rule validation. Run with pytest or directly:
+python test_alerts.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from alerts import AlertEngine, AlertRule  # noqa: E402
+
+
+def _row(**fields):
+    row = {"Student Name": "Ann Example", "Course Name": "Algebra 1"}
+    row.update(fields)
+    return row
+
+
+def test_below_fires_only_when_crossing():
+    rule = AlertRule.from_dict({"field": "Current Grade (%)", "below": 70})
+    assert rule.fires(_row(**{"Current Grade (%)": "65"}), _row(**{"Current Grade (%)": "75"}))
+    # Still below: already reported by an earlier run
+    assert not rule.fires(_row(**{"Current Grade (%)": "60"}), _row(**{"Current Grade (%)": "65"}))
+    assert not rule.fires(_row(**{"Current Grade (%)": "80"}), _row(**{"Current Grade (%)": "65"}))
+    # No previous run: the condition alone decides
+    assert rule.fires(_row(**{"Current Grade (%)": "65"}), None)
+    assert not rule.fires(_row(**{"Current Grade (%)": "-"}), None)
+
+
+def test_drop_compares_with_previous_value():
+    rule = AlertRule.from_dict({"field": "Current Grade (%)", "drop": 5})
+    assert rule.fires(_row(**{"Current Grade (%)": 84}), _row(**{"Current Grade (%)": 90}))
+    assert rule.fires(_row(**{"Current Grade (%)": "85"}), _row(**{"Current Grade (%)": "90"}))
+    assert not rule.fires(_row(**{"Current Grade (%)": 86}), _row(**{"Current Grade (%)": 90}))
+    assert not rule.fires(_row(**{"Current Grade (%)": 80}), None)
+    assert rule.describe(_row(**{"Current Grade (%)": 84}), _row(**{"Current Grade (%)": 90})) != ""
+
+
+def test_becomes_fires_on_change_only():
+    rule = AlertRule.from_dict({"field": "Current Grade Level", "becomes": "F"})
+    assert rule.fires(_row(**{"Current Grade Level": "F"}), _row(**{"Current Grade Level": "D"}))
+    assert not rule.fires(_row(**{"Current Grade Level": "F"}), _row(**{"Current Grade Level": "F"}))
+    assert not rule.fires(_row(**{"Current Grade Level": "D"}), _row(**{"Current Grade Level": "C"}))
+
+
+def test_where_conditions_must_hold():
+    rule = AlertRule.from_dict({
+        "field": "Minutes Spent", "below": 60,
+        # Quoted limits from YAML are numbers too
+        "where": {"Days Left": {"below": "30"}},
+    })
+    assert rule.where == {"Days Left": ("below", 30.0)}
+    assert rule.fires(_row(**{"Minutes Spent": "10", "Days Left": "20"}), None)
+    assert not rule.fires(_row(**{"Minutes Spent": "10", "Days Left": "40"}), None)
+    # Crossing into the where condition fires even though minutes were already low
+    assert rule.fires(_row(**{"Minutes Spent": "10", "Days Left": "29"}),
+                      _row(**{"Minutes Spent": "10", "Days Left": "31"}))
+
+
+def test_invalid_rules_raise_value_error():
+    bad_specs = [
+        {"field": "Current Grade (%)"},
+        {"field": "Current Grade (%)", "below": 70, "above": 90},
+        {"field": "Current Grade (%)", "below": "seventy"},
+        {"field": "Minutes Spent", "below": 60, "where": {"Days Left": {"below": "soon"}}},
+        {"field": "Minutes Spent", "below": 60, "where": {"Days Left": {}}},
+        {"field": "Current Grade (%)", "below": 70, "priority": "urgent"},
+    ]
+    for spec in bad_specs:
+        try:
+            AlertRule.from_dict(spec)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted invalid rule {spec!r}")
+
+
+def test_engine_skips_unchanged_rows_and_orders_by_priority():
+    engine = AlertEngine([
+        AlertRule.from_dict({"name": "low_minutes", "field": "Minutes Spent", "below": 60, "priority": "low"}),
+        AlertRule.from_dict({"name": "failing", "field": "Current Grade Level", "becomes": "F", "priority": "high"}),
+    ], max_per_student=1)
+    now = _row(**{"Minutes Spent": "10", "Current Grade Level": "F"})
+    before = _row(**{"Minutes Spent": "100", "Current Grade Level": "D"})
+    found = engine.evaluate([now], lambda student, course: before)
+    assert [a.rule for a in found] == ["failing", "low_minutes"]
+    assert [a.rule for a in engine.by_student(found)["Ann Example"]] == ["failing"]
+    assert engine.evaluate([now], lambda student, course: dict(now)) == []
+
+
+if __name__ == "__main__":
+    test_below_fires_only_when_crossing()
+    test_drop_compares_with_previous_value()
+    test_becomes_fires_on_change_only()
+    test_where_conditions_must_hold()
+    test_invalid_rules_raise_value_error()
+    test_engine_skips_unchanged_rows_and_orders_by_priority()
+    print("ok")
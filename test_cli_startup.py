@@ -0,0 +1,57 @@
+"""
+Startup budget for the command line entry point.
+
+Importing src/main.py must not pull in Selenium, APScheduler, requests or
+lxml; those are imported by the commands that need them. Run with pytest or
+directly: python test_cli_startup.py
+"""
+import os
+import re
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+
+# Modules only the scrape / send / schedule paths need
+HEAVY_MODULES = {"selenium", "apscheduler", "requests", "urllib3", "lxml", "pytz", "sqlite3"}
+
+# Cumulative import time of `main`, in milliseconds (about 30 ms on a laptop)
+IMPORT_BUDGET_MS = 150
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True, cwd=SRC_DIR,
+    )
+
+
+def main_import_ms() -> float:
+    """
+    Best of three cumulative `import main` times from ``python -X importtime``.
+    """
+    best = None
+    for _ in range(3):
+        out = _run("import main").stderr
+        match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| main$", out, re.MULTILINE)
+        assert match, out
+        ms = int(match.group(1)) / 1000
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+def test_main_does_not_import_heavy_modules():
+    out = _run("import sys, main; main.build_parser(); print(','.join(sorted({m.split('.')[0] for m in sys.modules})))")
+    loaded = set(out.stdout.strip().split(","))
+    assert not loaded & HEAVY_MODULES, f"main.py imports {sorted(loaded & HEAVY_MODULES)} at startup"
+
+
+def test_main_import_time_budget():
+    ms = main_import_ms()
+    assert ms < IMPORT_BUDGET_MS, f"import main took {ms:.1f} ms (budget {IMPORT_BUDGET_MS} ms)"
+
+
+if __name__ == "__main__":
+    test_main_does_not_import_heavy_modules()
+    print(f"import main: {main_import_ms():.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+    test_main_import_time_budget()
@@ -0,0 +1,89 @@
+"""
+Writing newly seen courses back into a config file's text
+(`config.add_courses_to_text`) without disturbing the rest of it. Run
+with pytest or directly: python test_config.py
+"""
+import os
+import sys
+import tempfile
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from config import ConfigService, add_courses_to_text  # noqa: E402
+
+CONFIG = """\
+# Parent portal account
+credentials:
+  username: parent
+courses:
+  Algebra 1: true
+  Walking Fitness: false
+  # Add more courses as needed
+emails:
+  Ann Example:
+    - ann@example.com
+"""
+
+
+def test_new_courses_go_above_the_marker():
+    text, added = add_courses_to_text(CONFIG, ["Spanish 2", "Algebra 1", "Chemistry", "Spanish 2"])
+    assert added == ["Chemistry", "Spanish 2"]
+    assert text == CONFIG.replace(
+        "  # Add more courses as needed\n",
+        "  Chemistry: true\n  Spanish 2: true\n  # Add more courses as needed\n",
+    )
+
+
+def test_without_marker_courses_follow_the_last_one():
+    config = "courses:\n    Algebra 1: true\n\n# Recipients\nemails: {}\n"
+    text, added = add_courses_to_text(config, ["Chemistry"])
+    assert added == ["Chemistry"]
+    assert text == "courses:\n    Algebra 1: true\n    Chemistry: true\n\n# Recipients\nemails: {}\n"
+
+
+def test_empty_or_missing_courses_section():
+    text, _added = add_courses_to_text("courses: {}\nemails: {}", ["Chemistry"])
+    assert text == "courses:\n  Chemistry: true\nemails: {}\n"
+    text, _added = add_courses_to_text("emails: {}", ["Chemistry"])
+    assert text == "emails: {}\ncourses:\n  Chemistry: true\n"
+
+
+def test_names_that_need_quoting_round_trip():
+    names = ["Biology: Honors", "Art #2", "9th - 12th Grade - What’s Happening at LSS", "'Quoted' course"]
+    text, added = add_courses_to_text(CONFIG, names)
+    assert sorted(added) == sorted(names)
+    courses = yaml.safe_load(text)["courses"]
+    assert all(courses[name] is True for name in names)
+    assert courses["Walking Fitness"] is False
+    assert text.startswith("# Parent portal account\n")
+
+
+def test_nothing_to_add_leaves_text_unchanged():
+    assert add_courses_to_text(CONFIG, ["Algebra 1", "Walking Fitness"]) == (CONFIG, [])
+    assert add_courses_to_text(CONFIG, []) == (CONFIG, [])
+
+
+def test_service_updates_file_and_cached_config():
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "config.yaml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(CONFIG)
+        service = ConfigService(path)
+        config = service.get()
+        assert service.add_courses(["Chemistry", "Algebra 1"]) == ["Chemistry"]
+        assert config["courses"]["Chemistry"] is True
+        assert service.get() is config and service.loads == 1
+        with open(path, encoding="utf-8") as f:
+            assert yaml.safe_load(f)["courses"]["Chemistry"] is True
+
+
+if __name__ == "__main__":
+    test_new_courses_go_above_the_marker()
+    test_without_marker_courses_follow_the_last_one()
+    test_empty_or_missing_courses_section()
+    test_names_that_need_quoting_round_trip()
+    test_nothing_to_add_leaves_text_unchanged()
+    test_service_updates_file_and_cached_config()
+    print("ok")
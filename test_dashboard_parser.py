@@ -0,0 +1,89 @@
+"""
+The page_source parser returns the same rows as the WebDriver card reader
+(`DashboardScraper._parse_cards_webdriver`) on the benchmark fixtures.
+
+No browser: the WebDriver path runs against a fake driver whose elements
+are backed by the same HTML. Run with pytest or directly:
+python test_dashboard_parser.py
+"""
+import os
+import sys
+
+from lxml import html as lxml_html
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "src"))
+sys.path.insert(0, os.path.join(HERE, "benchmarks"))
+
+import dashboard_parser  # noqa: E402
+from course_filter import CourseFilter, GradeRubric  # noqa: E402
+from dashboard_parser import parse_dashboard_html  # noqa: E402
+from fixtures import COURSE_NAMES, generate_dashboard  # noqa: E402
+from scraper import DashboardScraper  # noqa: E402
+from selenium.common.exceptions import NoSuchElementException  # noqa: E402
+from selenium.webdriver.common.by import By  # noqa: E402
+
+# The scraper's CSS selectors, as the parser's XPath equivalents
+CSS_XPATH = {
+    "div.col-lg-4.col-xl-4.mb-3": dashboard_parser.CARD_XPATH,
+    ".card-title": dashboard_parser.TITLE_XPATH,
+    "small.text-muted": dashboard_parser.PERIOD_XPATH,
+    ".card-grade": dashboard_parser.GRADE_XPATH,
+}
+
+
+class FakeElement:
+    """
+    WebDriver element over an lxml element; `text` is the rendered text.
+    """
+
+    def __init__(self, elem):
+        self.elem = elem
+
+    @property
+    def text(self):
+        return " ".join(self.elem.text_content().split())
+
+    def find_elements(self, by, value):
+        xpath = CSS_XPATH[value] if by == By.CSS_SELECTOR else value
+        return [FakeElement(e) for e in self.elem.xpath(xpath)]
+
+    def find_element(self, by, value):
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(value)
+        return found[0]
+
+
+def _webdriver_rows(page_source, student_name, course_filter):
+    scraper = DashboardScraper.__new__(DashboardScraper)
+    scraper.driver = FakeElement(lxml_html.fromstring(page_source))
+    scraper.course_filter = course_filter
+    scraper.rubric = GradeRubric()
+    missing_courses = []
+    rows = scraper._parse_cards_webdriver(student_name, missing_courses)
+    return rows, missing_courses
+
+
+def test_lxml_and_webdriver_parsers_agree():
+    for num_cards, seed in ((2, 2), (50, 50), (120, 7)):
+        page = generate_dashboard(num_cards, "Ann Example", seed=seed)
+        expected = _webdriver_rows(page, "Ann Example", CourseFilter())
+        assert len(expected[0]) == num_cards
+        assert parse_dashboard_html(page, "Ann Example", CourseFilter()) == expected
+
+
+def test_parsers_agree_on_filtered_and_new_courses():
+    page = generate_dashboard(30, "Ann Example", seed=3)
+    # Half the known courses deselected, the rest unknown to the config
+    courses = {name: i % 2 == 0 for i, name in enumerate(COURSE_NAMES[:6])}
+    rows, missing = parse_dashboard_html(page, "Ann Example", CourseFilter(courses))
+    assert (rows, missing) == _webdriver_rows(page, "Ann Example", CourseFilter(courses))
+    assert missing and all(name not in courses for name in missing)
+    assert all(courses.get(row["Course Name"], True) for row in rows)
+
+
+if __name__ == "__main__":
+    test_lxml_and_webdriver_parsers_agree()
+    test_parsers_agree_on_filtered_and_new_courses()
+    print("ok")
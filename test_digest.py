@@ -0,0 +1,99 @@
+"""
+Digest mode: recipients grouped by the students they follow, one digest per
+group, and a single-student digest carrying that student's report as is.
+Run with pytest or directly: python test_digest.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregate import summarize_students  # noqa: E402
+from digest import DigestQueue, recipients_by_student_set  # noqa: E402
+
+STUDENTS = ["Ann Example", "Bob Example", "Cal Example"]
+EMAILS = {
+    "Ann Example": ["Parent@example.com", "ann@example.com"],
+    "Bob Example": ["parent@example.com ", "coach@example.com"],
+    "Cal Example": ["coach@example.com", "COACH@example.com"],
+    "Dee Example": ["parent@example.com"],
+}
+
+
+def _summaries():
+    rows = []
+    for i, student in enumerate(STUDENTS):
+        for course, level in (("Algebra 1", "A"), ("Chemistry", "D")):
+            rows.append({"Student Name": student, "Course Name": course, "Current Grade Level": level,
+                         "Expected Assignments": str(10 + i), "Overdue Assignments": "1", "Minutes Spent": "30"})
+    return summarize_students(rows)
+
+
+def test_recipients_grouped_by_student_set():
+    groups = recipients_by_student_set(EMAILS, STUDENTS)
+    # Addresses match case-insensitively and keep their first spelling; tuples follow the scrape order
+    assert groups == {
+        ("Ann Example", "Bob Example"): ["Parent@example.com"],
+        ("Ann Example",): ["ann@example.com"],
+        ("Bob Example", "Cal Example"): ["coach@example.com"],
+    }
+    # Students not scraped this run are left out
+    assert recipients_by_student_set(EMAILS, ["Cal Example", "Bob Example"]) == {
+        ("Bob Example",): ["parent@example.com"],
+        ("Cal Example", "Bob Example"): ["coach@example.com"],
+    }
+    assert recipients_by_student_set({}, STUDENTS) == {}
+    assert recipients_by_student_set(None, STUDENTS) == {}
+
+
+def test_queue_builds_one_digest_per_group():
+    queue = DigestQueue(EMAILS)
+    for summary in _summaries().values():
+        queue.add(summary)
+    digests = {tuple(d.students): d for d in queue.digests()}
+    assert set(digests) == {("Ann Example", "Bob Example"), ("Ann Example",), ("Bob Example", "Cal Example")}
+
+    family = digests[("Ann Example", "Bob Example")]
+    assert family.recipients == ["Parent@example.com"]
+    assert [row["Student Name"] for row in family.rows] == ["Ann Example"] * 2 + ["Bob Example"] * 2
+    assert family.name == "Ann_Example_Bob_Example"
+    params = family.template_params()
+    assert params["total_assignments"] == "42" and params["total_past_due"] == "4"
+    assert params["grade_summary"].startswith("Ann Example\n(1) A\n- Algebra 1")
+    assert "\n\nBob Example\n(1) A" in params["grade_summary"]
+    assert params["alerts"] == ""
+
+
+def test_single_student_digest_is_that_students_report():
+    summary = _summaries()["Ann Example"]
+    queue = DigestQueue({"Ann Example": ["ann@example.com"]})
+    queue.add(summary)
+    (digest,) = queue.digests()
+    assert digest.recipients == ["ann@example.com"]
+    assert digest.rows == summary.rows
+    # Same attachment name as the per-student email
+    assert digest.name == "Ann_Example"
+    params = digest.template_params()
+    assert params["total_assignments"] == str(summary.total_expected)
+    assert params["total_past_due"] == str(summary.total_overdue)
+    assert params["grade_summary"] == f"Ann Example\n{summary.grade_summary}"
+    assert params["at_risk"] == f"Ann Example\n{summary.at_risk_summary}"
+
+
+def test_send_only_on_change_skips_unchanged_groups():
+    queue = DigestQueue(EMAILS, send_only_on_change=True)
+    summaries = _summaries()
+    queue.add(summaries["Ann Example"], changed={})
+    queue.add(summaries["Bob Example"], changed={"Bob Example": ["Chemistry"]})
+    queue.add(summaries["Cal Example"], changed={"Bob Example": ["Chemistry"]})
+    assert sorted(tuple(d.students) for d in queue.digests()) == [
+        ("Ann Example", "Bob Example"), ("Bob Example", "Cal Example"),
+    ]
+
+
+if __name__ == "__main__":
+    test_recipients_grouped_by_student_set()
+    test_queue_builds_one_digest_per_group()
+    test_single_student_digest_is_that_students_report()
+    test_send_only_on_change_skips_unchanged_groups()
+    print("ok")
@@ -0,0 +1,125 @@
+"""
+Email dispatch: token-bucket pacing, retrying transient EmailJS statuses
+(honouring Retry-After), and giving up on permanent errors.
+
+No network: the client's HTTP session is replaced by a stub that replays
+canned responses. Run with pytest or directly: python test_dispatch.py
+"""
+import os
+import sys
+import threading
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+import emailer  # noqa: E402
+from attachments import Attachment  # noqa: E402
+from dispatch import EmailDispatcher, RateLimiter  # noqa: E402
+from emailer import EmailJSClient, parse_retry_after  # noqa: E402
+
+
+class StubSession:
+    """
+    `requests.Session` stand-in answering each POST with the next
+    (status, headers) pair in `responses`, then 200s.
+    """
+
+    def __init__(self, responses=()):
+        self.responses = list(responses)
+        self.headers = {}
+        self.posts = []
+        self._lock = threading.Lock()
+
+    def post(self, url, data=None, timeout=None):
+        with self._lock:
+            self.posts.append(time.monotonic())
+            status, headers = self.responses.pop(0) if self.responses else (200, {})
+        return types.SimpleNamespace(status_code=status, text="OK" if status == 200 else "error", headers=headers)
+
+    def close(self):
+        pass
+
+
+def _dispatch(session, **options):
+    original = emailer.requests.Session
+    emailer.requests.Session = lambda: session
+    client = EmailJSClient("s", "t", "k")
+    try:
+        with EmailDispatcher(client, max_workers=1, requests_per_second=0, **options) as dispatcher:
+            dispatcher.submit(Attachment.from_bytes(b"a,b\n", "report.csv"), ["ann@example.com"], "Ann Example")
+            return dispatcher.join()[0]
+    finally:
+        emailer.requests.Session = original
+        client.close()
+
+
+def test_rate_limiter_paces_after_burst():
+    limiter = RateLimiter(20, burst=3)
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - started < 0.04
+    for _ in range(4):
+        limiter.acquire()
+    # Four more tokens at 20 per second, minus what trickled in meanwhile
+    assert time.monotonic() - started >= 0.17
+
+    unlimited = RateLimiter(0)
+    started = time.monotonic()
+    for _ in range(1000):
+        unlimited.acquire()
+    assert time.monotonic() - started < 0.1
+
+
+def test_transient_statuses_are_retried():
+    session = StubSession([(503, {}), (429, {}), (502, {})])
+    result = _dispatch(session, max_retries=3, retry_backoff=0.01)
+    assert result.ok and result.attempts == 4
+    assert len(session.posts) == 4
+
+
+def test_retries_stop_at_max_retries():
+    session = StubSession([(500, {})] * 5)
+    result = _dispatch(session, max_retries=2, retry_backoff=0.01)
+    assert not result.ok and result.attempts == 3
+    assert result.error == "STATUS:500 error"
+
+
+def test_permanent_errors_are_not_retried():
+    for status in (400, 401, 403, 422):
+        session = StubSession([(status, {})])
+        result = _dispatch(session, max_retries=3, retry_backoff=0.01)
+        assert not result.ok and result.attempts == 1, status
+        assert result.status == status
+
+
+def test_retry_after_is_honoured():
+    session = StubSession([(429, {"Retry-After": "0.3"})])
+    result = _dispatch(session, max_retries=3, retry_backoff=0.01)
+    assert result.ok and result.attempts == 2
+    assert session.posts[1] - session.posts[0] >= 0.3
+
+    # Asked to wait longer than is worth it: no retry
+    session = StubSession([(503, {"Retry-After": "3600"})])
+    result = _dispatch(session, max_retries=3, retry_backoff=0.01)
+    assert not result.ok and result.attempts == 1
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("-5") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert 50 < parse_retry_after(time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 60))) <= 60
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+if __name__ == "__main__":
+    test_rate_limiter_paces_after_burst()
+    test_transient_statuses_are_retried()
+    test_retries_stop_at_max_retries()
+    test_permanent_errors_are_not_retried()
+    test_retry_after_is_honoured()
+    test_parse_retry_after()
+    print("ok")
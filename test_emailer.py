@@ -1,4 +1,7 @@
-from src.emailer import EmailJSClient
+import sys
+sys.path.insert(0, "src")
+
+from emailer import EmailJSClient
 
 client = EmailJSClient("service_l9fh0pj", "template_rerp7v6", "ta5OfAVP6Jqpb5VCc")
 csv_path = "reports/Noah_Cooksey.csv"
@@ -0,0 +1,226 @@
+"""
+Run journal outbox: an email a run already sent is never sent again when
+the run is resumed, even though the change-detection snapshot (and so the
+alerts in the email) moved on for the students it emailed.
+
+No network or browser: EmailJS is replaced by a fake dispatcher or client. Run with
+pytest or directly: python test_journal.py
+"""
+import os
+import sys
+import tempfile
+import types
+from concurrent.futures import Future
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+import main  # noqa: E402
+import scraper  # noqa: E402
+from dispatch import DispatchResult, EmailDispatcher  # noqa: E402
+from journal import DONE, SCRAPED, SCRAPING, OutboxDispatcher, RunJournal  # noqa: E402
+from snapshots import SnapshotStore  # noqa: E402
+from utils import CSV_HEADER  # noqa: E402
+
+STUDENTS = ["Ann Example", "Bob Example"]
+
+
+class FakeDispatcher:
+    """
+    Records every submitted email; students in `fail` get an HTTP 503.
+    """
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.sent = []
+
+    def submit(self, report, recipients, student_name="", **template_params):
+        self.sent.append((student_name, template_params))
+        ok = student_name not in self.fail
+        future = Future()
+        future.set_result(DispatchResult(student_name, list(recipients), status=200 if ok else 503,
+                                         attempts=1, error=None if ok else "HTTP 503"))
+        return future
+
+    def join(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class StubClient:
+    """
+    EmailJS client stand-in for a real `EmailDispatcher`; always accepts.
+    """
+
+    def __init__(self):
+        self.sent = []
+
+    def send_report(self, report, recipients, student_name="", **template_params):
+        self.sent.append(student_name)
+        return 200, "OK"
+
+    def close(self):
+        pass
+
+
+class FailingScraper:
+    """
+    Streams the first student's tab, then fails like a portal error mid-scrape.
+    """
+
+    missing_courses = set()
+
+    def __init__(self, config_path, snapshots=None, recorder=None):
+        pass
+
+    def iter_student_rows(self):
+        yield 0, STUDENTS[0], [r for r in _rows(90.0) if r["Student Name"] == STUDENTS[0]]
+        raise RuntimeError("portal went away")
+
+    def close(self):
+        pass
+
+
+def _rows(grade):
+    rows = []
+    for student in STUDENTS:
+        row = dict.fromkeys(CSV_HEADER, "")
+        row.update({
+            "Student Name": student, "Course Name": "Algebra 1", "Course Period": "1",
+            "Current Grade (%)": grade, "Current Grade Level": "A" if grade >= 90 else "F",
+            "Total Assignments": 20, "Expected Assignments": 10, "Completed Assignments": 10,
+            "Overdue Assignments": 0, "Minutes Spent": 600, "Days Left": 100, "Report Date": "10/1/2026",
+        })
+        rows.append(row)
+    return rows
+
+
+def _write_config(work_dir):
+    config = {
+        "emails": {s: [f"{s.split()[0].lower()}@example.com"] for s in STUDENTS},
+        "emailjs": {"service_id": "s", "template_id": "t", "public_key": "k"},
+        "snapshots": {"path": os.path.join(work_dir, "snapshots.json")},
+        "journal": {"path": os.path.join(work_dir, "journal.sqlite3")},
+        "history": {"enabled": False},
+        "metrics": {"enabled": False},
+        "attachments": {"archive": False},
+        "send_error_alerts": False,
+    }
+    path = os.path.join(work_dir, "config.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f)
+    return path, config
+
+
+def _run(config_path, journal, dispatcher, client=None):
+    original = main.create_dispatcher
+    main.create_dispatcher = lambda config: (client or types.SimpleNamespace(close=lambda: None), dispatcher)
+    try:
+        return main.generate_and_send_report(config_path, resume=journal)
+    finally:
+        main.create_dispatcher = original
+
+
+def test_resume_after_partial_failure_sends_each_email_once():
+    with tempfile.TemporaryDirectory() as work_dir:
+        config_path, config = _write_config(work_dir)
+        # Last run's grades, then a run that scraped lower grades (so alerts fire) and stopped
+        snapshots = SnapshotStore(config["snapshots"]["path"])
+        snapshots.update(_rows(95.0))
+        snapshots.save()
+        journal = RunJournal.begin(config["journal"]["path"], config_path)
+        journal.record_batch(_rows(60.0))
+        journal.set_stage(SCRAPED)
+
+        first = FakeDispatcher(fail={"Bob Example"})
+        assert _run(config_path, journal, first) is False
+        assert sorted(name for name, _params in first.sent) == STUDENTS
+        assert all(params["alerts"] for _name, params in first.sent)
+
+        second = FakeDispatcher()
+        resumed = RunJournal.open(config["journal"]["path"])
+        assert _run(config_path, resumed, second) is True
+        # Ann's snapshot moved with the first attempt, so her alerts differ now; she is still not resent
+        assert [name for name, _params in second.sent] == ["Bob Example"]
+        assert second.sent[0][1]["alerts"] == dict(first.sent)["Bob Example"]["alerts"]
+
+        resumed = RunJournal.open(config["journal"]["path"], journal.run_id)
+        try:
+            assert resumed.stage == DONE
+        finally:
+            resumed.close()
+
+
+def test_streaming_run_failing_mid_scrape_is_resumed_without_resending():
+    with tempfile.TemporaryDirectory() as work_dir:
+        config_path, config = _write_config(work_dir)
+        with open(config_path, "a", encoding="utf-8") as f:
+            f.write("streaming: true\n")
+        client = StubClient()
+        original = scraper.DashboardScraper
+        scraper.DashboardScraper = FailingScraper
+        try:
+            # The first student's email is queued, then the scrape fails; close() still sends it
+            assert _run(config_path, None, EmailDispatcher(client, requests_per_second=0), client) is False
+        finally:
+            scraper.DashboardScraper = original
+        assert client.sent == [STUDENTS[0]]
+
+        journal = RunJournal.open(config["journal"]["path"])
+        assert journal.stage == SCRAPING
+        statuses = [r["status"] for r in journal.conn.execute("SELECT status FROM outbox")]
+        assert statuses == ["sent"]
+        run_id = journal.run_id
+
+        resumed_client = StubClient()
+        # Only part of the dashboard was scraped: nothing is resent and the run is not finished
+        assert _run(config_path, journal, EmailDispatcher(resumed_client, requests_per_second=0), resumed_client) is False
+        assert resumed_client.sent == []
+        journal = RunJournal.open(config["journal"]["path"], run_id)
+        try:
+            assert journal.stage == SCRAPING
+        finally:
+            journal.close()
+
+
+def test_outbox_key_ignores_template_values():
+    with tempfile.TemporaryDirectory() as work_dir:
+        journal = RunJournal.begin(os.path.join(work_dir, "journal.sqlite3"))
+        try:
+            fake = FakeDispatcher()
+            outbox = OutboxDispatcher(fake, journal)
+            outbox.submit("digest-1", ["a@example.com"], "Ann Example", alerts="! grade fell")
+            outbox.join()
+            outbox = OutboxDispatcher(fake, journal)
+            result = outbox.submit("digest-1", ["A@example.com "], "Ann Example", alerts="").result()
+            assert result.ok and result.response == "already sent"
+            assert outbox.already_sent == ["Ann Example"]
+            outbox.submit("digest-2", ["a@example.com"], "Ann Example")
+            assert len(fake.sent) == 2
+        finally:
+            journal.close()
+
+
+def test_prune_keeps_each_configs_runs():
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "journal.sqlite3")
+        RunJournal.begin(path, "/accounts/a.yaml", keep=1).close()
+        for _ in range(3):
+            RunJournal.begin(path, "/accounts/b.yaml", keep=1).close()
+        runs = RunJournal(path, "")
+        try:
+            counts = dict(runs.conn.execute("SELECT config_path, COUNT(*) FROM runs GROUP BY config_path"))
+        finally:
+            runs.close()
+        assert counts == {"/accounts/a.yaml": 1, "/accounts/b.yaml": 1}
+
+
+if __name__ == "__main__":
+    test_resume_after_partial_failure_sends_each_email_once()
+    test_streaming_run_failing_mid_scrape_is_resumed_without_resending()
+    test_outbox_key_ignores_template_values()
+    test_prune_keeps_each_configs_runs()
+    print("ok")
@@ -0,0 +1,158 @@
+"""
+Direct HTTP scrape (`portal_api.PortalClient`) against the local portal
+simulator: form login, the __VIEWSTATE postback per student tab, and the
+errors that send the scraper back to the browser.
+
+No browser or network: everything talks to benchmarks/simulator.py on
+localhost. Run with pytest or directly: python test_portal_api.py
+"""
+import os
+import sys
+import tempfile
+
+import requests
+import yaml
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "src"))
+sys.path.insert(0, os.path.join(HERE, "benchmarks"))
+
+from dashboard_parser import parse_dashboard_html  # noqa: E402
+from portal_api import PortalAPIError, PortalClient, SessionExpired  # noqa: E402
+from scraper import DashboardScraper  # noqa: E402
+from session_store import SessionStore  # noqa: E402
+from simulator import PortalSimulator, e2e_config  # noqa: E402
+
+
+class BrowserFallback(Exception):
+    """Raised instead of starting Chrome."""
+
+
+def _dashboard_url(sim):
+    return f"{sim.base_url}/FEDashboard.aspx"
+
+
+def _form_login(sim):
+    with requests.Session() as session:
+        resp = session.post(f"{sim.base_url}/Login.aspx", data={"tbLogin": "ann", "tbPassword": "secret"}, timeout=10)
+        assert resp.status_code == 200 and resp.url.endswith("FEDashboard.aspx")
+        return [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path} for c in session.cookies]
+
+
+def _course_names(page, student):
+    rows, _missing = parse_dashboard_html(page, student)
+    return [row["Course Name"] for row in rows]
+
+
+def test_postbacks_fetch_every_student_tab():
+    with PortalSimulator(students=4, courses=3, username="ann", password="secret") as sim:
+        client = PortalClient(_dashboard_url(sim), _form_login(sim), timeout=10)
+        try:
+            pages = list(client.iter_student_pages())
+        finally:
+            client.close()
+        assert [(idx, name) for idx, name, _page in pages] == list(enumerate(sim.students))
+        for idx, name, page in pages:
+            assert _course_names(page, name) == [c["name"] for c in sim.courses[idx]]
+        stats = sim.stats()
+        assert stats["tab_switches"] == 3
+        assert stats["POST fedashboard.aspx"] == 3
+        assert "viewstate_errors" not in stats
+
+
+def test_shard_fetches_only_its_tabs():
+    with PortalSimulator(students=5, courses=1) as sim:
+        client = PortalClient(_dashboard_url(sim), sim.issue_session(), timeout=10)
+        try:
+            pages = list(client.iter_student_pages((1, 2)))
+        finally:
+            client.close()
+        assert [(idx, name) for idx, name, _page in pages] == [(1, sim.students[1]), (3, sim.students[3])]
+
+
+def test_stale_viewstate_is_an_api_error():
+    with PortalSimulator(students=3, courses=1) as sim:
+        client = PortalClient(_dashboard_url(sim), sim.issue_session(), timeout=10)
+        try:
+            first = client.get_dashboard()
+            tabs = client.student_tabs(first)
+            client.open_tab(first, tabs[1][1])
+            # Posting the older page back fails the viewstate check: not a login problem
+            try:
+                client.open_tab(first, tabs[2][1])
+            except SessionExpired:
+                raise AssertionError("stale viewstate reported as an expired session")
+            except PortalAPIError as e:
+                assert "HTTP 500" in str(e)
+            else:
+                raise AssertionError("stale viewstate accepted")
+        finally:
+            client.close()
+
+
+def test_rejected_cookies_raise_session_expired():
+    with PortalSimulator(students=2, courses=1) as sim:
+        cookies = [dict(c, value="not-a-session") for c in sim.issue_session()]
+        client = PortalClient(_dashboard_url(sim), cookies, timeout=10)
+        try:
+            client.get_dashboard()
+        except SessionExpired:
+            pass
+        else:
+            raise AssertionError("login page accepted as the dashboard")
+        finally:
+            client.close()
+
+
+def _http_scraper(sim, work_dir, cookies):
+    config = e2e_config(sim, work_dir)
+    config_path = os.path.join(work_dir, "config.yaml")
+    with open(config_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f)
+    SessionStore(config["session_cache"]["path"]).save(config["credentials"]["username"], cookies)
+    scraper = DashboardScraper(config_path)
+
+    def login():
+        raise BrowserFallback()
+
+    scraper.login = login
+    return scraper
+
+
+def test_portal_errors_fall_back_to_the_browser():
+    with tempfile.TemporaryDirectory() as work_dir, PortalSimulator(students=2, courses=2) as sim:
+        scraper = _http_scraper(sim, work_dir, sim.issue_session("simulator"))
+        assert [name for _idx, name, _rows in scraper.iter_student_rows()] == sim.students
+
+        sim.error_rate = 1.0
+        scraper = _http_scraper(sim, work_dir, sim.issue_session("simulator"))
+        try:
+            list(scraper.iter_student_rows())
+        except BrowserFallback:
+            pass
+        else:
+            raise AssertionError("HTTP 503 did not fall back to the browser")
+        assert sim.stats()["injected_errors"] == 1
+
+
+def test_rejected_cached_session_logs_in_again():
+    with tempfile.TemporaryDirectory() as work_dir, PortalSimulator(students=2, courses=2) as sim:
+        stale = [dict(c, value="expired") for c in sim.issue_session("simulator")]
+        scraper = _http_scraper(sim, work_dir, stale)
+        try:
+            list(scraper.iter_student_rows())
+        except BrowserFallback:
+            pass
+        else:
+            raise AssertionError("stale cached cookies did not trigger a browser login")
+        assert SessionStore(scraper.config["session_cache"]["path"]).load("simulator") is None
+
+
+if __name__ == "__main__":
+    test_postbacks_fetch_every_student_tab()
+    test_shard_fetches_only_its_tabs()
+    test_stale_viewstate_is_an_api_error()
+    test_rejected_cookies_raise_session_expired()
+    test_portal_errors_fall_back_to_the_browser()
+    test_rejected_cached_session_logs_in_again()
+    print("ok")
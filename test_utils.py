@@ -0,0 +1,33 @@
+"""
+Parsing of scraped numeric cells. Run with pytest or directly:
+python test_utils.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from utils import to_float, to_int  # noqa: E402
+
+
+def test_to_int_parses_scraped_numbers():
+    assert to_int("155107") == 155107
+    assert to_int("-1") == -1
+    assert to_int("1,200") == 1200
+    assert to_int("87.9%") == 87
+    assert to_int(42.0) == 42
+    assert to_int("") is None
+    assert to_int("-") is None
+    assert to_int(None) is None
+
+
+def test_to_int_rejects_non_finite_values():
+    for value in ("NaN", "nan", "Infinity", "-Infinity", "inf", float("nan"), float("inf")):
+        assert to_float(value) is not None
+        assert to_int(value) is None, value
+
+
+if __name__ == "__main__":
+    test_to_int_parses_scraped_numbers()
+    test_to_int_rejects_non_finite_values()
+    print("ok")